@@ -8,16 +8,16 @@ import sys
 # Add the parent directory to the path so we can import app modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from app.database import Base
-from app.models import Vehicle, Trip, User  # Import all models
+from app.database import Base, sync_database_url
+from app.models import Vehicle, Trip, User, RouteCacheEntry, TripRollup, RateLimitBucket, GeocodeCacheEntry, FuelPrice  # Import all models
 from app.config import settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url with the one from settings
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# Override sqlalchemy.url with the one from settings (migrations always use the sync driver)
+config.set_main_option("sqlalchemy.url", sync_database_url(settings.database_url).replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
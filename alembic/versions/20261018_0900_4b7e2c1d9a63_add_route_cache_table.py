@@ -0,0 +1,39 @@
+"""add_route_cache_table
+
+Revision ID: 4b7e2c1d9a63
+Revises: 28b88b632f48
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2c1d9a63'
+down_revision = '28b88b632f48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('route_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(), nullable=False),
+    sa.Column('origin', sa.String(), nullable=False),
+    sa.Column('destination', sa.String(), nullable=False),
+    sa.Column('alternatives', sa.Boolean(), nullable=False),
+    sa.Column('routes', sa.JSON(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_route_cache_id'), 'route_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_route_cache_cache_key'), 'route_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_route_cache_fetched_at'), 'route_cache', ['fetched_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_route_cache_fetched_at'), table_name='route_cache')
+    op.drop_index(op.f('ix_route_cache_cache_key'), table_name='route_cache')
+    op.drop_index(op.f('ix_route_cache_id'), table_name='route_cache')
+    op.drop_table('route_cache')
@@ -0,0 +1,24 @@
+"""add_trips_keyset_index
+
+Revision ID: 9d2f6a8c3e15
+Revises: 4b7e2c1d9a63
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2f6a8c3e15'
+down_revision = '4b7e2c1d9a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_trips_user_id_created_at_id', 'trips', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trips_user_id_created_at_id', table_name='trips')
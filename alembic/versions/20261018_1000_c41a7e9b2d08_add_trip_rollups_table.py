@@ -0,0 +1,50 @@
+"""add_trip_rollups_table
+
+Revision ID: c41a7e9b2d08
+Revises: 9d2f6a8c3e15
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a7e9b2d08'
+down_revision = '9d2f6a8c3e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('trip_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('trip_count', sa.Integer(), nullable=False),
+    sa.Column('distance_km', sa.Float(), nullable=False),
+    sa.Column('fuel_used_liters', sa.Float(), nullable=False),
+    sa.Column('fuel_cost', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'vehicle_id', 'month', name='uq_trip_rollups_user_vehicle_month')
+    )
+    op.create_index(op.f('ix_trip_rollups_id'), 'trip_rollups', ['id'], unique=False)
+
+    # Backfill from existing trips
+    if op.get_bind().dialect.name == 'postgresql':
+        month = "CAST(date_trunc('month', created_at) AS DATE)"
+    else:
+        month = "strftime('%Y-%m-01', created_at)"
+    op.execute(f"""
+        INSERT INTO trip_rollups (user_id, vehicle_id, month, trip_count, distance_km, fuel_used_liters, fuel_cost)
+        SELECT COALESCE(user_id, 0), vehicle_id, {month}, COUNT(id), SUM(distance_km), SUM(fuel_used_liters), SUM(fuel_cost)
+        FROM trips
+        WHERE created_at IS NOT NULL
+        GROUP BY COALESCE(user_id, 0), vehicle_id, {month}
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_trip_rollups_id'), table_name='trip_rollups')
+    op.drop_table('trip_rollups')
@@ -0,0 +1,30 @@
+"""add_geocode_cache_table
+
+Revision ID: 5a9c3f7e1b24
+Revises: e83b5f1a7c42
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9c3f7e1b24'
+down_revision = 'e83b5f1a7c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('geocode_cache',
+    sa.Column('address', sa.String(), nullable=False),
+    sa.Column('lat', sa.Float(), nullable=False),
+    sa.Column('lng', sa.Float(), nullable=False),
+    sa.Column('resolved_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('address')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('geocode_cache')
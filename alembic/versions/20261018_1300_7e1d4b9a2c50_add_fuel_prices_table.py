@@ -0,0 +1,38 @@
+"""add_fuel_prices_table
+
+Revision ID: 7e1d4b9a2c50
+Revises: 5a9c3f7e1b24
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1d4b9a2c50'
+down_revision = '5a9c3f7e1b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('fuel_prices',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fuel_type', sa.String(), nullable=False),
+    sa.Column('region', sa.String(), nullable=False),
+    sa.Column('price_per_liter', sa.Float(), nullable=False),
+    sa.Column('effective_from', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fuel_prices_id'), 'fuel_prices', ['id'], unique=False)
+    op.create_index('ix_fuel_prices_fuel_type_region_effective_from', 'fuel_prices', ['fuel_type', 'region', 'effective_from'], unique=True)
+    op.add_column('vehicles', sa.Column('region', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('vehicles', 'region')
+    op.drop_index('ix_fuel_prices_fuel_type_region_effective_from', table_name='fuel_prices')
+    op.drop_index(op.f('ix_fuel_prices_id'), table_name='fuel_prices')
+    op.drop_table('fuel_prices')
@@ -7,6 +7,20 @@ class Settings(BaseSettings):
     
     # Google Maps API
     google_maps_api_key: str
+    maps_routes_base_url: str = "https://routes.googleapis.com"
+    maps_timeout_seconds: float = 10.0
+    maps_http2: bool = True
+    maps_max_connections: int = 100
+    maps_max_keepalive_connections: int = 20
+    maps_keepalive_expiry_seconds: float = 30.0
+    maps_max_retries: int = 2
+    maps_retry_backoff_seconds: float = 0.2
+    maps_retry_backoff_max_seconds: float = 2.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_seconds: float = 30.0
+    routing_backend: str = "google"  # google or local (road graph from scripts/build_road_graph.py)
+    local_graph_path: str = "data/road_graph"
+    local_graph_max_snap_m: float = 2000.0
     
     # Database
     database_url: str
@@ -14,11 +28,55 @@ class Settings(BaseSettings):
     # Security
     secret_key: str
     registration_key: Optional[str] = None
+    # Token cache lifetime. Invalidation on user changes is per process, so
+    # other workers keep accepting a changed or deleted user's tokens for
+    # up to this long; keep it short
+    auth_cache_ttl_seconds: int = 30
+    auth_cache_max_entries: int = 10000
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
     
     # Application defaults
     fuel_price_default: float = 1.50
     cache_enabled: bool = False
+    route_cache_ttl_seconds: int = 900
+    route_cache_max_entries: int = 2048
+    route_cache_stale_seconds: int = 3600
+    route_cache_db_enabled: bool = False
+    route_cache_db_ttl_seconds: int = 86400
+    route_cache_purge_interval_seconds: int = 3600
+    route_cache_purge_batch_size: int = 1000
+    geocode_cache_enabled: bool = False
+    geocode_cache_max_entries: int = 10000
+    geocode_cache_ttl_seconds: int = 86400
+    batch_max_items: int = 2000
+    batch_max_concurrency: int = 10
+    matrix_max_elements: int = 2500
+    matrix_max_concurrency: int = 8
+    estimate_max_items: int = 1000
+    estimate_circuity_factor: float = 1.3
+    estimate_average_speed_kmh: float = 45.0
+    estimate_calibrate_on_startup: bool = True
+    estimate_calibration_trips: int = 5000
+    estimate_calibration_min_samples: int = 50
+    multi_stop_max_stops: int = 25
+    multi_stop_time_budget_ms: int = 500
+    fuel_price_index_enabled: bool = False
+    fuel_price_refresh_seconds: int = 300
+    fuel_price_recost_batch_size: int = 50000
+    export_batch_size: int = 1000
+    export_window_rows: int = 50000
+    import_chunk_size: int = 1000
+    import_max_errors: int = 1000
     rate_limit_enabled: bool = False
+    rate_limit_backend: str = "memory"  # memory (per worker) or database (shared)
+    maps_qps: float = 10.0
+    maps_burst: int = 20
+    maps_max_concurrent_requests: int = 20
+    maps_queue_timeout_seconds: float = 5.0
+    route_calculate_per_minute: int = 30
+    route_calculate_burst: int = 10
+    metrics_enabled: bool = True
     
     # Server
     host: str = "0.0.0.0"
@@ -1,13 +1,42 @@
+from typing import Any, Callable
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Result, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
 
+# Async drivers and the sync driver used for the same database by Alembic,
+# the create_all at startup and the threadpool-based services (import/export)
+ASYNC_DRIVERS = {
+    "asyncpg": "psycopg2",
+    "aiosqlite": "pysqlite",
+}
+
+
+def is_async_database_url(database_url: str) -> bool:
+    """Return True if the URL selects an async driver (e.g. postgresql+asyncpg://)."""
+    return make_url(database_url).get_driver_name() in ASYNC_DRIVERS
+
+
+def sync_database_url(database_url: str) -> str:
+    """Return the URL with an async driver replaced by its sync counterpart."""
+    url = make_url(database_url)
+    sync_driver = ASYNC_DRIVERS.get(url.get_driver_name())
+    if sync_driver is None:
+        return database_url
+    return url.set(drivername=f"{url.get_backend_name()}+{sync_driver}").render_as_string(hide_password=False)
+
+
 # Create database engine
 connect_args = {}
 engine_args = {
     "pool_pre_ping": True,
 }
+async_engine_args = {
+    "pool_pre_ping": True,
+}
 
 if "sqlite" in settings.database_url:
     connect_args["check_same_thread"] = False
@@ -15,15 +44,25 @@ if "sqlite" in settings.database_url:
 else:
     engine_args["pool_size"] = 10
     engine_args["max_overflow"] = 20
+    async_engine_args["pool_size"] = 10
+    async_engine_args["max_overflow"] = 20
 
 engine = create_engine(
-    settings.database_url,
+    sync_database_url(settings.database_url),
     **engine_args
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, only when database_url names an async driver
+async_engine = None
+AsyncSessionLocal = None
+if is_async_database_url(settings.database_url):
+    async_engine = create_async_engine(settings.database_url, **async_engine_args)
+    # Attributes cannot lazy-load on an AsyncSession, so keep them loaded after commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -35,3 +74,87 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class ThreadedSession:
+    """
+    AsyncSession-compatible wrapper around a sync Session.
+
+    Every call that may do I/O runs in the threadpool, so routers written
+    against AsyncSession also run on sync drivers without blocking the
+    event loop. Only the subset of the AsyncSession API the app uses is
+    provided.
+    """
+
+    def __init__(self, sync_session: Session):
+        """
+        Initialize the wrapper.
+
+        Args:
+            sync_session: Session to delegate to (should not expire on commit)
+        """
+        self.sync_session = sync_session
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement: Any, params: Any = None, **kwargs: Any) -> Result:
+        # Buffer the rows in the worker thread, like AsyncSession does
+        def execute_buffered():
+            return self.sync_session.execute(statement, params, **kwargs).freeze()()
+        return await run_in_threadpool(execute_buffered)
+
+    async def scalar(self, statement: Any, params: Any = None, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement: Any, params: Any = None, **kwargs: Any):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalars()
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn(sync_session, *args, **kwargs) in the threadpool."""
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+async def get_async_db():
+    """
+    Dependency for getting async database sessions.
+
+    Yields a native AsyncSession when database_url names an async driver
+    (postgresql+asyncpg, sqlite+aiosqlite), otherwise a ThreadedSession
+    over the sync engine with the same API.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = ThreadedSession(SessionLocal(expire_on_commit=False))
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,12 +1,27 @@
-from fastapi import Depends, HTTPException, status
+import math
+from typing import Callable, Optional, Type
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from app.database import get_db
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User
 from app.routers.auth import SECRET_KEY, ALGORITHM, oauth2_scheme
+from app.schemas.user import User as UserSchema
+from app.services.auth_cache import auth_cache
+from app.services.rate_limiter import RateLimitExceeded, calculate_rate_limiter
+
+# Same scheme as oauth2_scheme, but anonymous requests pass through with token None
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserSchema:
+    # Tokens are only cached after their signature was verified, and never past exp
+    cached_user = auth_cache.get(token)
+    if cached_user is not None:
+        return cached_user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -19,7 +34,91 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == username).first()
+    generation = auth_cache.generation
+    user = await db.scalar(select(User).where(User.email == username))
     if user is None:
         raise credentials_exception
-    return user
+    current_user = UserSchema.model_validate(user)
+    auth_cache.set(token, current_user, payload.get("exp"), generation)
+    return current_user
+
+
+async def get_optional_current_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[UserSchema]:
+    """The authenticated user, or None for anonymous requests; an invalid token is still a 401."""
+    if token is None:
+        return None
+    return await get_current_user(token, db)
+
+
+def retry_after_exception(error: Exception, status_code: int = status.HTTP_429_TOO_MANY_REQUESTS) -> HTTPException:
+    """Convert a refusal carrying retry_after (rate limit, open circuit) into an HTTP error with Retry-After."""
+    return HTTPException(
+        status_code=status_code,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+    )
+
+async def _route_calculation_client(request: Request, token: Optional[str], db: AsyncSession) -> str:
+    """Limiter key of the caller: the user when the token is valid, else the client IP."""
+    if token is not None:
+        try:
+            return f"user:{(await get_current_user(token, db)).id}"
+        except HTTPException:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def _charge_route_calculations(request: Request, token: Optional[str], db: AsyncSession, cost: int) -> None:
+    """Charge the caller cost units of the route calculation limit, raising 429 when over it."""
+    if not calculate_rate_limiter.enabled:
+        return
+    client_key = await _route_calculation_client(request, token, db)
+    try:
+        await calculate_rate_limiter.check(client_key, cost)
+    except RateLimitExceeded as e:
+        raise retry_after_exception(e)
+
+
+async def limit_route_calculations(
+    request: Request,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> None:
+    """Per-client inbound limit for route calculations: by user when authenticated, else by IP."""
+    await _charge_route_calculations(request, token, db, 1)
+
+
+def weighted_route_calculation_limit(schema: Type[BaseModel], weigh: Callable[[BaseModel], int]):
+    """
+    Build a limit_route_calculations variant that charges a request by its size.
+
+    Dependencies run before the endpoint's body is validated, so the JSON
+    body (parsed once and cached by Starlette) is validated against schema
+    here; a body that does not validate is charged 1, and FastAPI then
+    rejects it with 422.
+
+    Args:
+        schema: Request body model
+        weigh: Returns the units to charge, e.g. the route lookups the
+            request fans out to
+
+    Returns:
+        Dependency for the route's dependencies list
+    """
+    async def limit_weighted_route_calculations(
+        request: Request,
+        token: Optional[str] = Depends(optional_oauth2_scheme),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> None:
+        if not calculate_rate_limiter.enabled:
+            return
+        try:
+            cost = weigh(schema.model_validate(await request.json()))
+        except ValueError:
+            cost = 1
+        await _charge_route_calculations(request, token, db, cost)
+
+    return limit_weighted_route_calculations
@@ -1,12 +1,25 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
-from app.database import engine, Base
-from app.models import User, Vehicle, Trip  # Import all models to ensure they are registered
-from app.routers import vehicles, routes, trips, auth
+from app.database import engine, async_engine, Base, SessionLocal
+from app.models import User, Vehicle, Trip, RouteCacheEntry, TripRollup, RateLimitBucket, GeocodeCacheEntry, FuelPrice  # Import all models to ensure they are registered
+from app.routers import vehicles, routes, trips, auth, analytics, fuel_prices
+from app.config import settings
+from app.services.maps_client import maps_client
+from app.services.road_graph import local_routing_engine
+from app.services.route_estimator import route_estimator
+from app.services.fuel_prices import fuel_price_index
+from app.services.auth_cache import auth_cache
+from app.services.password_hasher import password_hasher
+from app.services.route_cache import route_cache, persistent_route_cache
+from app.services.geocode_cache import geocode_cache
+from app.services.single_flight import route_single_flight
+from app.services.rate_limiter import maps_governor, calculate_rate_limiter
+from app.services.metrics import CONTENT_TYPE, MetricFamily, MetricsMiddleware, instrument_engine, metrics_registry
 
 # Configure logging
 logging.basicConfig(
@@ -16,6 +29,28 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def calibrate_route_estimator() -> None:
+    """Fit the route estimator to trip history; keep the configured factors on failure."""
+    try:
+        with SessionLocal() as db:
+            route_estimator.calibrate(
+                db,
+                limit=settings.estimate_calibration_trips,
+                min_samples=settings.estimate_calibration_min_samples
+            )
+    except Exception as e:
+        logger.warning(f"Route estimator calibration failed: {str(e)}")
+
+
+def load_fuel_prices() -> None:
+    """Load current fuel prices; vehicles keep their own fuel_price on failure."""
+    try:
+        loaded = fuel_price_index.refresh()
+        logger.info(f"Loaded {loaded} current fuel prices")
+    except Exception as e:
+        logger.warning(f"Fuel price load failed: {str(e)}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
@@ -25,9 +60,29 @@ async def lifespan(app: FastAPI):
     logger.info("Ensuring database tables exist...")
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables verified.")
+    if settings.estimate_calibrate_on_startup:
+        await asyncio.to_thread(calibrate_route_estimator)
+    await maps_client.open()
+    purge_task = None
+    if settings.route_cache_db_enabled:
+        purge_task = asyncio.create_task(
+            persistent_route_cache.purge_periodically(settings.route_cache_purge_interval_seconds)
+        )
+    fuel_price_task = None
+    if settings.fuel_price_index_enabled:
+        await asyncio.to_thread(load_fuel_prices)
+        fuel_price_task = asyncio.create_task(
+            fuel_price_index.refresh_periodically(settings.fuel_price_refresh_seconds)
+        )
     yield
     # Shutdown
     logger.info("Shutting down application...")
+    if purge_task is not None:
+        purge_task.cancel()
+    if fuel_price_task is not None:
+        fuel_price_task.cancel()
+    await maps_client.close()
+    password_hasher.shutdown()
 
 
 # Create FastAPI application
@@ -47,11 +102,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.metrics_enabled:
+    # Added last so it is outermost and times the whole request
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine, "sync")
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine, "async")
+
 # Include routers with /api prefix
 app.include_router(auth.router, prefix="/api")
 app.include_router(vehicles.router, prefix="/api")
 app.include_router(routes.router, prefix="/api")
 app.include_router(trips.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(fuel_prices.router, prefix="/api")
+
+
+def collect_service_metrics():
+    """Expose the caches', Maps client's and governor's stats() counters as metrics."""
+    caches = {
+        "auth": auth_cache.stats(),
+        "routes": route_cache.stats(),
+        "routes_db": persistent_route_cache.stats(),
+        "geocode": geocode_cache.stats()
+    }
+    hits = MetricFamily("cache_hits_total", "Cache hits", "counter", ("cache",))
+    misses = MetricFamily("cache_misses_total", "Cache misses", "counter", ("cache",))
+    hit_ratio = MetricFamily("cache_hit_ratio", "Cache hits / lookups since start", "gauge", ("cache",))
+    for name, stats in caches.items():
+        hits.add(stats['hits'], name)
+        misses.add(stats['misses'], name)
+        hit_ratio.add(stats['hit_ratio'], name)
+
+    maps = maps_client.stats()
+    breaker = maps['circuit_breaker']
+    governor = maps_governor.stats()
+    return [
+        hits,
+        misses,
+        hit_ratio,
+        MetricFamily("maps_retries_total", "Routes API attempts that were retries", "counter").add(maps['retries']),
+        MetricFamily("maps_failures_total", "Routes API calls that failed after retries", "counter").add(maps['failures']),
+        MetricFamily("maps_circuit_open", "1 while the Routes API circuit breaker is open or half-open").add(
+            0 if breaker['state'] == "closed" else 1
+        ),
+        MetricFamily("maps_short_circuited_total", "Routes API calls refused by the open circuit", "counter").add(
+            breaker['short_circuited']
+        ),
+        MetricFamily("maps_governor_in_flight", "Routes API requests in flight").add(governor['in_flight']),
+        MetricFamily("maps_governor_rejected_total", "Routes API requests refused by the outbound rate limit", "counter").add(
+            governor['rejected']
+        ),
+        MetricFamily("route_single_flight_coalesced_total", "Route lookups that joined an identical in-flight lookup", "counter").add(
+            route_single_flight.stats()['coalesced']
+        )
+    ]
+
+
+if settings.metrics_enabled:
+    metrics_registry.register_collector(collect_service_metrics)
+
+    # Registered before the SPA catch-all below, which would otherwise serve it
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus metrics for this worker process."""
+        return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
 
 # Mount static files (after API routes)
 from fastapi.staticfiles import StaticFiles
@@ -84,6 +199,48 @@ def health_check():
     }
 
 
+@app.get("/health/caches", tags=["health"])
+def cache_stats():
+    """Hit/miss counters of the in-process caches, for monitoring."""
+    return {
+        "auth": auth_cache.stats(),
+        "routes": route_cache.stats(),
+        "routes_db": persistent_route_cache.stats(),
+        "geocode": geocode_cache.stats(),
+        "route_single_flight": route_single_flight.stats(),
+        "fuel_prices": fuel_price_index.stats()
+    }
+
+
+@app.get("/health/rate-limits", tags=["health"])
+def rate_limit_stats():
+    """Admission counters of the outbound Maps governor and inbound limiters."""
+    return {
+        "backend": settings.rate_limit_backend,
+        "maps": maps_governor.stats(),
+        "route_calculate": calculate_rate_limiter.stats()
+    }
+
+
+@app.get("/health/maps", tags=["health"])
+def maps_stats():
+    """Routes API attempt, retry and failure counters and circuit breaker state."""
+    return maps_client.stats()
+
+
+@app.get("/health/routing", tags=["health"])
+def routing_stats():
+    """Default routing backend, local road graph status and route estimate factors."""
+    local = local_routing_engine.stats()
+    return {
+        "backend": settings.routing_backend,
+        # The default backend cannot serve routes until the graph is built
+        "status": "unavailable" if settings.routing_backend == "local" and not local['available'] else "ok",
+        "local": local,
+        "estimates": route_estimator.stats()
+    }
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unhandled errors."""
@@ -2,5 +2,10 @@
 from app.models.vehicle import Vehicle
 from app.models.trip import Trip
 from app.models.user import User
+from app.models.route_cache import RouteCacheEntry
+from app.models.trip_rollup import TripRollup
+from app.models.rate_limit import RateLimitBucket
+from app.models.geocode_cache import GeocodeCacheEntry
+from app.models.fuel_price import FuelPrice
 
-__all__ = ["Vehicle", "Trip", "User"]
+__all__ = ["Vehicle", "Trip", "User", "RouteCacheEntry", "TripRollup", "RateLimitBucket", "GeocodeCacheEntry", "FuelPrice"]
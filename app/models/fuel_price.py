@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String
+from app.database import Base
+
+# Region of the prices used for vehicles without a region, and for regions
+# that have no price of their own
+DEFAULT_REGION = "default"
+
+
+class FuelPrice(Base):
+    """Fuel price per liter for a fuel type and region, effective from a point in time."""
+    
+    __tablename__ = "fuel_prices"
+    __table_args__ = (
+        # As-of lookups seek the latest effective_from <= t for a fuel type and region
+        Index("ix_fuel_prices_fuel_type_region_effective_from", "fuel_type", "region", "effective_from", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    fuel_type = Column(String, nullable=False)  # matches vehicles.fuel_type
+    region = Column(String, nullable=False, default=DEFAULT_REGION)
+    price_per_liter = Column(Float, nullable=False)
+    effective_from = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<FuelPrice(fuel_type='{self.fuel_type}', region='{self.region}', effective_from={self.effective_from})>"
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, String
+from app.database import Base
+
+
+class GeocodeCacheEntry(Base):
+    """Coordinates of a canonical address, learned from Routes API responses."""
+    
+    __tablename__ = "geocode_cache"
+    
+    address = Column(String, primary_key=True)  # canonicalized, see app.services.geocode_cache
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    resolved_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<GeocodeCacheEntry(address='{self.address}', lat={self.lat}, lng={self.lng})>"
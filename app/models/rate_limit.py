@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Float, String
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket state shared by all workers when the database rate limit backend is used."""
+    
+    __tablename__ = "rate_limit_buckets"
+    
+    key = Column(String, primary_key=True)  # e.g. "maps" or "calculate:user:42"
+    # Theoretical arrival time (Unix seconds) of the next request under the bucket's rate
+    tat = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<RateLimitBucket(key='{self.key}', tat={self.tat})>"
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON
+from app.database import Base
+
+
+class RouteCacheEntry(Base):
+    """Route cache model for sharing Routes API results across workers and restarts."""
+    
+    __tablename__ = "route_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, nullable=False, unique=True, index=True)
+    origin = Column(String, nullable=False)  # normalized
+    destination = Column(String, nullable=False)  # normalized
+    alternatives = Column(Boolean, nullable=False, default=False)
+    routes = Column(JSON, nullable=False)  # parsed route list from GoogleMapsClient.get_directions
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<RouteCacheEntry(id={self.id}, origin='{self.origin}', destination='{self.destination}')>"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -8,6 +8,10 @@ class Trip(Base):
     """Trip model for storing route calculation history."""
     
     __tablename__ = "trips"
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id) within a user's trips
+        Index("ix_trips_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, Date, UniqueConstraint
+from app.database import Base
+
+
+class TripRollup(Base):
+    """Per user, vehicle and month trip totals, maintained incrementally as trips change."""
+    
+    __tablename__ = "trip_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "vehicle_id", "month", name="uq_trip_rollups_user_vehicle_month"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)  # 0 for trips saved without a user
+    vehicle_id = Column(Integer, nullable=False)
+    month = Column(Date, nullable=False)  # first day of the month
+    trip_count = Column(Integer, nullable=False, default=0)
+    distance_km = Column(Float, nullable=False, default=0.0)
+    fuel_used_liters = Column(Float, nullable=False, default=0.0)
+    fuel_cost = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<TripRollup(user_id={self.user_id}, vehicle_id={self.vehicle_id}, month={self.month})>"
@@ -13,6 +13,7 @@ class Vehicle(Base):
     fuel_type = Column(String, nullable=False)  # petrol, diesel, electric, hybrid
     fuel_consumption = Column(Float, nullable=False)  # liters per 100km
     fuel_price = Column(Float, nullable=False)  # price per liter
+    region = Column(String, nullable=True)  # fuel price region; NULL uses the default region
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
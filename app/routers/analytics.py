@@ -0,0 +1,93 @@
+from datetime import date
+from enum import Enum
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.database import get_async_db
+from app.models.trip_rollup import TripRollup
+from app.schemas.analytics import TripAnalyticsResponse, TripTotals
+from app.dependencies import get_current_user
+from app.services.trip_rollups import month_start
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+class TripGrouping(str, Enum):
+    """Supported analytics groupings."""
+    month = "month"
+    vehicle = "vehicle"
+    vehicle_month = "vehicle_month"
+
+
+def _totals(row) -> dict:
+    """Round summed totals for display."""
+    return {
+        'trip_count': row.trip_count,
+        'distance_km': round(row.distance_km, 2),
+        'fuel_used_liters': round(row.fuel_used_liters, 2),
+        'fuel_cost': round(row.fuel_cost, 2)
+    }
+
+
+@router.get("/trips", response_model=TripAnalyticsResponse)
+async def trip_analytics(
+    group_by: TripGrouping = Query(TripGrouping.month, description="How to group the totals"),
+    start: Optional[date] = Query(None, description="Include months from the one containing this date"),
+    end: Optional[date] = Query(None, description="Include months up to the one containing this date"),
+    vehicle_id: Optional[int] = Query(None, description="Only include this vehicle"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Distance, fuel and cost totals for the user's trips.
+    
+    Computed with GROUP BY over the incrementally maintained trip_rollups
+    table, so the cost depends on the number of buckets, not trips.
+    Totals are always the caller's own; trips calculated anonymously
+    (saved without a user) are not included.
+    """
+    filters = [TripRollup.user_id == current_user.id]
+    if start is not None:
+        filters.append(TripRollup.month >= month_start(start))
+    if end is not None:
+        filters.append(TripRollup.month <= month_start(end))
+    if vehicle_id is not None:
+        filters.append(TripRollup.vehicle_id == vehicle_id)
+    
+    group_columns = {
+        TripGrouping.month: [TripRollup.month],
+        TripGrouping.vehicle: [TripRollup.vehicle_id],
+        TripGrouping.vehicle_month: [TripRollup.vehicle_id, TripRollup.month],
+    }[group_by]
+    sums = [
+        func.sum(TripRollup.trip_count).label("trip_count"),
+        func.sum(TripRollup.distance_km).label("distance_km"),
+        func.sum(TripRollup.fuel_used_liters).label("fuel_used_liters"),
+        func.sum(TripRollup.fuel_cost).label("fuel_cost"),
+    ]
+    
+    rows = (await db.execute(
+        select(*group_columns, *sums)
+        .where(*filters)
+        .group_by(*group_columns)
+        .having(func.sum(TripRollup.trip_count) > 0)
+        .order_by(*group_columns)
+    )).all()
+    
+    buckets = [
+        TripTotals(
+            vehicle_id=getattr(row, 'vehicle_id', None),
+            month=getattr(row, 'month', None),
+            **_totals(row)
+        )
+        for row in rows
+    ]
+    totals = TripTotals(
+        trip_count=sum(bucket.trip_count for bucket in buckets),
+        distance_km=round(sum(bucket.distance_km for bucket in buckets), 2),
+        fuel_used_liters=round(sum(bucket.fuel_used_liters for bucket in buckets), 2),
+        fuel_cost=round(sum(bucket.fuel_cost for bucket in buckets), 2)
+    )
+    
+    return TripAnalyticsResponse(group_by=group_by.value, buckets=buckets, totals=totals)
@@ -0,0 +1,50 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db
+from app.models.fuel_price import DEFAULT_REGION, FuelPrice
+from app.schemas.fuel_price import FuelPriceAsOfResponse, FuelPriceResponse
+from app.dependencies import get_current_user
+from app.services.fuel_prices import as_of_price
+
+router = APIRouter(prefix="/fuel-prices", tags=["fuel prices"])
+
+
+@router.get("/", response_model=List[FuelPriceResponse])
+async def list_fuel_prices(
+    fuel_type: Optional[str] = Query(None, description="Only this fuel type"),
+    region: Optional[str] = Query(None, description="Only this region"),
+    limit: int = Query(100, ge=1, le=1000, description="Most recent prices to return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    List fuel prices, most recent first.
+    
+    Prices are loaded with scripts/import_fuel_prices.py.
+    """
+    query = select(FuelPrice).order_by(FuelPrice.effective_from.desc(), FuelPrice.id.desc()).limit(limit)
+    if fuel_type is not None:
+        query = query.where(FuelPrice.fuel_type == fuel_type)
+    if region is not None:
+        query = query.where(FuelPrice.region == region)
+    prices = await db.scalars(query)
+    return prices.all()
+
+
+@router.get("/as-of", response_model=FuelPriceAsOfResponse)
+async def fuel_price_as_of(
+    fuel_type: str = Query(..., description="Fuel type, e.g. diesel"),
+    region: str = Query(DEFAULT_REGION, description="Region; falls back to the default region's prices"),
+    at: Optional[datetime] = Query(None, description="Moment to look up (UTC); defaults to now"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Look up the fuel price in effect at a moment.
+    """
+    at = at or datetime.utcnow()
+    price = await db.scalar(select(as_of_price(fuel_type, region, at)))
+    return FuelPriceAsOfResponse(fuel_type=fuel_type, region=region, at=at, price_per_liter=price)
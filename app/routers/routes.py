@@ -1,32 +1,160 @@
+import asyncio
+import time
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Any, Dict, List
+from app.config import settings
+from app.database import get_async_db
+from app.dependencies import (
+    get_current_user,
+    get_optional_current_user,
+    limit_route_calculations,
+    retry_after_exception,
+    weighted_route_calculation_limit,
+)
 from app.models.vehicle import Vehicle
 from app.models.trip import Trip
-from app.schemas.route import RouteRequest, RouteResponse, RouteOption
+from app.schemas.route import (
+    RouteRequest,
+    RouteResponse,
+    RouteOption,
+    BatchRouteRequest,
+    BatchRouteResponse,
+    BatchRouteResult,
+    FleetComparisonRequest,
+    FleetComparisonResponse,
+    RouteSummary,
+    VehicleRouteCost,
+    RouteMatrixRequest,
+    RouteMatrixResponse,
+    RouteEstimateRequest,
+    RouteEstimateResponse,
+    RouteEstimate,
+    MultiStopRequest,
+    MultiStopLeg,
+    MultiStopResponse,
+)
 from app.services.route_calculator import route_calculator
+from app.services.route_cache import make_route_key
+from app.services.route_matrix import route_matrix_service
+from app.services.route_estimator import route_estimator, parse_coordinates
+from app.services.stop_optimizer import stop_optimizer
+from app.services.polyline import shape_polyline
+from app.services.trip_rollups import trip_rollup_service
 from app.services.cost_estimator import cost_estimator
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.maps_client import MapsApiError
+from app.services.road_graph import LocalGraphUnavailableError, LocalRoutingError
 
 router = APIRouter(prefix="/routes", tags=["routes"])
 
 
-@router.post("/calculate", response_model=RouteResponse)
-def calculate_route(route_request: RouteRequest, db: Session = Depends(get_db)):
+async def _get_vehicle(db: AsyncSession, vehicle_id: int) -> Vehicle | None:
+    """Fetch a vehicle by ID."""
+    return await db.scalar(select(Vehicle).where(Vehicle.id == vehicle_id))
+
+
+def _route_lookup_error(error: Exception, action: str) -> HTTPException:
+    """
+    Map a failed route lookup to an HTTP error.
+    
+    Quota and circuit breaker refusals are 503 with Retry-After, a local
+    road graph that has not been built is 503, Routes API failures are 502,
+    locations the Routes API finds no route between or the local road graph
+    cannot route are 422, anything else is a 500.
+    """
+    if isinstance(error, (RateLimitExceeded, CircuitOpenError)):
+        return retry_after_exception(error, status.HTTP_503_SERVICE_UNAVAILABLE)
+    if isinstance(error, LocalGraphUnavailableError):
+        return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Error {action}: {str(error)}")
+    if isinstance(error, LocalRoutingError) or (isinstance(error, MapsApiError) and error.status_code == 404):
+        return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Error {action}: {str(error)}")
+    if isinstance(error, MapsApiError):
+        return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Error {action}: {str(error)}")
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error {action}: {str(error)}")
+
+
+def _grid_to_list(grid: np.ndarray) -> List[List[float | None]]:
+    """Convert a matrix to nested lists with NaN cells as None."""
+    return [[None if np.isnan(value) else value for value in row] for row in grid.tolist()]
+
+
+async def _get_user_vehicle(db: AsyncSession, user_id: int, vehicle_id: int) -> Vehicle | None:
+    """Fetch one of the user's vehicles by ID."""
+    return await db.scalar(select(Vehicle).where(Vehicle.id == vehicle_id, Vehicle.user_id == user_id))
+
+
+async def _get_user_vehicles(db: AsyncSession, user_id: int, vehicle_ids: List[int] | None) -> List[Vehicle]:
+    """Fetch the user's vehicles, optionally restricted to the given IDs."""
+    query = select(Vehicle).where(Vehicle.user_id == user_id)
+    if vehicle_ids is not None:
+        query = query.where(Vehicle.id.in_(vehicle_ids))
+    return (await db.scalars(query.order_by(Vehicle.id))).all()
+
+
+def _save_trip(db: Session, trip: Trip) -> int:
+    """Persist a trip and return its ID (run through AsyncSession.run_sync)."""
+    db.add(trip)
+    db.flush()
+    trip_rollup_service.record_trip(db, trip)
+    db.commit()
+    db.refresh(trip)
+    return trip.id
+
+
+def _save_trips_bulk(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert many trips in one executemany and return their IDs in input order.
+    
+    Runs through AsyncSession.run_sync, which hands it the sync session.
+    """
+    if not rows:
+        return []
+    trip_ids = db.scalars(
+        insert(Trip).returning(Trip.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    trip_rollup_service.record_trips(db, rows)
+    db.commit()
+    return list(trip_ids)
+
+
+@router.post("/calculate", response_model=RouteResponse, dependencies=[Depends(limit_route_calculations)])
+async def calculate_route(
+    route_request: RouteRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_optional_current_user)
+):
     """
     Calculate route with fuel consumption and cost estimation.
     
+    With a bearer token the vehicle must be one of the user's and the
+    saved trip belongs to the user (and counts in their analytics).
+    Anonymous calculations are saved without a user and appear in no
+    user's trip history or analytics.
+    
     Args:
         route_request: Route calculation parameters
         db: Database session
+        current_user: Authenticated user, or None for anonymous requests
         
     Returns:
         Route options with cost estimates
         
     Raises:
-        HTTPException: If vehicle not found or route calculation fails
+        HTTPException: If vehicle not found, the token is invalid (401),
+            the client is over its rate limit (429), the Maps quota is
+            exhausted (503) or route calculation fails
     """
-    # Fetch vehicle
-    vehicle = db.query(Vehicle).filter(Vehicle.id == route_request.vehicle_id).first()
+    if current_user is not None:
+        vehicle = await _get_user_vehicle(db, current_user.id, route_request.vehicle_id)
+    else:
+        vehicle = await _get_vehicle(db, route_request.vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -35,10 +163,12 @@ def calculate_route(route_request: RouteRequest, db: Session = Depends(get_db)):
     
     try:
         # Calculate routes
-        routes = route_calculator.calculate_routes(
+        routes = await route_calculator.calculate_routes(
             origin=route_request.origin,
             destination=route_request.destination,
-            alternatives=route_request.alternatives
+            alternatives=route_request.alternatives,
+            use_cache=route_request.use_cache,
+            backend=route_request.backend
         )
         
         # Process each route and calculate costs
@@ -59,7 +189,12 @@ def calculate_route(route_request: RouteRequest, db: Session = Depends(get_db)):
                 fuel_used_liters=cost_data['fuel_used_liters'],
                 fuel_cost=cost_data['fuel_cost'],
                 route_type=route['route_type'],
-                polyline=route['polyline']
+                polyline=shape_polyline(
+                    route['polyline'],
+                    include=route_request.include_polyline,
+                    tolerance_m=route_request.polyline_tolerance_m,
+                    zoom=route_request.polyline_zoom
+                )
             )
             route_options.append(route_option)
             
@@ -73,23 +208,533 @@ def calculate_route(route_request: RouteRequest, db: Session = Depends(get_db)):
                     duration_minutes=route['duration_minutes'],
                     fuel_used_liters=cost_data['fuel_used_liters'],
                     fuel_cost=cost_data['fuel_cost'],
-                    route_type=route['route_type']
+                    route_type=route['route_type'],
+                    user_id=current_user.id if current_user is not None else None
                 )
-                db.add(trip)
-                db.commit()
-                db.refresh(trip)
-                saved_trip_id = trip.id
+                saved_trip_id = await db.run_sync(_save_trip, trip)
         
         return RouteResponse(
             origin=route_request.origin,
             destination=route_request.destination,
             vehicle_id=vehicle.id,
             routes=route_options,
-            trip_id=saved_trip_id
+            trip_id=saved_trip_id,
+            stale=any(route['stale'] for route in routes)
         )
         
+    except Exception as e:
+        raise _route_lookup_error(e, "calculating route")
+
+
+def _batch_lookups(batch_request: BatchRouteRequest) -> int:
+    """Number of distinct route lookups a batch fans out to."""
+    return len({
+        make_route_key(item.origin, item.destination, batch_request.alternatives)
+        for item in batch_request.items
+    })
+
+
+@router.post(
+    "/calculate/batch",
+    response_model=BatchRouteResponse,
+    dependencies=[Depends(weighted_route_calculation_limit(BatchRouteRequest, _batch_lookups))]
+)
+async def calculate_routes_batch(
+    batch_request: BatchRouteRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Calculate routes and costs for many origin/destination pairs at once.
+    
+    Identical pairs are looked up once, lookups run concurrently up to
+    the configured limit, and the primary route of every successful item
+    is saved as a trip of the user in a single bulk insert. Failed items
+    are reported individually without failing the batch. The per-client
+    route calculation limit is charged once per distinct pair.
+    
+    Args:
+        batch_request: Batch calculation parameters
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Per-item route options, cost estimates and trip IDs
+        
+    Raises:
+        HTTPException: If the batch is too large, the client is over its
+            rate limit (429) or the vehicle is not one of the user's
+    """
+    if len(batch_request.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Batch contains {len(batch_request.items)} items; the maximum is {settings.batch_max_items}"
+        )
+    
+    vehicle = await _get_user_vehicle(db, current_user.id, batch_request.vehicle_id)
+    if not vehicle:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Vehicle with id {batch_request.vehicle_id} not found"
+        )
+    
+    routes_by_key = await route_calculator.calculate_routes_batch(
+        pairs=((item.origin, item.destination) for item in batch_request.items),
+        alternatives=batch_request.alternatives,
+        use_cache=batch_request.use_cache,
+        max_concurrency=settings.batch_max_concurrency,
+        backend=batch_request.backend
+    )
+    
+    results = []
+    trip_rows = []
+    created_at = datetime.utcnow()
+    trip_result_indexes = []
+    
+    for index, item in enumerate(batch_request.items):
+        result = BatchRouteResult(index=index, origin=item.origin, destination=item.destination)
+        results.append(result)
+        
+        routes = routes_by_key[make_route_key(item.origin, item.destination, batch_request.alternatives)]
+        if isinstance(routes, Exception):
+            result.error = f"Error calculating route: {str(routes)}"
+            continue
+        result.stale = any(route['stale'] for route in routes)
+        
+        for idx, route in enumerate(routes):
+            cost_data = cost_estimator.estimate_trip_cost(
+                distance_km=route['distance_km'],
+                vehicle=vehicle
+            )
+            result.routes.append(RouteOption(
+                distance_km=route['distance_km'],
+                duration_minutes=route['duration_minutes'],
+                fuel_used_liters=cost_data['fuel_used_liters'],
+                fuel_cost=cost_data['fuel_cost'],
+                route_type=route['route_type'],
+                polyline=shape_polyline(
+                    route['polyline'],
+                    include=batch_request.include_polyline,
+                    tolerance_m=batch_request.polyline_tolerance_m,
+                    zoom=batch_request.polyline_zoom
+                )
+            ))
+            
+            # Save only the primary (first) route of each item
+            if idx == 0:
+                trip_rows.append({
+                    'vehicle_id': vehicle.id,
+                    'user_id': current_user.id,
+                    'created_at': created_at,
+                    'origin': route['start_address'],
+                    'destination': route['end_address'],
+                    'distance_km': route['distance_km'],
+                    'duration_minutes': route['duration_minutes'],
+                    'fuel_used_liters': cost_data['fuel_used_liters'],
+                    'fuel_cost': cost_data['fuel_cost'],
+                    'route_type': route['route_type']
+                })
+                trip_result_indexes.append(index)
+    
+    try:
+        trip_ids = await db.run_sync(_save_trips_bulk, trip_rows)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error calculating route: {str(e)}"
+            detail=f"Error saving trips: {str(e)}"
+        )
+    for index, trip_id in zip(trip_result_indexes, trip_ids):
+        results[index].trip_id = trip_id
+    
+    failed = sum(1 for result in results if result.error is not None)
+    return BatchRouteResponse(
+        vehicle_id=vehicle.id,
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed,
+        unique_routes=len(routes_by_key)
+    )
+
+
+@router.post("/compare", response_model=FleetComparisonResponse, dependencies=[Depends(limit_route_calculations)])
+async def compare_vehicles(
+    comparison_request: FleetComparisonRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Compare the cost of a route across several of the user's vehicles.
+    
+    The routes are fetched once and costed for every vehicle in a single
+    vectorized pass. Nothing is saved to trip history.
+    
+    Args:
+        comparison_request: Route and vehicle selection
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Routes and a vehicles x routes cost table sorted by cost
+        
+    Raises:
+        HTTPException: If a vehicle is not found or route calculation fails
+    """
+    vehicle_ids = comparison_request.vehicle_ids
+    if vehicle_ids is not None:
+        vehicle_ids = list(dict.fromkeys(vehicle_ids))
+    vehicles = await _get_user_vehicles(db, current_user.id, vehicle_ids)
+    
+    if vehicle_ids is not None:
+        missing = sorted(set(vehicle_ids) - {vehicle.id for vehicle in vehicles})
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vehicles with ids {missing} not found"
+            )
+    if not vehicles:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No vehicles found to compare"
+        )
+    
+    try:
+        routes = await route_calculator.calculate_routes(
+            origin=comparison_request.origin,
+            destination=comparison_request.destination,
+            alternatives=comparison_request.alternatives,
+            use_cache=comparison_request.use_cache,
+            backend=comparison_request.backend
+        )
+    except Exception as e:
+        raise _route_lookup_error(e, "calculating route")
+    
+    consumptions, prices = cost_estimator.vehicle_profiles(vehicles)
+    matrix = cost_estimator.estimate_cost_matrix(
+        distances_km=[route['distance_km'] for route in routes],
+        fuel_consumptions=consumptions,
+        fuel_prices=prices
+    )
+    fuel_used = matrix['fuel_used_liters'].tolist()
+    fuel_cost = matrix['fuel_cost'].tolist()
+    
+    costs = [
+        VehicleRouteCost(
+            vehicle_id=vehicle.id,
+            vehicle_name=vehicle.name,
+            fuel_type=vehicle.fuel_type,
+            route_index=route_index,
+            route_type=route['route_type'],
+            distance_km=route['distance_km'],
+            duration_minutes=route['duration_minutes'],
+            fuel_used_liters=fuel_used[vehicle_index][route_index],
+            fuel_cost=fuel_cost[vehicle_index][route_index]
         )
+        for vehicle_index, vehicle in enumerate(vehicles)
+        for route_index, route in enumerate(routes)
+    ]
+    costs.sort(key=lambda cost: (cost.fuel_cost, cost.duration_minutes))
+    
+    return FleetComparisonResponse(
+        origin=comparison_request.origin,
+        destination=comparison_request.destination,
+        routes=[
+            RouteSummary(
+                route_index=route_index,
+                route_type=route['route_type'],
+                distance_km=route['distance_km'],
+                duration_minutes=route['duration_minutes'],
+                polyline=route['polyline']
+            )
+            for route_index, route in enumerate(routes)
+        ],
+        costs=costs,
+        cheapest=costs[0] if costs else None,
+        stale=any(route['stale'] for route in routes)
+    )
+
+
+def _matrix_elements(matrix_request: RouteMatrixRequest) -> int:
+    """Number of origin/destination elements a matrix request fetches."""
+    return len(matrix_request.origins) * len(matrix_request.destinations)
+
+
+@router.post(
+    "/matrix",
+    response_model=RouteMatrixResponse,
+    dependencies=[Depends(weighted_route_calculation_limit(RouteMatrixRequest, _matrix_elements))]
+)
+async def calculate_route_matrix(
+    matrix_request: RouteMatrixRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Calculate a dense origin x destination distance/duration grid.
+    
+    Uses the Routes API route matrix, split into tiles within the API
+    limits and fetched concurrently. When a vehicle is given, fuel use and
+    cost grids are included. Nothing is saved to trip history.
+    
+    Args:
+        matrix_request: Origins, destinations and optional vehicle
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Distance, duration and (optionally) cost grids
+        
+    Raises:
+        HTTPException: If the matrix is too large, the vehicle is not one
+            of the user's or the matrix calculation fails
+    """
+    elements = len(matrix_request.origins) * len(matrix_request.destinations)
+    if elements > settings.matrix_max_elements:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Matrix has {elements} elements; the maximum is {settings.matrix_max_elements}"
+        )
+    
+    vehicle = None
+    if matrix_request.vehicle_id is not None:
+        vehicle = await _get_user_vehicle(db, current_user.id, matrix_request.vehicle_id)
+        if not vehicle:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vehicle with id {matrix_request.vehicle_id} not found"
+            )
+    
+    try:
+        matrix = await route_matrix_service.compute_matrix(
+            origins=matrix_request.origins,
+            destinations=matrix_request.destinations,
+            max_concurrency=settings.matrix_max_concurrency
+        )
+    except Exception as e:
+        raise _route_lookup_error(e, "calculating route matrix")
+    
+    response = RouteMatrixResponse(
+        origins=matrix_request.origins,
+        destinations=matrix_request.destinations,
+        distance_km=_grid_to_list(matrix['distance_km']),
+        duration_minutes=_grid_to_list(matrix['duration_minutes']),
+        tiles=matrix['tiles']
+    )
+    
+    if vehicle is not None:
+        distances = matrix['distance_km']
+        costs = cost_estimator.estimate_cost_matrix(
+            distances_km=distances.ravel(),
+            fuel_consumptions=[vehicle.fuel_consumption],
+            fuel_prices=[cost_estimator.fuel_price(vehicle)]
+        )
+        response.vehicle_id = vehicle.id
+        response.fuel_used_liters = _grid_to_list(costs['fuel_used_liters'].reshape(distances.shape))
+        response.fuel_cost = _grid_to_list(costs['fuel_cost'].reshape(distances.shape))
+    
+    return response
+
+
+@router.post("/estimate", response_model=RouteEstimateResponse)
+async def estimate_routes(
+    estimate_request: RouteEstimateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Quote approximate route costs from coordinates without routing.
+    
+    Meant for live prices while a user is still editing a booking: the
+    road distance is the great-circle distance times a circuity factor
+    (calibrated from trip history), computed for all items at once. No
+    routing backend is called and nothing is saved to trip history.
+    
+    Args:
+        estimate_request: Vehicle and origin/destination coordinate pairs
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Estimated distance, duration and cost per item, flagged approximate
+        
+    Raises:
+        HTTPException: If there are too many items, a location is not
+            "lat,lng" coordinates (422), or the vehicle is not one of the user's
+    """
+    if len(estimate_request.items) > settings.estimate_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Request contains {len(estimate_request.items)} items; the maximum is {settings.estimate_max_items}"
+        )
+    
+    origins, invalid_origins = parse_coordinates([item.origin for item in estimate_request.items])
+    destinations, invalid_destinations = parse_coordinates([item.destination for item in estimate_request.items])
+    invalid = sorted(set(invalid_origins) | set(invalid_destinations))
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Estimates need 'lat,lng' coordinates; items {invalid[:10]} are not"
+        )
+    
+    vehicle = await _get_user_vehicle(db, current_user.id, estimate_request.vehicle_id)
+    if not vehicle:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Vehicle with id {estimate_request.vehicle_id} not found"
+        )
+    
+    estimates = route_estimator.estimate(origins, destinations)
+    costs = cost_estimator.estimate_cost_matrix(
+        distances_km=estimates['distance_km'],
+        fuel_consumptions=[vehicle.fuel_consumption],
+        fuel_prices=[cost_estimator.fuel_price(vehicle)]
+    )
+    columns = zip(
+        estimates['straight_line_km'].tolist(),
+        estimates['distance_km'].tolist(),
+        estimates['duration_minutes'].tolist(),
+        costs['fuel_used_liters'][0].tolist(),
+        costs['fuel_cost'][0].tolist()
+    )
+    return RouteEstimateResponse(
+        vehicle_id=vehicle.id,
+        circuity_factor=route_estimator.circuity_factor,
+        average_speed_kmh=route_estimator.average_speed_kmh,
+        results=[
+            RouteEstimate(
+                origin=item.origin,
+                destination=item.destination,
+                straight_line_km=straight_line_km,
+                distance_km=distance_km,
+                duration_minutes=duration_minutes,
+                fuel_used_liters=fuel_used_liters,
+                fuel_cost=fuel_cost
+            )
+            for item, (straight_line_km, distance_km, duration_minutes, fuel_used_liters, fuel_cost)
+            in zip(estimate_request.items, columns)
+        ]
+    )
+
+
+@router.post("/multi-stop", response_model=MultiStopResponse, dependencies=[Depends(limit_route_calculations)])
+async def plan_multi_stop(
+    multi_stop_request: MultiStopRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Order the stops of a multi-stop run to minimize total distance or duration.
+    
+    The legs between every pair of stops are fetched as one route matrix
+    (tiles fetched concurrently), then the stops after the first are
+    ordered with nearest-neighbour and 2-opt/Or-opt local search within
+    MULTI_STOP_TIME_BUDGET_MS. Leg costs come from the vehicle's fuel
+    consumption and price, and the totals are their sums. Nothing is saved
+    to trip history.
+    
+    Args:
+        multi_stop_request: Vehicle, stops and ordering constraints
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Stops in driving order with per-leg and total distance, duration
+        and cost, plus the totals of the requested order for comparison
+        
+    Raises:
+        HTTPException: If there are too many stops, the constraints conflict,
+            the vehicle is not one of the user's, the matrix calculation fails or some
+            stop cannot be reached (422)
+    """
+    stops = multi_stop_request.stops
+    if len(stops) > settings.multi_stop_max_stops:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Request contains {len(stops)} stops; the maximum is {settings.multi_stop_max_stops}"
+        )
+    if multi_stop_request.return_to_start and multi_stop_request.keep_last_stop:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="return_to_start and keep_last_stop cannot both be set"
+        )
+    
+    vehicle = await _get_user_vehicle(db, current_user.id, multi_stop_request.vehicle_id)
+    if not vehicle:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Vehicle with id {multi_stop_request.vehicle_id} not found"
+        )
+    
+    try:
+        matrix = await route_matrix_service.compute_matrix(
+            origins=stops,
+            destinations=stops,
+            max_concurrency=settings.matrix_max_concurrency
+        )
+    except Exception as e:
+        raise _route_lookup_error(e, "calculating leg matrix")
+    
+    distances, durations = matrix['distance_km'], matrix['duration_minutes']
+    started = time.perf_counter()
+    # CPU-bound search; keep the event loop free for other requests
+    result = await asyncio.to_thread(
+        stop_optimizer.optimize,
+        distances if multi_stop_request.optimize_for == "distance" else durations,
+        return_to_start=multi_stop_request.return_to_start,
+        fixed_end=multi_stop_request.keep_last_stop,
+        time_budget_seconds=settings.multi_stop_time_budget_ms / 1000
+    )
+    solve_ms = round((time.perf_counter() - started) * 1000, 2)
+    
+    order = result['order']
+    legs = list(zip(order, order[1:]))
+    unrouted = [(stops[i], stops[j]) for i, j in legs if np.isnan(distances[i, j]) or np.isnan(durations[i, j])]
+    if unrouted:
+        origin, destination = unrouted[0]
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No route found from {origin} to {destination}; every stop must be reachable"
+        )
+    
+    leg_distances = np.array([distances[i, j] for i, j in legs])
+    leg_durations = np.array([durations[i, j] for i, j in legs])
+    leg_costs = cost_estimator.estimate_cost_matrix(
+        distances_km=leg_distances,
+        fuel_consumptions=[vehicle.fuel_consumption],
+        fuel_prices=[cost_estimator.fuel_price(vehicle)]
+    )
+    total_km = round(float(leg_distances.sum()), 2)
+    
+    requested = list(range(len(stops))) + ([0] if multi_stop_request.return_to_start else [])
+    requested_distance = sum(distances[i, j] for i, j in zip(requested, requested[1:]))
+    requested_duration = sum(durations[i, j] for i, j in zip(requested, requested[1:]))
+    
+    return MultiStopResponse(
+        vehicle_id=vehicle.id,
+        order=order,
+        stops=[stops[index] for index in order],
+        legs=[
+            MultiStopLeg(
+                origin=stops[i],
+                destination=stops[j],
+                distance_km=distance_km,
+                duration_minutes=duration_minutes,
+                fuel_used_liters=fuel_used_liters,
+                fuel_cost=fuel_cost
+            )
+            for (i, j), distance_km, duration_minutes, fuel_used_liters, fuel_cost in zip(
+                legs,
+                leg_distances.tolist(),
+                leg_durations.tolist(),
+                leg_costs['fuel_used_liters'][0].tolist(),
+                leg_costs['fuel_cost'][0].tolist()
+            )
+        ],
+        distance_km=total_km,
+        duration_minutes=round(float(leg_durations.sum()), 2),
+        fuel_used_liters=round(float(leg_costs['fuel_used_liters'][0].sum()), 2),
+        fuel_cost=round(float(leg_costs['fuel_cost'][0].sum()), 2),
+        requested_order_distance_km=None if np.isnan(requested_distance) else round(float(requested_distance), 2),
+        requested_order_duration_minutes=None if np.isnan(requested_duration) else round(float(requested_duration), 2),
+        solve_ms=solve_ms,
+        tiles=matrix['tiles']
+    )
@@ -1,53 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from datetime import datetime
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from app.database import get_async_db
 from app.models.trip import Trip
-from app.schemas.trip import TripResponse, TripListResponse, TripCreate
+from app.config import settings
+from app.schemas.trip import TripResponse, TripListResponse, TripCreate, TripImportResponse
 from app.dependencies import get_current_user
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.trip_rollups import trip_rollup_service
+from app.services.trip_export import trip_exporter
+from app.services.trip_import import iter_lines, trip_importer
 
 router = APIRouter(prefix="/trips", tags=["trips"])
 
 
+class TripFileFormat(str, Enum):
+    """Supported trip import/export formats."""
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+async def _paginate(
+    db: AsyncSession,
+    query: Select,
+    skip: int,
+    limit: int,
+    cursor: Optional[str]
+) -> Tuple[List[Trip], Optional[str]]:
+    """
+    Fetch one page of trips, newest first.
+    
+    With a cursor the query seeks past the last (created_at, id) seen, so
+    deep pages cost the same as the first one; otherwise skip is used.
+    
+    Returns:
+        Tuple of (trips, cursor for the next page or None)
+    """
+    query = query.order_by(Trip.created_at.desc(), Trip.id.desc())
+    if cursor is not None:
+        try:
+            created_at, trip_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.where(tuple_(Trip.created_at, Trip.id) < (created_at, trip_id))
+    else:
+        query = query.offset(skip)
+    
+    # Fetch one extra row to learn whether another page exists
+    trips = (await db.scalars(query.limit(limit + 1))).all()
+    if len(trips) <= limit:
+        return trips, None
+    trips = trips[:limit]
+    return trips, encode_cursor(trips[-1].created_at, trips[-1].id)
+
+
 @router.post("/", response_model=TripResponse, status_code=status.HTTP_201_CREATED)
-def create_trip(trip: TripCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def create_trip(trip: TripCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     Create a new trip for the authenticated user.
     """
     db_trip = Trip(**trip.model_dump(), user_id=current_user.id)
     db.add(db_trip)
-    db.commit()
-    db.refresh(db_trip)
+    await db.flush()
+    await db.run_sync(trip_rollup_service.record_trip, db_trip)
+    await db.commit()
+    await db.refresh(db_trip)
     return db_trip
 
 
 @router.get("/", response_model=TripListResponse)
-def list_trips(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+async def list_trips(
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored when cursor is given)"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Whether to count all of the user's trips"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     List all trips with pagination.
+    
+    Use next_cursor for efficient deep paging; skip is kept for page-number clients.
     """
-    total = db.query(Trip).filter(Trip.user_id == current_user.id).count()
-    trips = db.query(Trip).filter(Trip.user_id == current_user.id).order_by(Trip.created_at.desc()).offset(skip).limit(limit).all()
+    query = select(Trip).where(Trip.user_id == current_user.id)
+    # The rollups keep a running per-user count, so no COUNT(*) over trips
+    total = await db.run_sync(trip_rollup_service.trip_count, current_user.id) if include_total else None
+    trips, next_cursor = await _paginate(db, query, skip, limit, cursor)
     
     return TripListResponse(
         trips=trips,
         total=total,
-        page=skip // limit + 1,
-        page_size=limit
+        page=skip // limit + 1 if cursor is None else None,
+        page_size=limit,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/export")
+def export_trips(
+    format: TripFileFormat = Query(TripFileFormat.ndjson, description="Export format"),
+    start: Optional[datetime] = Query(None, description="Only trips created at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only trips created before this time"),
+    vehicle_id: Optional[int] = Query(None, description="Only trips for this vehicle"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream the user's trip history as NDJSON or CSV, oldest first.
+    
+    Rows are read through a server-side cursor in fixed-size batches, so
+    memory stays flat regardless of the number of trips.
+    """
+    if format == TripFileFormat.csv:
+        chunks = trip_exporter.stream_csv(current_user.id, start, end, vehicle_id)
+        media_type = "text/csv"
+    else:
+        chunks = trip_exporter.stream_ndjson(current_user.id, start, end, vehicle_id)
+        media_type = "application/x-ndjson"
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trips.{format.value}"'}
+    )
+
+
+@router.post("/import", response_model=TripImportResponse)
+async def import_trips(
+    request: Request,
+    format: TripFileFormat = Query(TripFileFormat.ndjson, description="Import format"),
+    chunk_size: int = Query(settings.import_chunk_size, ge=1, le=10000, description="Rows per insert transaction"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Bulk import trips from an NDJSON or CSV (with header row) request body.
+    
+    The body is streamed and inserted in chunks, each in its own transaction,
+    so invalid rows are reported by line number without failing the rest.
+    A chunk the database rejects is rolled back and reported as one error.
+    """
+    return await trip_importer.import_stream(
+        iter_lines(request.stream()),
+        current_user.id,
+        format.value,
+        chunk_size
     )
 
 
 @router.get("/{trip_id}", response_model=TripResponse)
-def get_trip(trip_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def get_trip(trip_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     Get a specific trip by ID.
     """
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
+    trip = await db.scalar(select(Trip).where(Trip.id == trip_id, Trip.user_id == current_user.id))
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,39 +165,40 @@ def get_trip(trip_id: int, db: Session = Depends(get_db), current_user = Depends
 
 
 @router.delete("/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_trip(trip_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def delete_trip(trip_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     Delete a specific trip by ID.
     """
-    trip = db.query(Trip).filter(Trip.id == trip_id, Trip.user_id == current_user.id).first()
+    trip = await db.scalar(select(Trip).where(Trip.id == trip_id, Trip.user_id == current_user.id))
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Trip with id {trip_id} not found"
         )
     
-    db.delete(trip)
-    db.commit()
+    await db.run_sync(trip_rollup_service.record_trip, trip, sign=-1)
+    await db.delete(trip)
+    await db.commit()
     return None
 
 
 @router.get("/vehicle/{vehicle_id}", response_model=List[TripResponse])
-def get_trips_by_vehicle(
+async def get_trips_by_vehicle(
     vehicle_id: int,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored when cursor is given)"),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Get all trips for a specific vehicle.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    trips = (
-        db.query(Trip)
-        .filter(Trip.vehicle_id == vehicle_id, Trip.user_id == current_user.id)
-        .order_by(Trip.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = select(Trip).where(Trip.vehicle_id == vehicle_id, Trip.user_id == current_user.id)
+    trips, next_cursor = await _paginate(db, query, skip, limit, cursor)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return trips
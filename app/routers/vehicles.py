@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.vehicle import Vehicle
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
 from app.dependencies import get_current_user
@@ -10,32 +11,36 @@ router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
 
 @router.post("/", response_model=VehicleResponse, status_code=status.HTTP_201_CREATED)
-def create_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def create_vehicle(vehicle: VehicleCreate, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     Create a new vehicle for the authenticated user.
     """
     db_vehicle = Vehicle(**vehicle.model_dump(), user_id=current_user.id)
     db.add(db_vehicle)
-    db.commit()
-    db.refresh(db_vehicle)
+    await db.commit()
+    await db.refresh(db_vehicle)
     return db_vehicle
 
 
 @router.get("/", response_model=List[VehicleResponse])
-def list_vehicles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def list_vehicles(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     List all vehicles for the authenticated user.
     """
-    vehicles = db.query(Vehicle).filter(Vehicle.user_id == current_user.id).offset(skip).limit(limit).all()
-    return vehicles
+    vehicles = await db.scalars(
+        select(Vehicle).where(Vehicle.user_id == current_user.id).offset(skip).limit(limit)
+    )
+    return vehicles.all()
 
 
 @router.get("/{vehicle_id}", response_model=VehicleResponse)
-def get_vehicle(vehicle_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def get_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     Get a specific vehicle by ID.
     """
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
+    vehicle = await db.scalar(
+        select(Vehicle).where(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id)
+    )
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -45,16 +50,18 @@ def get_vehicle(vehicle_id: int, db: Session = Depends(get_db), current_user = D
 
 
 @router.put("/{vehicle_id}", response_model=VehicleResponse)
-def update_vehicle(
+async def update_vehicle(
     vehicle_id: int,
     vehicle_update: VehicleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Update a vehicle.
     """
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
+    vehicle = await db.scalar(
+        select(Vehicle).where(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id)
+    )
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,23 +73,25 @@ def update_vehicle(
     for field, value in update_data.items():
         setattr(vehicle, field, value)
     
-    db.commit()
-    db.refresh(vehicle)
+    await db.commit()
+    await db.refresh(vehicle)
     return vehicle
 
 
 @router.delete("/{vehicle_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_vehicle(vehicle_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def delete_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     """
     Delete a vehicle.
     """
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
+    vehicle = await db.scalar(
+        select(Vehicle).where(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id)
+    )
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Vehicle with id {vehicle_id} not found"
         )
     
-    db.delete(vehicle)
-    db.commit()
+    await db.delete(vehicle)
+    await db.commit()
     return None
@@ -0,0 +1,19 @@
+from datetime import date
+from pydantic import BaseModel, Field
+
+
+class TripTotals(BaseModel):
+    """Schema for trip totals of one analytics bucket."""
+    vehicle_id: int | None = Field(None, description="Vehicle (when grouped by vehicle)")
+    month: date | None = Field(None, description="First day of the month (when grouped by month)")
+    trip_count: int
+    distance_km: float
+    fuel_used_liters: float
+    fuel_cost: float
+
+
+class TripAnalyticsResponse(BaseModel):
+    """Schema for trip analytics response."""
+    group_by: str
+    buckets: list[TripTotals]
+    totals: TripTotals = Field(..., description="Totals over all buckets")
@@ -0,0 +1,21 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class FuelPriceResponse(BaseModel):
+    """Schema for one fuel price in the index."""
+    fuel_type: str
+    region: str
+    price_per_liter: float
+    effective_from: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class FuelPriceAsOfResponse(BaseModel):
+    """Schema for the fuel price in effect at a moment."""
+    fuel_type: str
+    region: str
+    at: datetime
+    price_per_liter: float | None = Field(None, description="Null if no price was in effect (the default region is used as fallback)")
@@ -1,12 +1,22 @@
+from typing import Literal
 from pydantic import BaseModel, Field
 
 
-class RouteRequest(BaseModel):
+class PolylineOptions(BaseModel):
+    """Polyline options shared by route requests."""
+    include_polyline: bool = Field(True, description="Set to false to omit polylines from the response")
+    polyline_tolerance_m: float | None = Field(None, gt=0, description="Simplify polylines to this tolerance in meters")
+    polyline_zoom: int | None = Field(None, ge=0, le=22, description="Simplify polylines for display at this map zoom level")
+
+
+class RouteRequest(PolylineOptions):
     """Schema for route calculation request."""
     origin: str = Field(..., description="Starting location (address or coordinates)")
     destination: str = Field(..., description="Destination location (address or coordinates)")
     vehicle_id: int = Field(..., description="ID of the vehicle to use for calculations")
     alternatives: bool = Field(False, description="Whether to return alternative routes")
+    use_cache: bool = Field(True, description="Set to false to bypass the route cache and fetch fresh routes")
+    backend: Literal["google", "local"] | None = Field(None, description="Routing backend; omit for the server default. The local backend needs lat,lng coordinates")
 
 
 class RouteOption(BaseModel):
@@ -26,3 +36,161 @@ class RouteResponse(BaseModel):
     vehicle_id: int
     routes: list[RouteOption]
     trip_id: int | None = Field(None, description="ID of the saved trip (primary route only)")
+    stale: bool = Field(False, description="True if served from an expired cache entry while a fresh route is fetched")
+
+
+class RoutePair(BaseModel):
+    """Schema for a single origin/destination pair in a batch."""
+    origin: str = Field(..., description="Starting location (address or coordinates)")
+    destination: str = Field(..., description="Destination location (address or coordinates)")
+
+
+class BatchRouteRequest(PolylineOptions):
+    """Schema for batch route calculation request."""
+    vehicle_id: int = Field(..., description="ID of the vehicle to use for calculations")
+    items: list[RoutePair] = Field(..., min_length=1, description="Origin/destination pairs to quote")
+    alternatives: bool = Field(False, description="Whether to return alternative routes")
+    use_cache: bool = Field(True, description="Set to false to bypass the route cache and fetch fresh routes")
+    backend: Literal["google", "local"] | None = Field(None, description="Routing backend; omit for the server default. The local backend needs lat,lng coordinates")
+
+
+class BatchRouteResult(BaseModel):
+    """Schema for the result of a single batch item."""
+    index: int = Field(..., description="Position of the item in the request")
+    origin: str
+    destination: str
+    routes: list[RouteOption] = Field(default_factory=list)
+    trip_id: int | None = Field(None, description="ID of the saved trip (primary route only)")
+    error: str | None = Field(None, description="Error message if this item failed")
+    stale: bool = Field(False, description="True if served from an expired cache entry while a fresh route is fetched")
+
+
+class BatchRouteResponse(BaseModel):
+    """Schema for batch route calculation response."""
+    vehicle_id: int
+    results: list[BatchRouteResult]
+    succeeded: int
+    failed: int
+    unique_routes: int = Field(..., description="Number of distinct routes looked up after de-duplication")
+
+
+class FleetComparisonRequest(BaseModel):
+    """Schema for comparing route costs across several vehicles."""
+    origin: str = Field(..., description="Starting location (address or coordinates)")
+    destination: str = Field(..., description="Destination location (address or coordinates)")
+    vehicle_ids: list[int] | None = Field(None, description="Vehicles to compare; omit to compare all of your vehicles")
+    alternatives: bool = Field(False, description="Whether to return alternative routes")
+    use_cache: bool = Field(True, description="Set to false to bypass the route cache and fetch fresh routes")
+    backend: Literal["google", "local"] | None = Field(None, description="Routing backend; omit for the server default. The local backend needs lat,lng coordinates")
+
+
+class RouteSummary(BaseModel):
+    """Schema for a route option independent of any vehicle."""
+    route_index: int
+    route_type: str
+    distance_km: float
+    duration_minutes: float
+    polyline: str | None = None
+
+
+class VehicleRouteCost(BaseModel):
+    """Schema for the cost of one route with one vehicle."""
+    vehicle_id: int
+    vehicle_name: str
+    fuel_type: str
+    route_index: int
+    route_type: str
+    distance_km: float
+    duration_minutes: float
+    fuel_used_liters: float
+    fuel_cost: float
+
+
+class FleetComparisonResponse(BaseModel):
+    """Schema for fleet comparison response."""
+    origin: str
+    destination: str
+    routes: list[RouteSummary]
+    costs: list[VehicleRouteCost] = Field(..., description="Every vehicle/route combination, cheapest first")
+    cheapest: VehicleRouteCost | None = None
+    stale: bool = Field(False, description="True if served from an expired cache entry while a fresh route is fetched")
+
+
+class RouteMatrixRequest(BaseModel):
+    """Schema for origin x destination matrix request."""
+    origins: list[str] = Field(..., min_length=1, description="Starting locations (addresses or coordinates)")
+    destinations: list[str] = Field(..., min_length=1, description="Destination locations (addresses or coordinates)")
+    vehicle_id: int | None = Field(None, description="Vehicle to estimate fuel use and cost with (optional)")
+
+
+class RouteMatrixResponse(BaseModel):
+    """Schema for origin x destination matrix response. Cells are null where no route exists."""
+    origins: list[str]
+    destinations: list[str]
+    vehicle_id: int | None = None
+    distance_km: list[list[float | None]]
+    duration_minutes: list[list[float | None]]
+    fuel_used_liters: list[list[float | None]] | None = None
+    fuel_cost: list[list[float | None]] | None = None
+    tiles: int = Field(..., description="Number of route matrix requests made")
+
+
+class RouteEstimateRequest(BaseModel):
+    """Schema for approximate route quotes from coordinates."""
+    vehicle_id: int = Field(..., description="ID of the vehicle to price the estimates with")
+    items: list[RoutePair] = Field(..., min_length=1, description="Origin/destination pairs as 'lat,lng' coordinates")
+
+
+class RouteEstimate(BaseModel):
+    """Schema for one approximate quote."""
+    origin: str
+    destination: str
+    straight_line_km: float = Field(..., description="Great-circle distance in kilometers")
+    distance_km: float = Field(..., description="Estimated road distance (straight line x circuity factor)")
+    duration_minutes: float = Field(..., description="Estimated duration at the average speed")
+    fuel_used_liters: float
+    fuel_cost: float
+
+
+class RouteEstimateResponse(BaseModel):
+    """Schema for approximate route quotes. Nothing is routed and no trip is saved."""
+    vehicle_id: int
+    approximate: bool = Field(True, description="Always true: values are estimates, not routed distances")
+    circuity_factor: float = Field(..., description="Road distance / straight-line distance used")
+    average_speed_kmh: float = Field(..., description="Average speed used for durations")
+    results: list[RouteEstimate]
+
+
+class MultiStopRequest(BaseModel):
+    """Schema for a multi-stop run to put in the cheapest order."""
+    vehicle_id: int = Field(..., description="ID of the vehicle to price the run with")
+    stops: list[str] = Field(..., min_length=2, description="Stops (addresses or coordinates); the first is the start")
+    return_to_start: bool = Field(False, description="End the run back at the first stop")
+    keep_last_stop: bool = Field(False, description="Keep the last stop as the final destination")
+    optimize_for: Literal["distance", "duration"] = Field("distance", description="Leg cost to minimize")
+
+
+class MultiStopLeg(BaseModel):
+    """Schema for one leg of an ordered multi-stop run."""
+    origin: str
+    destination: str
+    distance_km: float
+    duration_minutes: float
+    fuel_used_liters: float
+    fuel_cost: float
+
+
+class MultiStopResponse(BaseModel):
+    """Schema for an ordered multi-stop run. Nothing is saved to trip history."""
+    vehicle_id: int
+    order: list[int] = Field(..., description="Indexes into the requested stops, in driving order")
+    stops: list[str] = Field(..., description="Stops in driving order")
+    legs: list[MultiStopLeg]
+    distance_km: float = Field(..., description="Total distance in kilometers")
+    duration_minutes: float = Field(..., description="Total duration in minutes")
+    fuel_used_liters: float
+    fuel_cost: float
+    requested_order_distance_km: float | None = Field(None, description="Total distance driving the stops as requested (null if a leg has no route)")
+    requested_order_duration_minutes: float | None = Field(None, description="Total duration driving the stops as requested (null if a leg has no route)")
+    solve_ms: float = Field(..., description="Time spent ordering the stops, after the leg matrix was fetched")
+    tiles: int = Field(..., description="Number of route matrix requests made")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TripCreate(BaseModel):
@@ -14,6 +14,25 @@ class TripCreate(BaseModel):
     route_type: str = "fastest"
 
 
+class TripImportRow(TripCreate):
+    """Schema for one row of a bulk trip import."""
+    created_at: datetime | None = Field(None, description="When the trip happened (defaults to import time)")
+
+
+class TripImportError(BaseModel):
+    """Schema for a row that could not be imported."""
+    line: int = Field(..., description="1-based line number in the uploaded body")
+    error: str
+
+
+class TripImportResponse(BaseModel):
+    """Schema for bulk trip import result."""
+    inserted: int
+    failed: int
+    chunks: int
+    errors: list[TripImportError] = Field(..., description="Row errors (truncated to the first few)")
+
+
 class TripResponse(BaseModel):
     """Schema for trip response."""
     id: int
@@ -33,6 +52,7 @@ class TripResponse(BaseModel):
 class TripListResponse(BaseModel):
     """Schema for paginated trip list response."""
     trips: list[TripResponse]
-    total: int
-    page: int
+    total: int | None = Field(None, description="Total number of trips (omitted when include_total is false)")
+    page: int | None = Field(None, description="Page number (offset pagination only)")
     page_size: int
+    next_cursor: str | None = Field(None, description="Cursor for the next page, or null on the last page")
@@ -8,6 +8,7 @@ class VehicleBase(BaseModel):
     fuel_type: str = Field(..., description="Type of fuel (petrol, diesel, electric, hybrid)")
     fuel_consumption: float = Field(..., gt=0, description="Fuel consumption in liters per 100km")
     fuel_price: float = Field(..., gt=0, description="Fuel price per liter")
+    region: str | None = Field(None, description="Fuel price region (see /fuel-prices); omit for the default region")
 
 
 class VehicleCreate(VehicleBase):
@@ -21,6 +22,7 @@ class VehicleUpdate(BaseModel):
     fuel_type: str | None = None
     fuel_consumption: float | None = Field(None, gt=0)
     fuel_price: float | None = Field(None, gt=0)
+    region: str | None = None
 
 
 class VehicleResponse(VehicleBase):
@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from app.config import settings
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+
+
+class AuthCache:
+    """
+    Bounded LRU cache from verified access tokens to the user they resolve to.
+
+    An entry never outlives its token's exp claim or ttl_seconds. Every
+    entry for a user is dropped as soon as this process changes or deletes
+    that user row, and bulk update()/delete() statements on users drop all
+    entries. Changes made by other workers or instances are only seen
+    once the entry expires, so ttl_seconds bounds how long a changed or
+    deleted user keeps authenticating there.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of tokens kept before evicting the least recently used
+            ttl_seconds: Upper bound on how long a token stays cached
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, UserSchema]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so lookups that raced with one are not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[UserSchema]:
+        """
+        Return the cached user for a token, or None if missing or expired.
+
+        Args:
+            token: Raw bearer token
+
+        Returns:
+            Cached user or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def set(self, token: str, user: UserSchema, token_exp: Optional[float], generation: int) -> None:
+        """
+        Cache the user a verified token resolved to.
+
+        Args:
+            token: Raw bearer token
+            user: User the token belongs to
+            token_exp: The token's exp claim (Unix time), if any
+            generation: Value of generation read before the user was loaded
+        """
+        if self.max_entries <= 0:
+            return
+        lifetime = self.ttl_seconds
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0:
+            return
+        expires_at = time.monotonic() + lifetime
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._remove(token)
+            self._entries[token] = (expires_at, user)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, token: str) -> None:
+        """Drop one token and its reverse-index entry (caller holds the lock)."""
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drop every cached token of a user.
+
+        Args:
+            user_id: ID of the changed user
+        """
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def invalidate_all(self) -> None:
+        """Drop every cached token, e.g. after a bulk change to the users table."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Global auth cache instance
+auth_cache = AuthCache(
+    max_entries=settings.auth_cache_max_entries,
+    ttl_seconds=settings.auth_cache_ttl_seconds
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    """Evict a user's tokens whenever the ORM flushes a change to the row."""
+    auth_cache.invalidate_user(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_user_changes(orm_execute_state: ORMExecuteState) -> None:
+    """Drop every cached token when a bulk update()/delete() targets users.
+
+    Bulk statements bypass the mapper events above, so the affected user
+    ids are unknown here.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        auth_cache.invalidate_all()
@@ -0,0 +1,97 @@
+import time
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that is currently failing."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After failure_threshold failures in a row the circuit opens and calls
+    fail immediately with CircuitOpenError. Once recovery_seconds have
+    passed, one trial call is let through (half-open): success closes the
+    circuit, failure opens it for another recovery period.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        """
+        Initialize the breaker in the closed state.
+
+        Args:
+            name: Name of the protected dependency, used in error messages
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_seconds: Seconds the circuit stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                trial call already in flight
+        """
+        if self.state == CLOSED:
+            return
+        retry_after = self.opened_at + self.recovery_seconds - time.monotonic()
+        if self.state == OPEN and retry_after <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.short_circuited += 1
+        raise CircuitOpenError(
+            f"{self.name} is unavailable (circuit open)",
+            retry_after=max(retry_after, 1.0)
+        )
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy dependency."""
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a call that failed because the dependency is unhealthy."""
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Record a call whose outcome says nothing about the dependency's health (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the breaker state and counters."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'failure_threshold': self.failure_threshold,
+            'recovery_seconds': self.recovery_seconds,
+            'times_opened': self.times_opened,
+            'short_circuited': self.short_circuited
+        }
@@ -1,5 +1,22 @@
-from typing import Dict, Any
+import numpy as np
+from typing import Dict, Any, Iterable, Tuple
 from app.models.vehicle import Vehicle
+from app.services.fuel_prices import fuel_price_index
+
+
+def round_cents(values: np.ndarray) -> np.ndarray:
+    """
+    Round an array to 2 decimals exactly like the built-in round().
+    
+    np.round scales by 100 before rounding, which can land on the other side
+    of a .5 tie than round() does; those few elements fall back to round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, 2) for value in values[near_tie].tolist()]
+    return rounded
 
 
 class CostEstimator:
@@ -63,13 +80,81 @@ class CostEstimator:
         
         fuel_cost = self.calculate_fuel_cost(
             fuel_used_liters=fuel_used,
-            fuel_price_per_liter=vehicle.fuel_price
+            fuel_price_per_liter=self.fuel_price(vehicle)
         )
         
         return {
             'fuel_used_liters': fuel_used,
             'fuel_cost': fuel_cost
         }
+    
+    @staticmethod
+    def fuel_price(vehicle: Vehicle) -> float:
+        """
+        Price per liter to cost a new trip with.
+        
+        Args:
+            vehicle: Vehicle model
+            
+        Returns:
+            The fuel price index's current price for the vehicle's fuel type
+            and region when the index is enabled, else vehicle.fuel_price
+        """
+        return fuel_price_index.fuel_price(vehicle)
+    
+    @staticmethod
+    def vehicle_profiles(vehicles: Iterable[Vehicle]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract consumption and price arrays from vehicles.
+        
+        Args:
+            vehicles: Vehicle models with fuel specifications
+            
+        Returns:
+            Tuple of (fuel consumption per 100km, fuel price per liter) arrays,
+            priced like fuel_price
+        """
+        profiles = [(vehicle.fuel_consumption, CostEstimator.fuel_price(vehicle)) for vehicle in vehicles]
+        if not profiles:
+            return np.empty(0), np.empty(0)
+        consumptions, prices = zip(*profiles)
+        return np.asarray(consumptions, dtype=float), np.asarray(prices, dtype=float)
+    
+    def estimate_cost_matrix(
+        self,
+        distances_km: Iterable[float],
+        fuel_consumptions: Iterable[float],
+        fuel_prices: Iterable[float]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate fuel use and cost for every vehicle profile and distance at once.
+        
+        Produces the same values as calling estimate_trip_cost for each
+        (vehicle, distance) pair, including the rounding of fuel before costing.
+        
+        Args:
+            distances_km: Distances in kilometers, shape (n_distances,)
+            fuel_consumptions: Fuel consumption per 100km, shape (n_vehicles,)
+            fuel_prices: Fuel price per liter, shape (n_vehicles,)
+            
+        Returns:
+            Dictionary with fuel_used_liters and fuel_cost matrices of shape
+            (n_vehicles, n_distances)
+        """
+        distances = np.asarray(distances_km, dtype=float).ravel()
+        consumptions = np.asarray(fuel_consumptions, dtype=float).ravel()
+        prices = np.asarray(fuel_prices, dtype=float).ravel()
+        if consumptions.shape != prices.shape:
+            raise ValueError("fuel_consumptions and fuel_prices must have the same length")
+        
+        # Same operation order as the scalar path so the floats match bit for bit
+        fuel_used = round_cents((distances / 100)[np.newaxis, :] * consumptions[:, np.newaxis])
+        fuel_cost = round_cents(fuel_used * prices[:, np.newaxis])
+        
+        return {
+            'fuel_used_liters': fuel_used,
+            'fuel_cost': fuel_cost
+        }
 
 
 # Global estimator instance
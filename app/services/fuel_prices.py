@@ -0,0 +1,243 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+from sqlalchemy import Float, Numeric, and_, cast, func, select, update
+from sqlalchemy.orm import Session, aliased
+from app.config import settings
+from app.database import SessionLocal
+from app.models.fuel_price import DEFAULT_REGION, FuelPrice
+from app.models.trip import Trip
+from app.models.vehicle import Vehicle
+from app.services.trip_rollups import trip_rollup_service
+
+logger = logging.getLogger(__name__)
+
+
+def as_of_price(fuel_type, region, at):
+    """
+    SQL expression for the fuel price in effect at a moment, or NULL if none.
+
+    Falls back to the default region's price when the region has none.
+    Arguments may be columns, so the expression can be correlated with
+    trips and vehicles in an UPDATE; each branch is one descending seek on
+    the (fuel_type, region, effective_from) index.
+
+    Args:
+        fuel_type: Fuel type value or column
+        region: Region value or column (NULL meaning the default region)
+        at: Moment value or column
+
+    Returns:
+        Scalar SQL expression
+    """
+    def latest(region_value):
+        price = aliased(FuelPrice)
+        return (
+            select(price.price_per_liter)
+            .where(price.fuel_type == fuel_type, price.region == region_value, price.effective_from <= at)
+            .order_by(price.effective_from.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    return func.coalesce(latest(func.coalesce(region, DEFAULT_REGION)), latest(DEFAULT_REGION))
+
+
+class FuelPriceIndex:
+    """
+    Time series of fuel prices by fuel type and region.
+
+    With the index enabled, CostEstimator prices new trips with the current
+    price for the vehicle's fuel type and region instead of the vehicle's
+    own fuel_price (which stays the fallback). Current prices are held in
+    memory and reloaded periodically, so pricing costs no query.
+    recost_trips re-prices stored trips with the price in effect when each
+    trip was made.
+    """
+
+    def __init__(self, enabled: bool, recost_batch_size: int):
+        """
+        Initialize the index.
+
+        Args:
+            enabled: Whether CostEstimator uses the index for new trips
+            recost_batch_size: Trip id range updated per transaction by recost_trips
+        """
+        self.enabled = enabled
+        self.recost_batch_size = recost_batch_size
+        self._current: Dict[Tuple[str, str], float] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    def current_price(self, fuel_type: str, region: Optional[str]) -> Optional[float]:
+        """Return the loaded current price for a fuel type and region (with default region fallback)."""
+        price = self._current.get((fuel_type, region or DEFAULT_REGION))
+        if price is None:
+            price = self._current.get((fuel_type, DEFAULT_REGION))
+        return price
+
+    def fuel_price(self, vehicle: Vehicle) -> float:
+        """
+        Return the price per liter to cost a new trip of a vehicle with.
+
+        Args:
+            vehicle: Vehicle model
+
+        Returns:
+            The index's current price for the vehicle's fuel type and
+            region if enabled and known, else the vehicle's fuel_price
+        """
+        if self.enabled:
+            price = self.current_price(vehicle.fuel_type, vehicle.region)
+            if price is not None:
+                return price
+        return vehicle.fuel_price
+
+    def refresh(self) -> int:
+        """
+        Reload the latest price in effect now for every fuel type and region.
+
+        Returns:
+            Number of (fuel type, region) prices loaded
+        """
+        now = datetime.utcnow()
+        latest = (
+            select(FuelPrice.fuel_type, FuelPrice.region, func.max(FuelPrice.effective_from).label("effective_from"))
+            .where(FuelPrice.effective_from <= now)
+            .group_by(FuelPrice.fuel_type, FuelPrice.region)
+            .subquery()
+        )
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(FuelPrice.fuel_type, FuelPrice.region, FuelPrice.price_per_liter).join(
+                    latest,
+                    and_(
+                        FuelPrice.fuel_type == latest.c.fuel_type,
+                        FuelPrice.region == latest.c.region,
+                        FuelPrice.effective_from == latest.c.effective_from
+                    )
+                )
+            ).all()
+        self._current = {(fuel_type, region): price for fuel_type, region, price in rows}
+        self.loaded_at = now
+        return len(self._current)
+
+    async def refresh_periodically(self, interval_seconds: float) -> None:
+        """Reload current prices every interval until cancelled (run as a background task after an initial refresh)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Fuel price refresh failed: {str(e)}")
+
+    def add_prices(self, db: Session, prices: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Insert prices (fuel_type, region, effective_from, price_per_liter) in one statement; the caller commits.
+
+        Args:
+            db: Database session
+            prices: Price mappings; a missing or empty region means the default region
+
+        Returns:
+            Number of prices inserted
+        """
+        rows = [
+            {
+                'fuel_type': price['fuel_type'],
+                'region': price.get('region') or DEFAULT_REGION,
+                'effective_from': price['effective_from'],
+                'price_per_liter': price['price_per_liter'],
+                'created_at': datetime.utcnow()
+            }
+            for price in prices
+        ]
+        if rows:
+            db.execute(FuelPrice.__table__.insert(), rows)
+        return len(rows)
+
+    def recost_trips(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        fuel_type: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Re-price stored trips with the fuel price in effect when each was made.
+
+        Each batch covers a trip id range in its own short transaction:
+        one INSERT ... SELECT ... GROUP BY adds the per-bucket cost
+        differences of the trips whose cost changes to the trip rollups,
+        then one UPDATE ... FROM vehicles writes the new costs. Rollups are
+        adjusted by deltas rather than rebuilt, so trips saved or deleted
+        concurrently stay counted. Trips made before any matching price
+        keep their cost. fuel_used_liters is unchanged, so fuel_cost =
+        round(fuel_used_liters * price, 2); SQL rounds exact half-cent ties
+        away from zero, so a few trips may differ by a cent from what
+        CostEstimator would have priced.
+
+        Args:
+            since: Only trips created at or after this moment
+            until: Only trips created before this moment
+            fuel_type: Only trips of vehicles with this fuel type
+            region: Only trips of vehicles in this region (the default
+                region includes vehicles without one)
+
+        Returns:
+            Dictionary with batches and updated (trips whose cost changed)
+        """
+        filters = [Trip.vehicle_id == Vehicle.id, Trip.created_at.is_not(None)]
+        if since is not None:
+            filters.append(Trip.created_at >= since)
+        if until is not None:
+            filters.append(Trip.created_at < until)
+        if fuel_type is not None:
+            filters.append(Vehicle.fuel_type == fuel_type)
+        if region is not None:
+            filters.append(func.coalesce(Vehicle.region, DEFAULT_REGION) == region)
+
+        price = as_of_price(Vehicle.fuel_type, Vehicle.region, Trip.created_at)
+        new_cost = cast(func.round(cast(Trip.fuel_used_liters * price, Numeric), 2), Float)
+
+        with SessionLocal() as db:
+            low, high = db.execute(select(func.min(Trip.id), func.max(Trip.id)).where(*filters)).one()
+        batches = updated = 0
+        if low is not None:
+            for start in range(low, high + 1, self.recost_batch_size):
+                batch = [
+                    *filters,
+                    Trip.id >= start,
+                    Trip.id < start + self.recost_batch_size,
+                    # NULL when no price was in effect, which skips the trip
+                    new_cost != Trip.fuel_cost
+                ]
+                with SessionLocal() as db:
+                    trip_rollup_service.record_cost_changes(db, new_cost, *batch)
+                    result = db.execute(
+                        update(Trip)
+                        .where(*batch)
+                        .values(fuel_cost=new_cost)
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+                batches += 1
+                updated += result.rowcount
+                logger.info(f"Re-costed trips {start}..{start + self.recost_batch_size - 1}: {result.rowcount} changed")
+
+        return {'batches': batches, 'updated': updated}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return whether the index is in use and the current prices loaded."""
+        return {
+            'enabled': self.enabled,
+            'prices_loaded': len(self._current),
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None
+        }
+
+
+# Global fuel price index instance
+fuel_price_index = FuelPriceIndex(
+    enabled=settings.fuel_price_index_enabled,
+    recost_batch_size=settings.fuel_price_recost_batch_size
+)
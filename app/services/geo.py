@@ -0,0 +1,58 @@
+import math
+import numpy as np
+from typing import Optional, Tuple
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_M = 6371008.8
+
+
+def parse_lat_lng(location: str) -> Optional[Tuple[float, float]]:
+    """
+    Parse a "lat,lng" location string.
+
+    Args:
+        location: Location as given by the client, e.g. "52.52,13.405"
+
+    Returns:
+        Tuple of (latitude, longitude), or None if the string is not a valid
+        coordinate pair (e.g. an address)
+    """
+    parts = location.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lng = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None
+    return lat, lng
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters between two points given in degrees."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def haversine_m_array(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """
+    Great-circle distances in meters, element-wise over broadcastable arrays.
+
+    Args:
+        lat1, lng1: Start coordinates in degrees
+        lat2, lng2: End coordinates in degrees
+
+    Returns:
+        Array of distances with the broadcast shape of the inputs
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(np.subtract(lng2, lng1)) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import SessionLocal
+from app.models.geocode_cache import GeocodeCacheEntry
+from app.services.geo import parse_lat_lng
+from app.services.route_cache import RouteCache, format_lat_lng, normalize_location
+
+# Seconds an address found in neither cache is remembered as unknown, so
+# repeated lookups skip the database until a route fetch resolves it
+UNKNOWN_TTL_SECONDS = 60
+
+
+class GeocodeCache:
+    """
+    Address -> coordinates cache in the geocode_cache table, with an in-process LRU in front.
+
+    Entries are learned from the start and end locations of Routes API
+    responses, so they cost no extra API calls. Once an address is known,
+    route lookups for it key on its coordinates: differently spelled
+    addresses of the same place then share route cache entries.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            enabled: Whether to resolve and record addresses at all
+            max_entries: Addresses kept in the in-process LRU
+            ttl_seconds: Seconds an address stays in the in-process LRU
+        """
+        self.enabled = enabled
+        self._memory = RouteCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._unknown = RouteCache(max_entries=max_entries, ttl_seconds=UNKNOWN_TTL_SECONDS)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get(self, address: str) -> Optional[Tuple[float, float]]:
+        """
+        Return the coordinates of a normalized address, or None if unknown.
+
+        Args:
+            address: Address normalized with normalize_location
+
+        Returns:
+            Tuple of (lat, lng) or None
+        """
+        point = self._memory.get(address)
+        if point is None:
+            with SessionLocal() as db:
+                row = db.execute(
+                    select(GeocodeCacheEntry.lat, GeocodeCacheEntry.lng).where(GeocodeCacheEntry.address == address)
+                ).first()
+            if row is not None:
+                point = (row.lat, row.lng)
+                self._memory.set(address, point)
+        if point is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return point
+
+    def set_many(self, points: Mapping[str, Tuple[float, float]]) -> None:
+        """
+        Store (or move) the coordinates of normalized addresses in one transaction.
+
+        Args:
+            points: Mapping of address normalized with normalize_location to (lat, lng)
+        """
+        for address, point in points.items():
+            self._memory.set(address, point)
+        resolved_at = datetime.utcnow()
+        with SessionLocal() as db:
+            for address, (lat, lng) in points.items():
+                db.merge(GeocodeCacheEntry(address=address, lat=lat, lng=lng, resolved_at=resolved_at))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker stored one of the addresses first
+                db.rollback()
+        self.stores += len(points)
+
+    async def resolve(self, location: str) -> str:
+        """
+        Normalize a location, replacing known addresses with their coordinates.
+
+        Args:
+            location: Address or "lat,lng" coordinates as given by the client
+
+        Returns:
+            Normalized "lat,lng" coordinates if the location is or resolves
+            to coordinates, else the normalized address
+        """
+        normalized = normalize_location(location)
+        if not self.enabled or parse_lat_lng(normalized) is not None:
+            return normalized
+        point = self._memory.get(normalized)
+        if point is not None:
+            self.hits += 1
+        elif self._unknown.get(normalized) is not None:
+            self.misses += 1
+        else:
+            point = await asyncio.to_thread(self.get, normalized)
+            if point is None:
+                self._unknown.set(normalized, True)
+        return normalized if point is None else format_lat_lng(*point)
+
+    async def record(self, *resolved: Tuple[str, Optional[Tuple[float, float]]]) -> None:
+        """
+        Remember where addresses were resolved to, skipping those already known there.
+
+        Args:
+            resolved: (location as sent to the routing backend, coordinates
+                the backend resolved it to or None if not reported) pairs
+        """
+        if not self.enabled:
+            return
+        points = {}
+        for location, point in resolved:
+            normalized = normalize_location(location)
+            if point is None or parse_lat_lng(normalized) is not None:
+                continue
+            known = self._memory.get(normalized)
+            if known is None or format_lat_lng(*known) != format_lat_lng(*point):
+                points[normalized] = tuple(point)
+        if points:
+            await asyncio.to_thread(self.set_many, points)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return resolution hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'memory_size': self._memory.stats()['size'],
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global geocode cache instance
+geocode_cache = GeocodeCache(
+    enabled=settings.geocode_cache_enabled,
+    max_entries=settings.geocode_cache_max_entries,
+    ttl_seconds=settings.geocode_cache_ttl_seconds
+)
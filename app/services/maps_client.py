@@ -1,23 +1,200 @@
-import googlemaps
-from typing import List, Dict, Any
+import asyncio
+import random
+import time
+import httpx
+from typing import List, Dict, Any, Optional
 from app.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.geo import parse_lat_lng
+from app.services.metrics import maps_request_duration
+from app.services.rate_limiter import maps_governor
+
+# Statuses worth retrying: quota/rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MapsApiError(Exception):
+    """Raised when the Routes API returns an error or cannot be reached."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
 
 
 class GoogleMapsClient:
     """Client for interacting with Google Maps Routes API."""
-    
+
+    name = "google"
+    use_route_cache = True
+
     def __init__(self):
         """Initialize the Google Maps client with API key."""
         self.api_key = settings.google_maps_api_key
-        self.base_url = "https://routes.googleapis.com/directions/v2:computeRoutes"
-    
+        self.base_url = f"{settings.maps_routes_base_url.rstrip('/')}/directions/v2:computeRoutes"
+        self.matrix_url = f"{settings.maps_routes_base_url.rstrip('/')}/distanceMatrix/v2:computeRouteMatrix"
+        self._client: Optional[httpx.AsyncClient] = None
+        self.breaker = CircuitBreaker(
+            name="Routes API",
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            recovery_seconds=settings.circuit_breaker_recovery_seconds
+        )
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client shared by all requests."""
+        limits = httpx.Limits(
+            max_connections=settings.maps_max_connections,
+            max_keepalive_connections=settings.maps_max_keepalive_connections,
+            keepalive_expiry=settings.maps_keepalive_expiry_seconds
+        )
+        return httpx.AsyncClient(
+            http2=settings.maps_http2,
+            limits=limits,
+            timeout=settings.maps_timeout_seconds
+        )
+
+    async def open(self) -> None:
+        """Open the pooled HTTP client (called on application startup)."""
+        if self._client is None:
+            self._client = self._create_http_client()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client and its connections (called on shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it lazily outside the app lifespan."""
+        if self._client is None:
+            self._client = self._create_http_client()
+        return self._client
+
     def _parse_duration(self, duration_str: str) -> int:
         """Parse duration string like '123s' into seconds integer."""
         if not duration_str or not duration_str.endswith('s'):
             return 0
         return int(duration_str[:-1])
 
-    def get_directions(
+    @staticmethod
+    def _waypoint(location: str) -> Dict[str, Any]:
+        """Build a Routes API waypoint: a lat/lng location for coordinates, else an address to geocode."""
+        point = parse_lat_lng(location)
+        if point is None:
+            return {"address": location}
+        return {"location": {"latLng": {"latitude": point[0], "longitude": point[1]}}}
+
+    @staticmethod
+    def _leg_point(legs: List[Dict[str, Any]], index: int, field: str) -> Optional[List[float]]:
+        """Return [lat, lng] of a leg's startLocation or endLocation, or None if missing."""
+        try:
+            lat_lng = legs[index][field]["latLng"]
+        except (IndexError, KeyError, TypeError):
+            return None
+        return [lat_lng.get("latitude", 0.0), lat_lng.get("longitude", 0.0)]
+
+    def _check_api_key(self) -> None:
+        """Reject the placeholder key before making a billed request."""
+        if "your_google_maps_api_key" in self.api_key:
+             raise ValueError("Google Maps API Configuration Error: Default placeholder key in use. Please configure a valid API key.")
+
+    def _backoff_seconds(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Full-jitter exponential backoff, honoring a Retry-After header within the cap."""
+        cap = settings.maps_retry_backoff_max_seconds
+        if response is not None:
+            try:
+                return min(float(response.headers["Retry-After"]), cap)
+            except (KeyError, ValueError):
+                pass
+        return random.uniform(0, min(cap, settings.maps_retry_backoff_seconds * 2 ** attempt))
+
+    async def _send(self, operation: str, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> httpx.Response:
+        """Send one request, retrying timeouts, connection errors and retryable statuses."""
+        attempt = 0
+        while True:
+            response = None
+            self.requests += 1
+            try:
+                # Every attempt, retries included, counts against the outbound quota
+                async with maps_governor.limit():
+                    started = time.perf_counter()
+                    try:
+                        response = await self.client.post(url, headers=headers, json=payload)
+                    except httpx.TransportError as e:
+                        maps_request_duration.observe(time.perf_counter() - started, operation, type(e).__name__)
+                        raise
+                    maps_request_duration.observe(time.perf_counter() - started, operation, response.status_code)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                error = None
+            except httpx.TransportError as e:
+                error = e
+            if attempt >= settings.maps_max_retries:
+                if error is not None:
+                    raise MapsApiError(
+                        f"Routes API Error: {type(error).__name__} - {str(error) or 'request failed'}",
+                        retryable=True
+                    )
+                return response
+            self.retries += 1
+            await asyncio.sleep(self._backoff_seconds(attempt, response))
+            attempt += 1
+
+    async def _post(self, operation: str, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a request through the circuit breaker and return the parsed JSON body.
+
+        Failures that indicate an unhealthy API (timeouts, 5xx, 429 after
+        retries) count towards opening the circuit; other errors do not.
+        """
+        self.breaker.before_call()
+        try:
+            response = await self._send(operation, url, headers, payload)
+            self._raise_for_status(response)
+        except MapsApiError as e:
+            self.failures += 1
+            if e.retryable:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return response.json()
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        """Raise MapsApiError with the API's error message for non-200 responses."""
+        if response.status_code != 200:
+            error_msg = f"Routes API Error: {response.status_code}"
+            try:
+                error_details = response.json()
+                if "error" in error_details and "message" in error_details["error"]:
+                    error_msg += f" - {error_details['error']['message']}"
+            except ValueError:
+                error_msg += f" - {response.text}"
+            raise MapsApiError(
+                error_msg,
+                status_code=response.status_code,
+                retryable=response.status_code in RETRYABLE_STATUS_CODES
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return HTTP attempt, retry and failure counters and the circuit breaker state."""
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'failures': self.failures,
+            'circuit_breaker': self.breaker.stats()
+        }
+
+    async def get_directions(
         self,
         origin: str,
         destination: str,
@@ -25,91 +202,129 @@ class GoogleMapsClient:
     ) -> List[Dict[str, Any]]:
         """
         Get directions from origin to destination using Routes API.
-        
+
         Args:
             origin: Starting location (address or coordinates)
             destination: Ending location (address or coordinates)
             alternatives: Whether to return alternative routes
-            
+
         Returns:
-            List of route dictionaries containing distance, duration, and polyline
-            
+            List of route dictionaries containing distance, duration, polyline
+            and the resolved start and end locations
+
         Raises:
-            Exception: If the API request fails
+            RateLimitExceeded: If the outbound rate limit queue is full
+            CircuitOpenError: If the API is failing and calls are short-circuited
+            MapsApiError: If the API returns an error, cannot be reached or
+                finds no route (status_code 404)
         """
-        import httpx
-        import json
-
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": "routes.distanceMeters,routes.duration,routes.polyline.encodedPolyline,routes.routeToken"
+            "X-Goog-FieldMask": (
+                "routes.distanceMeters,routes.duration,routes.polyline.encodedPolyline,routes.routeToken,"
+                "routes.legs.startLocation,routes.legs.endLocation"
+            )
         }
 
         payload = {
-            "origin": {
-                "address": origin
-            },
-            "destination": {
-                "address": destination
-            },
+            "origin": self._waypoint(origin),
+            "destination": self._waypoint(destination),
             "travelMode": "DRIVE",
             "computeAlternativeRoutes": alternatives,
             "routingPreference": "TRAFFIC_AWARE",
             "units": "METRIC"
         }
 
-        try:
-            # Check for placeholder key before making request
-            if "your_google_maps_api_key" in self.api_key:
-                 raise ValueError("Google Maps API Configuration Error: Default placeholder key in use. Please configure a valid API key.")
-
-            with httpx.Client() as client:
-                response = client.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=10.0
-                )
-                
-                if response.status_code != 200:
-                    error_msg = f"Routes API Error: {response.status_code}"
-                    try:
-                        error_details = response.json()
-                        if "error" in error_details and "message" in error_details["error"]:
-                            error_msg += f" - {error_details['error']['message']}"
-                    except:
-                        error_msg += f" - {response.text}"
-                    raise Exception(error_msg)
-                
-                data = response.json()
-                
-                if "routes" not in data:
-                     raise ValueError(f"No routes found from {origin} to {destination}")
-
-                parsed_routes = []
-                for idx, route in enumerate(data["routes"]):
-                    distance = route.get("distanceMeters", 0)
-                    duration = self._parse_duration(route.get("duration", "0s"))
-                    polyline = route.get("polyline", {}).get("encodedPolyline", "")
-                    
-                    route_data = {
-                        'distance_meters': distance,
-                        'duration_seconds': duration,
-                        'polyline': polyline,
-                        'route_type': 'fastest' if idx == 0 else f'alternative_{idx}',
-                        # Routes API doesn't return geocoded addresses in the route object easily
-                        # so we essentially echo back inputs or handle this differently if needed.
-                        'start_address': origin,
-                        'end_address': destination
-                    }
-                    parsed_routes.append(route_data)
-                
-                return parsed_routes
-
-        except Exception as e:
-            # Re-raise exceptions to be handled by the router
-            raise e
+        # Check for placeholder key before making request
+        self._check_api_key()
+
+        data = await self._post("computeRoutes", self.base_url, headers, payload)
+
+        if not data.get("routes"):
+            # Google answers an unroutable pair with an empty body, not an error status
+            raise MapsApiError(f"No route found from {origin} to {destination}", status_code=404, retryable=False)
+
+        parsed_routes = []
+        for idx, route in enumerate(data["routes"]):
+            distance = route.get("distanceMeters", 0)
+            duration = self._parse_duration(route.get("duration", "0s"))
+            polyline = route.get("polyline", {}).get("encodedPolyline", "")
+            legs = route.get("legs", [])
+
+            route_data = {
+                'distance_meters': distance,
+                'duration_seconds': duration,
+                'polyline': polyline,
+                'route_type': 'fastest' if idx == 0 else f'alternative_{idx}',
+                # Routes API doesn't return geocoded addresses in the route object easily
+                # so we essentially echo back inputs or handle this differently if needed.
+                'start_address': origin,
+                'end_address': destination,
+                # Where the API placed the two locations (feeds the geocode cache)
+                'start_location': self._leg_point(legs, 0, "startLocation"),
+                'end_location': self._leg_point(legs, -1, "endLocation")
+            }
+            parsed_routes.append(route_data)
+
+        return parsed_routes
+
+    async def compute_route_matrix(
+        self,
+        origins: List[str],
+        destinations: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get distances and durations for every origin/destination pair using
+        the Routes API route matrix.
+
+        The caller is responsible for keeping the request within the API's
+        element limits (see RouteMatrixService).
+
+        Args:
+            origins: Starting locations (addresses or coordinates)
+            destinations: Ending locations (addresses or coordinates)
+
+        Returns:
+            List of element dictionaries with origin_index, destination_index,
+            distance_meters, duration_seconds and route_exists
+
+        Raises:
+            RateLimitExceeded: If the outbound rate limit queue is full
+            CircuitOpenError: If the API is failing and calls are short-circuited
+            MapsApiError: If the API returns an error or cannot be reached
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": self.api_key,
+            "X-Goog-FieldMask": "originIndex,destinationIndex,status,condition,distanceMeters,duration"
+        }
+
+        payload = {
+            "origins": [{"waypoint": self._waypoint(origin)} for origin in origins],
+            "destinations": [{"waypoint": self._waypoint(destination)} for destination in destinations],
+            "travelMode": "DRIVE",
+            "routingPreference": "TRAFFIC_AWARE",
+            "units": "METRIC"
+        }
+
+        self._check_api_key()
+
+        elements = await self._post("computeRouteMatrix", self.matrix_url, headers, payload)
+
+        parsed_elements = []
+        for element in elements:
+            # Proto3 JSON omits zero values, so index 0 arrives as a missing key
+            error_status = element.get("status", {})
+            parsed_elements.append({
+                'origin_index': element.get("originIndex", 0),
+                'destination_index': element.get("destinationIndex", 0),
+                'distance_meters': element.get("distanceMeters", 0),
+                'duration_seconds': self._parse_duration(element.get("duration", "0s")),
+                'route_exists': element.get("condition") == "ROUTE_EXISTS" and not error_status.get("code")
+            })
+
+        return parsed_elements
 
 
 # Global client instance
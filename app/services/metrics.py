@@ -0,0 +1,317 @@
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond queries to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statement types reported by db_query_duration_seconds; anything else is OTHER
+STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY", "BEGIN", "COMMIT", "ROLLBACK"}
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    """Render a label set, e.g. {method="GET",route="/health"}."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        """Add amount to the series for the given label values (in labelnames order)."""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        """Return the exposition lines for every series."""
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            for labelvalues, value in values
+        ]
+
+
+class Histogram:
+    """
+    Distribution of observed values in fixed buckets per label set.
+
+    An observation is one bisect and a few list updates under a lock;
+    buckets are made cumulative only when scraped.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: a count for each bucket, one for +Inf, then the sum
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value (seconds for latency histograms)
+            labelvalues: Label values in labelnames order
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        """Return the exposition lines for every series."""
+        with self._lock:
+            snapshot = [(labelvalues, list(series)) for labelvalues, series in self._series.items()]
+        lines = []
+        for labelvalues, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricFamily:
+    """Values read at scrape time, e.g. gauges and counters taken from a service's stats()."""
+
+    def __init__(self, name: str, help_text: str, type_name: str = "gauge", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.type_name = type_name
+        self.labelnames = tuple(labelnames)
+        self._values: List[Tuple[Tuple, float]] = []
+
+    def add(self, value: float, *labelvalues: Any) -> "MetricFamily":
+        """Add a sample for the given label values; returns self for chaining."""
+        self._values.append((labelvalues, value))
+        return self
+
+    def samples(self) -> List[str]:
+        """Return the exposition lines for every sample."""
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            for labelvalues, value in self._values
+        ]
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Register a callable returning metric families to read on every scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics and collector output."""
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route.
+
+    Requests are labelled with the matched route template (e.g.
+    /api/trips/{trip_id}), not the raw path, so series stay bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], _route_template(scope), status_code)
+
+
+def _route_template(scope) -> str:
+    """Return the full path template of the route the router matched, or unmatched."""
+    path_format = getattr(scope.get("route"), "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    # Routes of an included router may only know their own path; recover the
+    # include prefix from the part of the request path in front of it
+    try:
+        concrete_path = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    path = scope["path"]
+    if path.endswith(concrete_path):
+        return path[:len(path) - len(concrete_path)] + path_format
+    return path_format
+
+
+def _statement_type(statement: str) -> str:
+    """Return the leading SQL keyword of a statement, or OTHER."""
+    words = statement[:16].split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in STATEMENT_TYPES else "OTHER"
+
+
+_instrumented_engines: Dict[str, Engine] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Time every query and count pool checkouts on an engine.
+
+    Args:
+        engine: Sync engine (for an AsyncEngine pass engine.sync_engine)
+        name: Value of the engine label
+    """
+    if name in _instrumented_engines:
+        return
+    _instrumented_engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is not None:
+            db_query_duration.observe(time.perf_counter() - started_at, name, _statement_type(statement))
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts.inc(name)
+
+
+def collect_pool_metrics() -> List[MetricFamily]:
+    """Read connection pool occupancy of the instrumented engines."""
+    families = {
+        "size": MetricFamily("db_pool_size", "Configured pool size", labelnames=("engine",)),
+        "checkedout": MetricFamily("db_pool_checked_out", "Connections currently checked out", labelnames=("engine",)),
+        "checkedin": MetricFamily("db_pool_checked_in", "Idle connections in the pool", labelnames=("engine",)),
+        "overflow": MetricFamily("db_pool_overflow", "Connections open beyond pool_size (negative while the pool is filling)", labelnames=("engine",)),
+    }
+    for name, engine in _instrumented_engines.items():
+        for attribute, family in families.items():
+            # Only queue pools report occupancy (not e.g. SQLite's SingletonThreadPool)
+            method = getattr(engine.pool, attribute, None)
+            if method is not None:
+                family.add(method(), name)
+    return list(families.values())
+
+
+# Global metrics registry and hot-path metrics
+metrics_registry = MetricsRegistry()
+
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+
+maps_request_duration = metrics_registry.histogram(
+    "maps_request_duration_seconds",
+    "Routes API request latency per attempt; status is the HTTP status or the transport error",
+    ("operation", "status")
+)
+
+db_query_duration = metrics_registry.histogram(
+    "db_query_duration_seconds",
+    "Database query execution time",
+    ("engine", "statement")
+)
+
+db_pool_checkouts = metrics_registry.counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool",
+    ("engine",)
+)
+
+password_hash_duration = metrics_registry.histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hashing and verification time on the hashing pool",
+    ("operation",)
+)
+
+local_route_duration = metrics_registry.histogram(
+    "local_route_duration_seconds",
+    "Local road graph path search time",
+    ("weight",)
+)
+
+metrics_registry.register_collector(collect_pool_metrics)
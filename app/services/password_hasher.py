@@ -0,0 +1,105 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from app.config import settings
+from app.services.metrics import password_hash_duration
+
+
+def _truncate(password: str) -> str:
+    """Truncate to bcrypt's 72-byte input limit without splitting a character."""
+    return password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing on a dedicated, bounded thread pool.
+
+    bcrypt is deliberately slow (hundreds of milliseconds at production
+    cost), so it must never run on the event loop. A separate pool keeps a
+    burst of logins from starving the default threadpool used for database
+    work, and its size caps the CPU spent on hashing.
+    """
+
+    def __init__(self, rounds: int, max_workers: int):
+        """
+        Initialize the hasher.
+
+        Args:
+            rounds: bcrypt cost factor for new hashes; hashes with any other
+                cost are upgraded on the next successful login
+            max_workers: Number of threads hashing concurrently
+        """
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Hashing pool, created on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def hash_sync(self, password: str) -> str:
+        """Hash a password on the calling thread."""
+        started = time.perf_counter()
+        hashed = self.context.hash(_truncate(password))
+        password_hash_duration.observe(time.perf_counter() - started, "hash")
+        return hashed
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        """Verify a password on the calling thread."""
+        started = time.perf_counter()
+        valid = self.context.verify(_truncate(password), hashed_password)
+        password_hash_duration.observe(time.perf_counter() - started, "verify")
+        return valid
+
+    def _verify_and_update_sync(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify (and possibly re-hash) a password on the calling thread."""
+        started = time.perf_counter()
+        result = self.context.verify_and_update(_truncate(password), hashed_password)
+        password_hash_duration.observe(time.perf_counter() - started, "verify")
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password on the hashing pool.
+
+        Args:
+            password: Plain-text password
+
+        Returns:
+            bcrypt hash
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.hash_sync, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password on the hashing pool, re-hashing it if its cost is outdated.
+
+        Args:
+            password: Plain-text password
+            hashed_password: Stored hash
+
+        Returns:
+            Tuple of (valid, replacement hash to store or None)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._verify_and_update_sync, password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the hashing pool (it is recreated on next use)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    max_workers=settings.password_hash_workers
+)
@@ -0,0 +1,187 @@
+import math
+import numpy as np
+from typing import Optional
+
+# Google's encoded polyline format stores coordinates as 1e-5 degree integers
+PRECISION = 1e5
+
+# Approximate meters per degree, used to project small areas onto a plane
+METERS_PER_DEGREE_LAT = 110540.0
+METERS_PER_DEGREE_LNG = 111320.0
+
+# Meters per pixel at zoom level 0 on the equator (Web Mercator)
+METERS_PER_PIXEL_ZOOM_0 = 156543.03392
+
+# A 64-bit value needs at most 7 five-bit chunks for the deltas polylines carry
+_MAX_CHUNKS = 7
+
+
+def decode(encoded: str) -> np.ndarray:
+    """
+    Decode a Google encoded polyline.
+
+    Args:
+        encoded: Encoded polyline string
+
+    Returns:
+        Array of shape (n, 2) with (latitude, longitude) rows
+
+    Raises:
+        ValueError: If the string is not a valid encoded polyline
+    """
+    if not encoded:
+        return np.empty((0, 2))
+
+    try:
+        data = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    except UnicodeEncodeError:
+        raise ValueError("Encoded polyline contains non-ASCII characters")
+    if data.min() < 0 or data.max() > 0x3f:
+        raise ValueError("Encoded polyline contains invalid characters")
+
+    # Each value is a run of 5-bit chunks; the last chunk has the 0x20 bit clear
+    is_last = data < 0x20
+    if not is_last[-1]:
+        raise ValueError("Encoded polyline is truncated")
+    starts = np.flatnonzero(np.concatenate(([True], is_last[:-1])))
+    group = np.cumsum(np.concatenate(([0], is_last[:-1].astype(np.int64))))
+    position = np.arange(len(data)) - starts[group]
+    values = np.add.reduceat((data & 0x1f) << (5 * position), starts)
+
+    if len(values) % 2:
+        raise ValueError("Encoded polyline has an odd number of values")
+
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / PRECISION
+
+
+def encode(points: np.ndarray) -> str:
+    """
+    Encode coordinates as a Google encoded polyline.
+
+    Args:
+        points: Array-like of shape (n, 2) with (latitude, longitude) rows
+
+    Returns:
+        Encoded polyline string
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return ""
+
+    scaled = np.round(points * PRECISION).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    # Split every value into 5-bit chunks, low bits first, flagging all but the last
+    parts = values[:, np.newaxis] >> (5 * np.arange(_MAX_CHUNKS))
+    has_more = (parts >> 5) > 0
+    present = np.concatenate((np.ones((len(values), 1), dtype=bool), has_more[:, :-1]), axis=1)
+    chars = ((parts & 0x1f) | (has_more * 0x20)) + 63
+    return chars[present].astype(np.uint8).tobytes().decode("ascii")
+
+
+def tolerance_for_zoom(zoom: int, latitude: float = 0.0) -> float:
+    """
+    Return the ground distance of one map pixel at a zoom level, in meters.
+
+    Args:
+        zoom: Web map zoom level (0 = whole world)
+        latitude: Latitude the map is centered on
+
+    Returns:
+        Meters per pixel
+    """
+    return METERS_PER_PIXEL_ZOOM_0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+
+def simplify(points: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Simplify a line with the Douglas-Peucker algorithm.
+
+    Args:
+        points: Array of shape (n, 2) with (latitude, longitude) rows
+        tolerance_m: Maximum distance in meters between the original and
+            simplified line
+
+    Returns:
+        Array with the retained points, always including both endpoints
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) < 3 or tolerance_m <= 0:
+        return points
+
+    # Project onto a local plane in meters; accurate enough for tolerance checks
+    mean_lat = math.radians(points[:, 0].mean())
+    xy = np.column_stack((
+        points[:, 1] * METERS_PER_DEGREE_LNG * math.cos(mean_lat),
+        points[:, 0] * METERS_PER_DEGREE_LAT
+    ))
+
+    # Classic Douglas-Peucker splits one segment at a time; here every open
+    # segment is split at its farthest point in the same pass, which gives the
+    # same result in a few NumPy passes instead of one Python iteration per point
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    active = np.arange(1, len(points) - 1)
+    while len(active):
+        kept = np.flatnonzero(keep)
+        segment_of = np.searchsorted(kept, active, side="right") - 1
+        start = xy[kept[segment_of]]
+        segment = xy[kept[segment_of + 1]] - start
+        offset = xy[active] - start
+        length_sq = np.einsum("ij,ij->i", segment, segment)
+        t = np.einsum("ij,ij->i", offset, segment) / np.where(length_sq == 0, 1.0, length_sq)
+        t = np.clip(np.where(length_sq == 0, 0.0, t), 0.0, 1.0)
+        distances = np.hypot(*(offset - t[:, np.newaxis] * segment).T)
+
+        # Active points are sorted, so each segment's points are contiguous
+        group_starts = np.flatnonzero(np.concatenate(([True], np.diff(segment_of) != 0)))
+        group_max = np.maximum.reduceat(distances, group_starts)
+        group_of = np.cumsum(np.concatenate(([0], (np.diff(segment_of) != 0).astype(np.int64))))
+        split = (distances > tolerance_m) & (distances == group_max[group_of])
+        if not split.any():
+            break
+        # Split each segment once, at its first farthest point
+        candidates = np.flatnonzero(split)
+        _, first = np.unique(group_of[candidates], return_index=True)
+        keep[active[candidates[first]]] = True
+
+        # Segments within tolerance are final; only points of split segments stay active
+        still_open = group_max[group_of] > tolerance_m
+        active = active[still_open & ~keep[active]]
+
+    return points[keep]
+
+
+def shape_polyline(
+    encoded: Optional[str],
+    include: bool = True,
+    tolerance_m: Optional[float] = None,
+    zoom: Optional[int] = None
+) -> Optional[str]:
+    """
+    Apply a client's polyline preferences to an encoded polyline.
+
+    Args:
+        encoded: Encoded polyline from the routing backend
+        include: Whether the client wants a polyline at all
+        tolerance_m: Simplification tolerance in meters (takes precedence over zoom)
+        zoom: Map zoom level to simplify for (one pixel of tolerance)
+
+    Returns:
+        The encoded polyline, simplified if requested, or None if not included
+    """
+    if not include:
+        return None
+    if not encoded or (tolerance_m is None and zoom is None):
+        return encoded
+
+    try:
+        points = decode(encoded)
+    except ValueError:
+        # Never fail a route over an undecodable polyline; pass it through as-is
+        return encoded
+    if tolerance_m is None:
+        tolerance_m = tolerance_for_zoom(zoom, latitude=float(points[:, 0].mean()))
+    return encode(simplify(points, tolerance_m))
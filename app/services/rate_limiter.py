@@ -0,0 +1,286 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import SessionLocal
+from app.models.rate_limit import RateLimitBucket
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted within its allowed wait."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _schedule(
+    tat: float, now: float, rate: float, burst: int, max_wait: float, cost: int = 1
+) -> Tuple[bool, float, float]:
+    """
+    Token bucket decision in its GCRA form, which needs a single stored number.
+
+    The bucket is represented by its theoretical arrival time (TAT): the time
+    at which it would be full again. A request for cost tokens may proceed
+    once now is within burst - cost emission intervals of the TAT. A cost
+    above burst needs a full bucket and leaves the client in debt for the
+    rest, so later requests wait until it is paid off.
+
+    Returns:
+        Tuple of (granted, seconds to wait before proceeding, new TAT)
+    """
+    interval = 1.0 / rate
+    tat = max(tat, now)
+    wait = max(0.0, tat - (burst - min(cost, burst)) * interval - now)
+    if wait > max_wait:
+        return False, wait, tat
+    return True, wait, tat + cost * interval
+
+
+class MemoryRateLimitBackend:
+    """Bucket state in this process; limits apply per worker."""
+
+    def __init__(self):
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def reserve(self, key: str, rate: float, burst: int, max_wait: float, cost: int = 1) -> Tuple[bool, float]:
+        """
+        Reserve request slots if they become available within max_wait.
+
+        Args:
+            key: Bucket key
+            rate: Sustained requests per second
+            burst: Requests allowed back to back
+            max_wait: Longest acceptable wait in seconds (0 = admit now or refuse)
+            cost: Number of slots the request takes
+
+        Returns:
+            Tuple of (granted, seconds to wait before proceeding or until a retry may succeed)
+        """
+        with self._lock:
+            granted, wait, tat = _schedule(self._tats.get(key, 0.0), time.time(), rate, burst, max_wait, cost)
+            if granted:
+                self._tats[key] = tat
+        return granted, wait
+
+
+class DatabaseRateLimitBackend:
+    """
+    Bucket state in the rate_limit_buckets table, shared by all workers and instances.
+
+    Each decision is one short transaction that locks the bucket row, so it
+    costs a database round trip per limited request.
+    """
+
+    def _reserve_sync(self, key: str, rate: float, burst: int, max_wait: float, cost: int) -> Tuple[bool, float]:
+        with SessionLocal() as db:
+            dialect_name = db.get_bind().dialect.name
+            if dialect_name in ("postgresql", "sqlite"):
+                dialect_insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+                db.execute(dialect_insert(RateLimitBucket).values(key=key, tat=0.0).on_conflict_do_nothing())
+            elif db.get(RateLimitBucket, key) is None:
+                db.add(RateLimitBucket(key=key, tat=0.0))
+                try:
+                    db.flush()
+                except IntegrityError:
+                    db.rollback()
+
+            stored_tat = db.scalar(
+                select(RateLimitBucket.tat).where(RateLimitBucket.key == key).with_for_update()
+            )
+            granted, wait, tat = _schedule(stored_tat, time.time(), rate, burst, max_wait, cost)
+            if granted:
+                db.execute(update(RateLimitBucket).where(RateLimitBucket.key == key).values(tat=tat))
+            db.commit()
+        return granted, wait
+
+    async def reserve(self, key: str, rate: float, burst: int, max_wait: float, cost: int = 1) -> Tuple[bool, float]:
+        """See MemoryRateLimitBackend.reserve."""
+        return await asyncio.to_thread(self._reserve_sync, key, rate, burst, max_wait, cost)
+
+
+def create_backend(name: str):
+    """Create the rate limit backend named in settings ("memory" or "database")."""
+    if name == "database":
+        return DatabaseRateLimitBackend()
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+class RequestGovernor:
+    """
+    Outbound governor: a token bucket plus a concurrency cap.
+
+    Callers over the rate or cap queue until a slot frees up, and fail with
+    RateLimitExceeded only when that would take longer than max_wait. The
+    bucket lives in the shared backend; the concurrency cap is per worker.
+    """
+
+    def __init__(self, backend, key: str, qps: float, burst: int, max_concurrency: int, max_wait: float, enabled: bool):
+        """
+        Initialize the governor.
+
+        Args:
+            backend: Rate limit backend holding the bucket
+            key: Bucket key
+            qps: Sustained requests per second
+            burst: Requests allowed back to back
+            max_concurrency: Requests in flight at once in this worker
+            max_wait: Seconds a caller may queue before giving up
+            enabled: When False, every request is admitted immediately
+        """
+        self.backend = backend
+        self.key = key
+        self.qps = qps
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def limit(self) -> AsyncIterator[None]:
+        """
+        Hold a request slot for the duration of the block.
+
+        Raises:
+            RateLimitExceeded: If no slot is available within max_wait
+        """
+        if not self.enabled:
+            yield
+            return
+
+        # Take the concurrency slot before the bucket token, so a caller
+        # that times out waiting for a slot has not spent a token.
+        started = time.monotonic()
+        if not self._semaphore.locked():
+            # Free slot: taken without suspending, which wait_for(timeout=0) would refuse
+            await self._semaphore.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Too many concurrent {self.key} requests", retry_after=1.0)
+
+        try:
+            remaining = max(self.max_wait - (time.monotonic() - started), 0.0)
+            granted, wait = await self.backend.reserve(self.key, self.qps, self.burst, remaining)
+            if not granted:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Outbound rate limit for {self.key} exceeded", retry_after=wait)
+            if wait > 0:
+                self.queued += 1
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        self.admitted += 1
+        self.wait_seconds += time.monotonic() - started
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return admission counters for this process."""
+        return {
+            'enabled': self.enabled,
+            'qps': self.qps,
+            'burst': self.burst,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.max_concurrency - self._semaphore._value,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected': self.rejected,
+            'average_wait_seconds': round(self.wait_seconds / self.admitted, 4) if self.admitted else 0.0
+        }
+
+
+class InboundRateLimiter:
+    """Per-client token bucket for incoming requests; over-limit requests are refused, not queued."""
+
+    def __init__(self, backend, name: str, per_minute: float, burst: int, enabled: bool):
+        """
+        Initialize the limiter.
+
+        Args:
+            backend: Rate limit backend holding the buckets
+            name: Prefix for bucket keys
+            per_minute: Sustained requests per minute per client
+            burst: Requests a client may make back to back
+            enabled: When False, every request is admitted
+        """
+        self.backend = backend
+        self.name = name
+        self.per_minute = per_minute
+        self.burst = burst
+        self.enabled = enabled
+        self.admitted = 0
+        self.rejected = 0
+
+    async def check(self, client_key: str, cost: int = 1) -> None:
+        """
+        Admit one request from a client.
+
+        Args:
+            client_key: Identifies the client, e.g. "user:42" or "ip:203.0.113.7"
+            cost: Units the request is charged, e.g. the route lookups it fans out to
+
+        Raises:
+            RateLimitExceeded: If the client is over its limit
+        """
+        if not self.enabled:
+            return
+        granted, wait = await self.backend.reserve(
+            f"{self.name}:{client_key}", self.per_minute / 60.0, self.burst, 0.0, max(cost, 1)
+        )
+        if not granted:
+            self.rejected += 1
+            raise RateLimitExceeded(f"Rate limit exceeded for {self.name}", retry_after=wait)
+        self.admitted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return admission counters for this process."""
+        return {
+            'enabled': self.enabled,
+            'per_minute': self.per_minute,
+            'burst': self.burst,
+            'admitted': self.admitted,
+            'rejected': self.rejected
+        }
+
+
+# Global rate limiter instances
+rate_limit_backend = create_backend(settings.rate_limit_backend)
+
+maps_governor = RequestGovernor(
+    backend=rate_limit_backend,
+    key="maps",
+    qps=settings.maps_qps,
+    burst=settings.maps_burst,
+    max_concurrency=settings.maps_max_concurrent_requests,
+    max_wait=settings.maps_queue_timeout_seconds,
+    enabled=settings.rate_limit_enabled
+)
+
+calculate_rate_limiter = InboundRateLimiter(
+    backend=rate_limit_backend,
+    name="calculate",
+    per_minute=settings.route_calculate_per_minute,
+    burst=settings.route_calculate_burst,
+    enabled=settings.rate_limit_enabled
+)
@@ -0,0 +1,669 @@
+import asyncio
+import heapq
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.geo import EARTH_RADIUS_M, haversine_m, haversine_m_array, parse_lat_lng
+from app.services.metrics import local_route_duration
+from app.services.polyline import encode as encode_polyline
+
+FORMAT_VERSION = 1
+
+# Side of a spatial index cell in degrees (about 1 km north-south)
+DEFAULT_CELL_DEGREES = 0.01
+
+# Node and edge arrays of the on-disk format, one .npy file each
+ARRAY_FILES = (
+    "lat", "lng", "offsets", "targets", "length_m", "travel_s",
+    "grid_cells", "grid_offsets", "grid_nodes"
+)
+
+# Contraction hierarchy arrays (ch_*.npy), present when built with contraction
+CH_ARRAY_FILES = (
+    "up_offsets", "up_targets", "up_travel_s", "up_length_m", "up_middle",
+    "down_offsets", "down_sources", "down_travel_s", "down_length_m", "down_middle"
+)
+
+# Nodes a witness search may settle before assuming a shortcut is needed;
+# lower builds faster but adds shortcuts that are not strictly necessary
+DEFAULT_WITNESS_SETTLE_LIMIT = 100
+
+
+class LocalRoutingError(ValueError):
+    """Raised when the local engine cannot answer a query (not coordinates, off the graph, no path)."""
+
+
+class LocalGraphUnavailableError(Exception):
+    """Raised when the local engine has no road graph to route on (not built or unreadable)."""
+
+
+def _cell_ids(lat, lng, cell_degrees: float) -> np.ndarray:
+    """Spatial index cell of each point, numbered row by row from (-90, -180)."""
+    columns = int(math.ceil(360.0 / cell_degrees)) + 1
+    rows = np.floor((np.asarray(lat) + 90.0) / cell_degrees).astype(np.int64)
+    cols = np.floor((np.asarray(lng) + 180.0) / cell_degrees).astype(np.int64)
+    return rows * columns + cols
+
+
+def contract_graph(
+    node_count: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    travel_s: np.ndarray,
+    length_m: np.ndarray,
+    witness_settle_limit: int = DEFAULT_WITNESS_SETTLE_LIMIT
+) -> Dict[str, np.ndarray]:
+    """
+    Build a contraction hierarchy for fastest-path queries.
+
+    Nodes are contracted one at a time, least important first (by edge
+    difference plus contracted neighbors, updated lazily). Contracting v
+    adds a shortcut u -> w for each pair of neighbors whose fastest
+    connection runs through v, as checked by a bounded witness search.
+    Every edge then leads up or down in rank, and a query only searches
+    upward from both ends.
+
+    This runs in pure Python and is meant for an offline build: expect
+    minutes for a city-sized graph.
+
+    Args:
+        node_count: Number of nodes
+        sources, targets: Edge endpoints, shape (m,)
+        travel_s: Edge travel times in seconds, shape (m,)
+        length_m: Edge lengths in meters, shape (m,)
+        witness_settle_limit: Nodes a witness search may settle
+
+    Returns:
+        The CH_ARRAY_FILES arrays: edges to higher-ranked nodes per node
+        (up_*) and edges from higher-ranked nodes per node (down_*), with
+        the contracted middle node of each shortcut (-1 for original edges)
+    """
+    # node -> {neighbor: (travel_s, length_m, middle)}, only among uncontracted nodes
+    out_edges = [dict() for _ in range(node_count)]
+    in_edges = [dict() for _ in range(node_count)]
+
+    def add_edge(u: int, w: int, seconds: float, meters: float, middle: int) -> None:
+        current = out_edges[u].get(w)
+        if current is None or seconds < current[0]:
+            out_edges[u][w] = in_edges[w][u] = (seconds, meters, middle)
+
+    for u, w, seconds, meters in zip(sources.tolist(), targets.tolist(), travel_s.tolist(), length_m.tolist()):
+        if u != w:
+            add_edge(u, w, seconds, meters, -1)
+
+    def shortcuts_for(v: int) -> List[Tuple[int, int, float, float]]:
+        outgoing = out_edges[v]
+        if not outgoing:
+            return []
+        longest_out = max(edge[0] for edge in outgoing.values())
+        shortcuts = []
+        for u, (seconds_uv, meters_uv, _) in in_edges[v].items():
+            # Dijkstra from u that avoids v, bounded by the longest path through v
+            limit = seconds_uv + longest_out
+            costs = {u: 0.0}
+            heap = [(0.0, u)]
+            settled = 0
+            while heap and settled < witness_settle_limit:
+                cost, node = heapq.heappop(heap)
+                if cost > limit:
+                    break
+                if cost > costs[node]:
+                    continue
+                settled += 1
+                for neighbor, (seconds, _, _) in out_edges[node].items():
+                    neighbor_cost = cost + seconds
+                    if neighbor != v and neighbor_cost < costs.get(neighbor, math.inf):
+                        costs[neighbor] = neighbor_cost
+                        heapq.heappush(heap, (neighbor_cost, neighbor))
+            for w, (seconds_vw, meters_vw, _) in outgoing.items():
+                if w != u and costs.get(w, math.inf) > seconds_uv + seconds_vw:
+                    shortcuts.append((u, w, seconds_uv + seconds_vw, meters_uv + meters_vw))
+        return shortcuts
+
+    contracted_neighbors = [0] * node_count
+
+    def priority(v: int, shortcuts: list) -> int:
+        return len(shortcuts) - len(in_edges[v]) - len(out_edges[v]) + contracted_neighbors[v]
+
+    queue = [(priority(v, shortcuts_for(v)), v) for v in range(node_count)]
+    heapq.heapify(queue)
+    up, down = [None] * node_count, [None] * node_count
+    while queue:
+        _, v = heapq.heappop(queue)
+        shortcuts = shortcuts_for(v)
+        current = priority(v, shortcuts)
+        if queue and current > queue[0][0]:
+            # Importance grew since it was queued; contract something cheaper first
+            heapq.heappush(queue, (current, v))
+            continue
+        # v's remaining edges all lead to nodes contracted later (higher rank)
+        up[v] = list(out_edges[v].items())
+        down[v] = list(in_edges[v].items())
+        for u in in_edges[v]:
+            del out_edges[u][v]
+            contracted_neighbors[u] += 1
+        for w in out_edges[v]:
+            del in_edges[w][v]
+            contracted_neighbors[w] += 1
+        for u, w, seconds, meters in shortcuts:
+            add_edge(u, w, seconds, meters, v)
+
+    arrays = {}
+    for prefix, neighbor_name, adjacency in (("up", "targets", up), ("down", "sources", down)):
+        offsets = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum([len(edges) for edges in adjacency], out=offsets[1:])
+        flat = [(neighbor, *edge) for edges in adjacency for neighbor, edge in edges]
+        neighbors, seconds, meters, middles = zip(*flat) if flat else ((), (), (), ())
+        arrays[f"{prefix}_offsets"] = offsets
+        arrays[f"{prefix}_{neighbor_name}"] = np.asarray(neighbors, dtype=np.int32)
+        arrays[f"{prefix}_travel_s"] = np.asarray(seconds, dtype=np.float64)
+        arrays[f"{prefix}_length_m"] = np.asarray(meters, dtype=np.float64)
+        arrays[f"{prefix}_middle"] = np.asarray(middles, dtype=np.int32)
+    return arrays
+
+
+def write_road_graph(
+    path: str,
+    lat: np.ndarray,
+    lng: np.ndarray,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    length_m: np.ndarray,
+    travel_s: np.ndarray,
+    cell_degrees: float = DEFAULT_CELL_DEGREES,
+    contract: bool = True,
+    witness_settle_limit: int = DEFAULT_WITNESS_SETTLE_LIMIT
+) -> Dict[str, Any]:
+    """
+    Write a directed road graph in the format RoadGraph memory-maps.
+
+    Edges are stored in compressed sparse row order: the edges leaving node
+    u are targets[offsets[u]:offsets[u + 1]]. Nodes are also bucketed into a
+    grid of cell_degrees cells so coordinates can be snapped to the nearest
+    node without scanning the whole graph.
+
+    Args:
+        path: Output directory (created if missing)
+        lat, lng: Node coordinates in degrees, shape (n,)
+        sources, targets: Edge endpoints as node indexes, shape (m,)
+        length_m: Edge lengths in meters, shape (m,)
+        travel_s: Edge travel times in seconds, shape (m,)
+        cell_degrees: Spatial index cell size
+        contract: Also build the contraction hierarchy for fastest paths
+        witness_settle_limit: See contract_graph
+
+    Returns:
+        The metadata written to meta.json
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    sources = np.asarray(sources, dtype=np.int64)
+    length_m = np.asarray(length_m, dtype=np.float64)
+    travel_s = np.asarray(travel_s, dtype=np.float64)
+
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(len(lat) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(lat)), out=offsets[1:])
+
+    cells = _cell_ids(lat, lng, cell_degrees)
+    node_order = np.argsort(cells, kind="stable")
+    grid_cells, grid_counts = np.unique(cells[node_order], return_counts=True)
+    grid_offsets = np.zeros(len(grid_cells) + 1, dtype=np.int64)
+    np.cumsum(grid_counts, out=grid_offsets[1:])
+
+    arrays = {
+        "lat": lat,
+        "lng": lng,
+        "offsets": offsets,
+        "targets": np.asarray(targets, dtype=np.int32)[order],
+        "length_m": length_m[order].astype(np.float32),
+        "travel_s": travel_s[order].astype(np.float32),
+        "grid_cells": grid_cells,
+        "grid_offsets": grid_offsets,
+        "grid_nodes": node_order.astype(np.int32),
+    }
+    os.makedirs(path, exist_ok=True)
+    for name in ARRAY_FILES:
+        np.save(os.path.join(path, f"{name}.npy"), arrays[name])
+    if contract:
+        hierarchy = contract_graph(len(lat), sources, np.asarray(targets, dtype=np.int64), travel_s, length_m, witness_settle_limit)
+        for name in CH_ARRAY_FILES:
+            np.save(os.path.join(path, f"ch_{name}.npy"), hierarchy[name])
+
+    speeds = length_m / np.where(travel_s > 0, travel_s, np.inf)
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "nodes": int(len(lat)),
+        "edges": int(len(sources)),
+        "cell_degrees": cell_degrees,
+        "contracted": contract,
+        # Upper bound on speed keeps the travel time heuristic admissible
+        "max_speed_mps": float(speeds.max()) if len(speeds) else 1.0,
+    }
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class RoadGraph:
+    """
+    Read-only road graph memory-mapped from the files written by write_road_graph.
+
+    Pages are loaded by the OS on first touch and shared between worker
+    processes, so opening a large graph is instant and costs no heap.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a graph directory.
+
+        Args:
+            path: Directory written by write_road_graph
+
+        Raises:
+            FileNotFoundError: If the directory or one of its files is missing
+            ValueError: If the files use an unsupported format version
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported road graph format in {path}")
+        self.path = path
+        self.cell_degrees = self.meta["cell_degrees"]
+        self.max_speed_mps = self.meta["max_speed_mps"]
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAY_FILES}
+        self.lat = arrays["lat"]
+        self.lng = arrays["lng"]
+        self.grid_cells = arrays["grid_cells"]
+        self.grid_offsets = arrays["grid_offsets"]
+        self.grid_nodes = arrays["grid_nodes"]
+        # The search loop indexes element by element; memoryviews return
+        # plain Python numbers without creating NumPy scalars
+        self._offsets = memoryview(arrays["offsets"])
+        self._targets = memoryview(arrays["targets"])
+        self._length_m = memoryview(arrays["length_m"])
+        self._travel_s = memoryview(arrays["travel_s"])
+        self._lat = memoryview(self.lat)
+        self._lng = memoryview(self.lng)
+        self.contracted = bool(self.meta.get("contracted"))
+        self._ch = {}
+        if self.contracted:
+            self._ch = {
+                name: memoryview(np.load(os.path.join(path, f"ch_{name}.npy"), mmap_mode="r"))
+                for name in CH_ARRAY_FILES
+            }
+
+    @property
+    def node_count(self) -> int:
+        return self.meta["nodes"]
+
+    def nearest_node(self, lat: float, lng: float, max_distance_m: float) -> Tuple[int, float]:
+        """
+        Snap a coordinate to the nearest graph node.
+
+        Args:
+            lat, lng: Coordinate in degrees
+            max_distance_m: Farthest acceptable node
+
+        Returns:
+            Tuple of (node index, distance in meters)
+
+        Raises:
+            LocalRoutingError: If no node is within max_distance_m
+        """
+        if not len(self.grid_cells):
+            raise LocalRoutingError("The road graph is empty")
+        # East-west cell width shrinks with latitude; bound distances by the narrower side
+        cell_m = self.cell_degrees * math.radians(EARTH_RADIUS_M) * max(math.cos(math.radians(lat)), 0.01)
+        max_ring = int(math.ceil(max_distance_m / cell_m)) + 1
+        center = int(_cell_ids(lat, lng, self.cell_degrees))
+        columns = int(math.ceil(360.0 / self.cell_degrees)) + 1
+
+        best_node, best_distance = -1, math.inf
+        for ring in range(max_ring + 1):
+            # Nodes in this ring of cells are at least ring - 1 cell widths away
+            if (ring - 1) * cell_m > min(best_distance, max_distance_m):
+                break
+            steps = np.arange(-ring, ring + 1)
+            rows, cols = np.meshgrid(steps, steps, indexing="ij")
+            on_ring = (np.abs(rows) == ring) | (np.abs(cols) == ring)
+            cells = center + rows[on_ring] * columns + cols[on_ring]
+            index = np.minimum(np.searchsorted(self.grid_cells, cells), len(self.grid_cells) - 1)
+            index = index[self.grid_cells[index] == cells]
+            if not len(index):
+                continue
+            nodes = np.concatenate([
+                self.grid_nodes[self.grid_offsets[i]:self.grid_offsets[i + 1]] for i in index.tolist()
+            ])
+            distances = haversine_m_array(lat, lng, self.lat[nodes], self.lng[nodes])
+            nearest = int(np.argmin(distances))
+            if distances[nearest] < best_distance:
+                best_node, best_distance = int(nodes[nearest]), float(distances[nearest])
+
+        if best_distance > max_distance_m:
+            raise LocalRoutingError(f"No road within {max_distance_m:.0f} m of {lat},{lng}")
+        return best_node, best_distance
+
+    def shortest_path(self, source: int, target: int, weight: str = "travel_s") -> Tuple[List[int], float, float]:
+        """
+        Find the cheapest path between two nodes.
+
+        Fastest paths use the contraction hierarchy when the graph has one;
+        everything else uses A*.
+
+        Args:
+            source: Start node index
+            target: End node index
+            weight: "travel_s" for the fastest path, "length_m" for the shortest
+
+        Returns:
+            Tuple of (node indexes along the path, meters, seconds)
+
+        Raises:
+            LocalRoutingError: If target is unreachable from source
+        """
+        if weight == "travel_s" and self.contracted:
+            return self._contracted_path(source, target)
+        return self._astar_path(source, target, weight)
+
+    def _astar_path(self, source: int, target: int, weight: str) -> Tuple[List[int], float, float]:
+        """
+        A* search on the original graph.
+
+        The heuristic is the straight-line distance to the target (divided by
+        the graph's top speed when minimizing travel time), which never
+        overestimates, so the path found is optimal.
+        """
+        offsets, targets = self._offsets, self._targets
+        weights = self._travel_s if weight == "travel_s" else self._length_m
+        lat, lng = self._lat, self._lng
+        # Shaved slightly so float32 edge weights cannot make it overestimate
+        scale = (1.0 / self.max_speed_mps if weight == "travel_s" else 1.0) * 0.999
+        target_lat, target_lng = lat[target], lng[target]
+
+        best = {source: 0.0}
+        # node -> (previous node, edge taken)
+        via = {source: None}
+        closed = set()
+        heap = [(haversine_m(lat[source], lng[source], target_lat, target_lng) * scale, 0.0, source)]
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[edge]
+                neighbor_cost = cost + weights[edge]
+                if neighbor_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = neighbor_cost
+                    via[neighbor] = (node, edge)
+                    estimate = haversine_m(lat[neighbor], lng[neighbor], target_lat, target_lng) * scale
+                    heapq.heappush(heap, (neighbor_cost + estimate, neighbor_cost, neighbor))
+        else:
+            if source != target:
+                raise LocalRoutingError("No road connection between the two points")
+
+        nodes = [target]
+        meters = seconds = 0.0
+        step = via[target]
+        while step is not None:
+            node, edge = step
+            nodes.append(node)
+            meters += self._length_m[edge]
+            seconds += self._travel_s[edge]
+            step = via[node]
+        nodes.reverse()
+        return nodes, meters, seconds
+
+    def _contracted_path(self, source: int, target: int) -> Tuple[List[int], float, float]:
+        """
+        Bidirectional Dijkstra on the contraction hierarchy.
+
+        Both searches only climb to higher-ranked nodes, so each settles a
+        small fraction of the graph; shortcuts on the meeting path are then
+        unpacked into original nodes.
+        """
+        up_offsets, up_targets, up_weights = self._ch["up_offsets"], self._ch["up_targets"], self._ch["up_travel_s"]
+        down_offsets, down_sources, down_weights = (
+            self._ch["down_offsets"], self._ch["down_sources"], self._ch["down_travel_s"]
+        )
+        # Per direction: best costs, node -> (previous node, CH edge), queue
+        costs = ({source: 0.0}, {target: 0.0})
+        via = ({source: None}, {target: None})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meeting = (0.0, source) if source == target else (math.inf, -1)
+
+        while heaps[0] or heaps[1]:
+            for direction in (0, 1):
+                heap = heaps[direction]
+                if not heap:
+                    continue
+                cost, node = heapq.heappop(heap)
+                if cost >= best:
+                    # Nothing left in this direction can improve the meeting point
+                    heap.clear()
+                    continue
+                if cost > costs[direction][node]:
+                    continue
+                other_cost = costs[1 - direction].get(node)
+                if other_cost is not None and cost + other_cost < best:
+                    best, meeting = cost + other_cost, node
+                if direction == 0:
+                    offsets, neighbors, weights = up_offsets, up_targets, up_weights
+                else:
+                    offsets, neighbors, weights = down_offsets, down_sources, down_weights
+                for edge in range(offsets[node], offsets[node + 1]):
+                    neighbor = neighbors[edge]
+                    neighbor_cost = cost + weights[edge]
+                    if neighbor_cost < costs[direction].get(neighbor, math.inf):
+                        costs[direction][neighbor] = neighbor_cost
+                        via[direction][neighbor] = (node, edge)
+                        heapq.heappush(heap, (neighbor_cost, neighbor))
+
+        if meeting == -1:
+            raise LocalRoutingError("No road connection between the two points")
+
+        # Packed path as (from, to, middle) edges, then shortcuts expanded
+        packed = []
+        meters = seconds = 0.0
+        node = meeting
+        while via[0][node] is not None:
+            previous, edge = via[0][node]
+            packed.append((previous, node, self._ch["up_middle"][edge]))
+            meters += self._ch["up_length_m"][edge]
+            seconds += up_weights[edge]
+            node = previous
+        packed.reverse()
+        node = meeting
+        while via[1][node] is not None:
+            following, edge = via[1][node]
+            packed.append((node, following, self._ch["down_middle"][edge]))
+            meters += self._ch["down_length_m"][edge]
+            seconds += down_weights[edge]
+            node = following
+
+        nodes = [source]
+        for start, end, middle in packed:
+            nodes.extend(self._unpack(start, end, middle))
+        return nodes, meters, seconds
+
+    def _unpack(self, start: int, end: int, middle: int) -> List[int]:
+        """Expand a CH edge into the original nodes after start, up to and including end."""
+        nodes = []
+        stack = [(start, end, middle)]
+        while stack:
+            start, end, middle = stack.pop()
+            if middle == -1:
+                nodes.append(end)
+                continue
+            # The middle node ranks below both ends: start -> middle is one of
+            # its downward edges, middle -> end one of its upward edges
+            first = self._find_edge(self._ch["down_offsets"], self._ch["down_sources"], middle, start)
+            second = self._find_edge(self._ch["up_offsets"], self._ch["up_targets"], middle, end)
+            # Stack order keeps the first half in front
+            stack.append((middle, end, self._ch["up_middle"][second]))
+            stack.append((start, middle, self._ch["down_middle"][first]))
+        return nodes
+
+    @staticmethod
+    def _find_edge(offsets, neighbors, node: int, neighbor: int) -> int:
+        for edge in range(offsets[node], offsets[node + 1]):
+            if neighbors[edge] == neighbor:
+                return edge
+        raise ValueError(f"Corrupt contraction hierarchy: no edge between {node} and {neighbor}")
+
+    def path_polyline(self, nodes: List[int]) -> str:
+        """Encoded polyline through the given nodes."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return encode_polyline(np.column_stack((self.lat[nodes], self.lng[nodes])))
+
+
+class LocalRoutingEngine:
+    """
+    Routing backend answering from a local road graph, without network access.
+
+    Locations must be "lat,lng" coordinates; they are snapped to the nearest
+    graph node. Routes are free and computed in milliseconds, so they skip
+    the route caches. There is no live traffic: durations come from the
+    speeds in the graph.
+    """
+
+    name = "local"
+    use_route_cache = False
+
+    def __init__(self, graph_path: str, max_snap_m: float):
+        """
+        Initialize the engine; the graph is opened on first use.
+
+        Args:
+            graph_path: Directory written by scripts/build_road_graph.py
+            max_snap_m: Farthest a location may be from the nearest road
+        """
+        self.graph_path = graph_path
+        self.max_snap_m = max_snap_m
+        self._graph: Optional[RoadGraph] = None
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def _missing_graph_message(self) -> str:
+        return f"Local road graph not found at {self.graph_path} (build it with scripts/build_road_graph.py)"
+
+    @property
+    def graph(self) -> RoadGraph:
+        """
+        The memory-mapped graph, opened on first use.
+
+        Raises:
+            LocalGraphUnavailableError: If the graph has not been built or cannot be opened
+        """
+        if self._graph is None:
+            with self._lock:
+                if self._graph is None:
+                    if not os.path.exists(os.path.join(self.graph_path, "meta.json")):
+                        raise LocalGraphUnavailableError(self._missing_graph_message())
+                    try:
+                        self._graph = RoadGraph(self.graph_path)
+                    except (OSError, ValueError) as e:
+                        raise LocalGraphUnavailableError(
+                            f"Local road graph at {self.graph_path} cannot be opened: {e} "
+                            "(rebuild it with scripts/build_road_graph.py)"
+                        )
+        return self._graph
+
+    def _snap(self, location: str) -> int:
+        point = parse_lat_lng(location)
+        if point is None:
+            raise LocalRoutingError(f"The local routing engine needs 'lat,lng' coordinates, got '{location}'")
+        node, _ = self.graph.nearest_node(point[0], point[1], self.max_snap_m)
+        return node
+
+    def route_sync(self, origin: str, destination: str, alternatives: bool = False) -> List[Dict[str, Any]]:
+        """
+        Compute routes on the calling thread.
+
+        Args:
+            origin: Starting coordinates ("lat,lng")
+            destination: Ending coordinates ("lat,lng")
+            alternatives: Also return the shortest path if it differs from the fastest
+
+        Returns:
+            Routes in the same shape as GoogleMapsClient.get_directions
+
+        Raises:
+            LocalRoutingError: If a location is not coordinates, is off the graph,
+                or the two points are not connected
+            LocalGraphUnavailableError: If the road graph has not been built
+        """
+        graph = self.graph
+        source, target = self._snap(origin), self._snap(destination)
+        weights = ("travel_s", "length_m") if alternatives else ("travel_s",)
+
+        routes = []
+        seen_paths = []
+        for weight in weights:
+            started = time.perf_counter()
+            nodes, meters, seconds = graph.shortest_path(source, target, weight)
+            local_route_duration.observe(time.perf_counter() - started, weight)
+            self.queries += 1
+            if nodes in seen_paths:
+                continue
+            seen_paths.append(nodes)
+            routes.append({
+                'distance_meters': int(round(meters)),
+                'duration_seconds': int(round(seconds)),
+                'polyline': graph.path_polyline(nodes),
+                'route_type': 'fastest' if weight == "travel_s" else 'shortest',
+                'start_address': origin,
+                'end_address': destination
+            })
+        return routes
+
+    async def get_directions(
+        self,
+        origin: str,
+        destination: str,
+        alternatives: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Compute routes off the event loop (see route_sync).
+
+        Args:
+            origin: Starting coordinates ("lat,lng")
+            destination: Ending coordinates ("lat,lng")
+            alternatives: Also return the shortest path if it differs from the fastest
+
+        Returns:
+            Routes in the same shape as GoogleMapsClient.get_directions
+
+        Raises:
+            LocalRoutingError: If a location is not coordinates, is off the graph,
+                or the two points are not connected
+            LocalGraphUnavailableError: If the road graph has not been built
+        """
+        return await asyncio.to_thread(self.route_sync, origin, destination, alternatives)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return whether the graph is available, its size and the query count."""
+        available = self._graph is not None or os.path.exists(os.path.join(self.graph_path, "meta.json"))
+        return {
+            'graph_path': self.graph_path,
+            'available': available,
+            'error': None if available else self._missing_graph_message(),
+            'loaded': self._graph is not None,
+            'nodes': self._graph.node_count if self._graph is not None else None,
+            'queries': self.queries
+        }
+
+
+# Global local routing engine instance
+local_routing_engine = LocalRoutingEngine(
+    graph_path=settings.local_graph_path,
+    max_snap_m=settings.local_graph_max_snap_m
+)
@@ -0,0 +1,367 @@
+import asyncio
+import copy
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.database import SessionLocal
+from app.models.route_cache import RouteCacheEntry
+from app.services.geo import parse_lat_lng
+
+logger = logging.getLogger(__name__)
+
+
+# Street types expanded when normalizing addresses, so "Main St" and
+# "main street" share a cache key. Only the last word of an address part
+# (ignoring house numbers) is a street type: "St Louis" and "Hartford, CT"
+# keep their abbreviations
+STREET_TYPE_ABBREVIATIONS = {
+    "st": "street",
+    "rd": "road",
+    "ave": "avenue",
+    "av": "avenue",
+    "blvd": "boulevard",
+    "dr": "drive",
+    "ln": "lane",
+    "ct": "court",
+    "sq": "square",
+    "hwy": "highway",
+    "pkwy": "parkway",
+    "str": "strasse",
+}
+
+# Abbreviations expanded wherever they appear, so "Berlin Hbf" and
+# "berlin hauptbahnhof" share a cache key
+ADDRESS_ABBREVIATIONS = {
+    "ctr": "center",
+    "hbf": "hauptbahnhof",
+    "bhf": "bahnhof",
+    "bf": "bahnhof",
+    "intl": "international",
+}
+
+# Decimal places kept of "lat,lng" locations (about 1 m)
+COORDINATE_DECIMALS = 5
+
+_ADDRESS_WORD = re.compile(r"[^\W_]+")
+_ADDRESS_PART_SEPARATOR = re.compile(r"[,;]")
+
+
+def format_lat_lng(lat: float, lng: float) -> str:
+    """Format coordinates as the canonical "lat,lng" location string."""
+    return f"{round(lat, COORDINATE_DECIMALS) + 0.0!r},{round(lng, COORDINATE_DECIMALS) + 0.0!r}"
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalize a location string for use in cache keys.
+
+    Coordinates are rounded to COORDINATE_DECIMALS. Addresses are
+    case-folded, stripped of punctuation and have common abbreviations
+    expanded ("Hauptstr." and "hauptstraße" both become "hauptstrasse");
+    street types only where they end an address part ("Main St, Springfield"
+    becomes "main street, springfield", "St Louis" stays "st louis").
+    Normalizing a normalized location returns it unchanged.
+
+    Args:
+        location: Address or "lat,lng" coordinates
+
+    Returns:
+        Normalized location
+    """
+    point = parse_lat_lng(location)
+    if point is not None:
+        return format_lat_lng(*point)
+    text = unicodedata.normalize("NFKC", location).casefold().replace("'", "").replace("\u2019", "")
+    parts = []
+    for part in _ADDRESS_PART_SEPARATOR.split(text):
+        words = _ADDRESS_WORD.findall(part)
+        # The street type is the last word before any house number, after a name
+        named = [i for i, word in enumerate(words) if not any(c.isdigit() for c in word)]
+        street_type = named[-1] if len(named) > 1 else None
+        for i, word in enumerate(words):
+            if i == street_type:
+                word = STREET_TYPE_ABBREVIATIONS.get(word, word)
+            word = ADDRESS_ABBREVIATIONS.get(word, word)
+            if len(word) > 3 and word.endswith("str"):
+                # German street suffix, e.g. "hauptstr"
+                word += "asse"
+            words[i] = word
+        if words:
+            parts.append(" ".join(words))
+    return ", ".join(parts)
+
+
+def make_route_key(origin: str, destination: str, alternatives: bool) -> Tuple[str, str, bool]:
+    """Build the cache key for a route request."""
+    return (normalize_location(origin), normalize_location(destination), bool(alternatives))
+
+
+class RouteCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, stale_seconds: float = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the least recently used
+            ttl_seconds: Seconds an entry stays valid after it was stored
+            stale_seconds: Seconds an expired entry is kept for get_stale
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return a copy of the cached value, or None if missing or expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                if expires_at + self.stale_seconds <= now:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers may mutate the result, so never hand out the stored object
+        return copy.deepcopy(value)
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """
+        Return a copy of the cached value even if expired, or None if missing
+        or past the stale window.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at + self.stale_seconds <= now:
+                del self._entries[key]
+                return None
+            self.stale_hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.stale_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stale_hits': self.stale_hits,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class PersistentRouteCache:
+    """Route cache stored in the route_cache table, shared by all workers and instances."""
+
+    def __init__(self, ttl_seconds: float, purge_batch_size: int, stale_seconds: float = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Seconds a row stays valid after it was fetched
+            purge_batch_size: Number of expired rows deleted per purge transaction
+            stale_seconds: Seconds an expired row is still returned by lookup before purging
+        """
+        self.ttl_seconds = ttl_seconds
+        self.purge_batch_size = purge_batch_size
+        self.stale_seconds = stale_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def _key_string(key: Tuple[str, str, bool]) -> str:
+        """Serialize a route key (see make_route_key) for the cache_key column."""
+        origin, destination, alternatives = key
+        return f"{origin}|{destination}|{int(alternatives)}"
+
+    def lookup(self, key: Tuple[str, str, bool]) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """
+        Read the stored route list in one query and classify it as fresh or stale.
+
+        Args:
+            key: Route key from make_route_key
+
+        Returns:
+            Tuple of (parsed route list as returned by
+            GoogleMapsClient.get_directions, or None if missing or past the
+            stale window; True if the routes are still within the TTL)
+        """
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            row = db.execute(
+                select(RouteCacheEntry.routes, RouteCacheEntry.fetched_at).where(
+                    RouteCacheEntry.cache_key == self._key_string(key),
+                    RouteCacheEntry.fetched_at > now - timedelta(seconds=self.ttl_seconds + self.stale_seconds)
+                )
+            ).first()
+        if row is None:
+            self.misses += 1
+            return None, False
+        if row.fetched_at > now - timedelta(seconds=self.ttl_seconds):
+            self.hits += 1
+            return row.routes, True
+        self.misses += 1
+        self.stale_hits += 1
+        return row.routes, False
+
+    def set(self, key: Tuple[str, str, bool], routes: List[Dict[str, Any]]) -> None:
+        """
+        Store (or refresh) the route list for a key.
+
+        Args:
+            key: Route key from make_route_key
+            routes: Parsed route list as returned by GoogleMapsClient.get_directions
+        """
+        origin, destination, alternatives = key
+        key_string = self._key_string(key)
+        with SessionLocal() as db:
+            entry = db.query(RouteCacheEntry).filter(RouteCacheEntry.cache_key == key_string).first()
+            if entry is None:
+                entry = RouteCacheEntry(
+                    cache_key=key_string,
+                    origin=origin,
+                    destination=destination,
+                    alternatives=alternatives
+                )
+                db.add(entry)
+            entry.routes = routes
+            entry.fetched_at = datetime.utcnow()
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker stored the same route first; its copy is just as fresh
+                db.rollback()
+
+    def purge_expired(self) -> int:
+        """
+        Delete rows past the stale window in batches so no single transaction holds locks for long.
+
+        Returns:
+            Number of rows deleted
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds + self.stale_seconds)
+        deleted = 0
+        while True:
+            with SessionLocal() as db:
+                expired_ids = (
+                    select(RouteCacheEntry.id)
+                    .where(RouteCacheEntry.fetched_at <= cutoff)
+                    .limit(self.purge_batch_size)
+                    .scalar_subquery()
+                )
+                result = db.execute(
+                    delete(RouteCacheEntry)
+                    .where(RouteCacheEntry.id.in_(expired_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            deleted += result.rowcount
+            if result.rowcount < self.purge_batch_size:
+                return deleted
+
+    async def purge_periodically(self, interval_seconds: float) -> None:
+        """Purge expired rows every interval until cancelled (run as a background task)."""
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.purge_expired)
+                if deleted:
+                    logger.info(f"Purged {deleted} expired route cache rows")
+            except Exception as e:
+                logger.error(f"Route cache purge failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global route cache instances
+route_cache = RouteCache(
+    max_entries=settings.route_cache_max_entries,
+    ttl_seconds=settings.route_cache_ttl_seconds,
+    stale_seconds=settings.route_cache_stale_seconds
+)
+
+persistent_route_cache = PersistentRouteCache(
+    ttl_seconds=settings.route_cache_db_ttl_seconds,
+    purge_batch_size=settings.route_cache_purge_batch_size,
+    stale_seconds=settings.route_cache_stale_seconds
+)
@@ -1,10 +1,25 @@
-from typing import List, Dict, Any
+import asyncio
+import logging
+from typing import List, Dict, Any, Hashable, Iterable, Optional, Set, Tuple
+from app.config import settings
+from app.services.geo import parse_lat_lng
+from app.services.geocode_cache import geocode_cache
 from app.services.maps_client import maps_client
+from app.services.route_cache import route_cache, persistent_route_cache, make_route_key, format_lat_lng
+from app.services.routing_backend import get_routing_backend
+from app.services.single_flight import route_single_flight
+
+logger = logging.getLogger(__name__)
 
 
 class RouteCalculator:
     """Service for calculating and processing route information."""
     
+    def __init__(self):
+        """Initialize with no background refreshes running."""
+        # Strong references so pending refresh tasks are not garbage collected
+        self._refresh_tasks: Set[asyncio.Task] = set()
+    
     @staticmethod
     def meters_to_kilometers(meters: float) -> float:
         """Convert meters to kilometers."""
@@ -15,31 +30,52 @@ class RouteCalculator:
         """Convert seconds to minutes."""
         return round(seconds / 60, 2)
     
-    def calculate_routes(
+    async def _fetch_directions(
         self,
+        cache_key: Hashable,
         origin: str,
         destination: str,
-        alternatives: bool = False
+        alternatives: bool
     ) -> List[Dict[str, Any]]:
         """
-        Calculate routes with normalized distance and duration.
+        Fetch routes from Google Maps and store them in the persistent cache.
         
-        Args:
-            origin: Starting location
-            destination: Ending location
-            alternatives: Whether to fetch alternative routes
-            
-        Returns:
-            List of route dictionaries with normalized values
+        Addresses are recorded in the geocode cache with the locations the
+        API resolved them to, and the routes are also cached under those
+        coordinates, which is how the next lookup of either address will
+        be keyed.
         """
-        # Fetch raw route data from Google Maps
-        raw_routes = maps_client.get_directions(
+        raw_routes = await maps_client.get_directions(
             origin=origin,
             destination=destination,
             alternatives=alternatives
         )
-        
-        # Process and normalize the route data
+        keys = [cache_key]
+        if raw_routes and geocode_cache.enabled:
+            start, end = raw_routes[0].get('start_location'), raw_routes[0].get('end_location')
+            await geocode_cache.record((origin, start), (destination, end))
+            coordinate_key = self._coordinate_key(cache_key, start, end)
+            if coordinate_key != cache_key:
+                keys.append(coordinate_key)
+                if settings.cache_enabled:
+                    route_cache.set(coordinate_key, self._process_routes(raw_routes))
+        if settings.route_cache_db_enabled:
+            for key in keys:
+                await asyncio.to_thread(persistent_route_cache.set, key, raw_routes)
+        return raw_routes
+    
+    @staticmethod
+    def _coordinate_key(cache_key: Tuple[str, str, bool], start: Optional[List[float]], end: Optional[List[float]]) -> Tuple[str, str, bool]:
+        """Route key with the address parts of cache_key replaced by resolved coordinates."""
+        origin, destination, alternatives = cache_key
+        if start is not None and parse_lat_lng(origin) is None:
+            origin = format_lat_lng(*start)
+        if end is not None and parse_lat_lng(destination) is None:
+            destination = format_lat_lng(*end)
+        return (origin, destination, alternatives)
+    
+    def _process_routes(self, raw_routes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize raw routes from the Maps client to kilometers and minutes."""
         processed_routes = []
         for route in raw_routes:
             processed_route = {
@@ -48,11 +84,196 @@ class RouteCalculator:
                 'polyline': route['polyline'],
                 'route_type': route['route_type'],
                 'start_address': route['start_address'],
-                'end_address': route['end_address']
+                'end_address': route['end_address'],
+                'stale': False
             }
             processed_routes.append(processed_route)
-        
         return processed_routes
+    
+    def _get_stale(self, cache_key: Hashable, stored_routes: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return expired but still servable routes, or None.
+
+        Args:
+            cache_key: Route key
+            stored_routes: Stale raw routes the persistent cache lookup returned, if any
+        """
+        if settings.cache_enabled:
+            cached_routes = route_cache.get_stale(cache_key)
+            if cached_routes is not None:
+                return cached_routes
+        if stored_routes is not None:
+            return self._process_routes(stored_routes)
+        return None
+    
+    async def _refresh(self, cache_key: Hashable, origin: str, destination: str, alternatives: bool) -> None:
+        """Re-fetch a route whose cache entry expired and store the result."""
+        try:
+            raw_routes = await route_single_flight.do(
+                cache_key,
+                lambda: self._fetch_directions(cache_key, origin, destination, alternatives)
+            )
+        except Exception as e:
+            logger.warning(f"Background route refresh failed for {origin} -> {destination}: {str(e)}")
+            return
+        if settings.cache_enabled:
+            route_cache.set(cache_key, self._process_routes(raw_routes))
+    
+    def _refresh_in_background(self, cache_key: Hashable, origin: str, destination: str, alternatives: bool) -> None:
+        """Start _refresh without waiting for it."""
+        task = asyncio.create_task(self._refresh(cache_key, origin, destination, alternatives))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def calculate_routes(
+        self,
+        origin: str,
+        destination: str,
+        alternatives: bool = False,
+        use_cache: bool = True,
+        backend: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Calculate routes with normalized distance and duration.
+        
+        When the cache only holds an expired entry (within the stale window),
+        it is returned right away with 'stale' set on every route, and the
+        route is re-fetched in the background.
+        
+        Args:
+            origin: Starting location
+            destination: Ending location
+            alternatives: Whether to fetch alternative routes
+            use_cache: Whether to read the route cache (when enabled in settings)
+            backend: Routing backend name (default: settings.routing_backend)
+            
+        Returns:
+            List of route dictionaries with normalized values
+            
+        Raises:
+            ValueError: If the backend name is unknown
+            RateLimitExceeded: If the outbound rate limit queue is full
+            CircuitOpenError: If the Routes API is failing and calls are short-circuited
+            MapsApiError: If the Routes API returns an error or cannot be reached
+            LocalRoutingError: If the local engine cannot route between the locations
+            LocalGraphUnavailableError: If the local engine's road graph has not been built
+        """
+        routing_backend = get_routing_backend(backend)
+        
+        # Normalize both locations; addresses already resolved by an earlier
+        # lookup become coordinates, so any spelling of a place shares one key
+        origin_key = await geocode_cache.resolve(origin)
+        destination_key = await geocode_cache.resolve(destination)
+        # Send coordinates where known, otherwise the caller's own spelling
+        request_origin = origin_key if parse_lat_lng(origin_key) is not None else origin
+        request_destination = destination_key if parse_lat_lng(destination_key) is not None else destination
+        
+        if not routing_backend.use_route_cache:
+            # Local lookups are cheaper than a cache round trip. Only the
+            # Routes API is cached, so route keys need no backend component
+            raw_routes = await routing_backend.get_directions(
+                origin=request_origin,
+                destination=request_destination,
+                alternatives=alternatives
+            )
+            return self._with_addresses(self._process_routes(raw_routes), origin, destination)
+        
+        cache_key = make_route_key(origin_key, destination_key, alternatives)
+        if settings.cache_enabled and use_cache:
+            cached_routes = route_cache.get(cache_key)
+            if cached_routes is not None:
+                return self._with_addresses(cached_routes, origin, destination)
+        
+        raw_routes = None
+        stored_stale_routes = None
+        if settings.route_cache_db_enabled and use_cache:
+            # One round trip returns the row whether it is fresh or stale
+            stored_routes, fresh = await asyncio.to_thread(persistent_route_cache.lookup, cache_key)
+            if fresh:
+                raw_routes = stored_routes
+            else:
+                stored_stale_routes = stored_routes
+        
+        if raw_routes is None and use_cache:
+            stale_routes = self._get_stale(cache_key, stored_stale_routes)
+            if stale_routes is not None:
+                self._refresh_in_background(cache_key, request_origin, request_destination, alternatives)
+                for route in stale_routes:
+                    route['stale'] = True
+                return self._with_addresses(stale_routes, origin, destination)
+        
+        if raw_routes is None:
+            # Fetch raw route data from Google Maps, sharing one call between
+            # concurrent identical requests
+            raw_routes = await route_single_flight.do(
+                cache_key,
+                lambda: self._fetch_directions(cache_key, request_origin, request_destination, alternatives)
+            )
+        
+        # Process and normalize the route data
+        processed_routes = self._process_routes(raw_routes)
+        
+        # Bypassed requests still refresh the cache with the fresh result
+        if settings.cache_enabled:
+            route_cache.set(cache_key, processed_routes)
+        
+        return self._with_addresses(processed_routes, origin, destination)
+    
+    @staticmethod
+    def _with_addresses(routes: List[Dict[str, Any]], origin: str, destination: str) -> List[Dict[str, Any]]:
+        """Label routes with this caller's spelling of the locations (routes are shared by all spellings)."""
+        for route in routes:
+            route['start_address'] = origin
+            route['end_address'] = destination
+        return routes
+
+    
+    async def calculate_routes_batch(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        alternatives: bool = False,
+        use_cache: bool = True,
+        max_concurrency: int = 10,
+        backend: Optional[str] = None
+    ) -> Dict[Hashable, Any]:
+        """
+        Calculate routes for many origin/destination pairs concurrently.
+        
+        Identical pairs (after normalization) are fetched only once.
+        
+        Args:
+            pairs: Iterable of (origin, destination) tuples
+            alternatives: Whether to fetch alternative routes
+            use_cache: Whether to read the route cache (when enabled in settings)
+            max_concurrency: Maximum number of route lookups in flight at once
+            backend: Routing backend name (default: settings.routing_backend)
+            
+        Returns:
+            Mapping of route key (see make_route_key) to either the route list
+            or the exception raised while calculating it
+        """
+        unique_pairs = {}
+        for origin, destination in pairs:
+            key = make_route_key(origin, destination, alternatives)
+            unique_pairs.setdefault(key, (origin, destination))
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(origin: str, destination: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.calculate_routes(
+                    origin=origin,
+                    destination=destination,
+                    alternatives=alternatives,
+                    use_cache=use_cache,
+                    backend=backend
+                )
+        
+        results = await asyncio.gather(
+            *(fetch(origin, destination) for origin, destination in unique_pairs.values()),
+            return_exceptions=True
+        )
+        return dict(zip(unique_pairs.keys(), results))
 
 
 # Global calculator instance
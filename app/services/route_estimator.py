@@ -0,0 +1,168 @@
+import logging
+import numpy as np
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.trip import Trip
+from app.services.geo import haversine_m_array, parse_lat_lng
+
+logger = logging.getLogger(__name__)
+
+# Trips shorter than this in a straight line are dominated by snapping
+# and detours around the block, so they are left out of calibration
+MIN_CALIBRATION_KM = 0.5
+
+# Road/straight-line ratios outside this range are treated as bad data
+CIRCUITY_RANGE = (1.0, 5.0)
+
+
+class RouteEstimator:
+    """
+    Approximate routes from coordinates alone, without calling any routing backend.
+
+    Road distance is the great-circle distance times a circuity factor and
+    duration assumes an average speed. Both default to settings and can be
+    calibrated from the routed trips already in the database.
+    """
+
+    def __init__(self, circuity_factor: float, average_speed_kmh: float):
+        """
+        Initialize the estimator.
+
+        Args:
+            circuity_factor: Road distance / straight-line distance
+            average_speed_kmh: Speed used to turn distance into duration
+        """
+        self.circuity_factor = circuity_factor
+        self.average_speed_kmh = average_speed_kmh
+        self.calibration_samples = 0
+
+    def estimate(self, origins: np.ndarray, destinations: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Estimate distance and duration for many coordinate pairs at once.
+
+        Args:
+            origins: Array of (lat, lng) rows in degrees, shape (n, 2)
+            destinations: Array of (lat, lng) rows in degrees, shape (n, 2)
+
+        Returns:
+            Dictionary with straight_line_km, distance_km and duration_minutes
+            arrays of shape (n,), rounded to 2 decimals
+        """
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=float).reshape(-1, 2)
+        straight_km = haversine_m_array(origins[:, 0], origins[:, 1], destinations[:, 0], destinations[:, 1]) / 1000
+        distance_km = straight_km * self.circuity_factor
+        return {
+            'straight_line_km': np.round(straight_km, 2),
+            'distance_km': np.round(distance_km, 2),
+            'duration_minutes': np.round(distance_km / self.average_speed_kmh * 60, 2)
+        }
+
+    @staticmethod
+    def fit(trips: Iterable[Tuple[str, str, float, float]]) -> Optional[Dict[str, Any]]:
+        """
+        Derive a circuity factor and average speed from routed trips.
+
+        Only trips whose origin and destination are "lat,lng" coordinates
+        can be compared with the straight line; medians keep outliers
+        (e.g. round trips to a nearby point) from skewing the result.
+
+        Args:
+            trips: (origin, destination, distance_km, duration_minutes) rows
+
+        Returns:
+            Dictionary with samples, circuity_factor and average_speed_kmh,
+            or None if no trip is usable
+        """
+        rows = []
+        for origin, destination, distance_km, duration_minutes in trips:
+            start, end = parse_lat_lng(origin), parse_lat_lng(destination)
+            if start is not None and end is not None:
+                rows.append((*start, *end, distance_km, duration_minutes))
+        if not rows:
+            return None
+
+        data = np.asarray(rows, dtype=float)
+        straight_km = haversine_m_array(data[:, 0], data[:, 1], data[:, 2], data[:, 3]) / 1000
+        distance_km, duration_minutes = data[:, 4], data[:, 5]
+        usable = straight_km >= MIN_CALIBRATION_KM
+        circuity = np.divide(distance_km, straight_km, out=np.zeros_like(distance_km), where=usable)
+        usable &= (circuity >= CIRCUITY_RANGE[0]) & (circuity <= CIRCUITY_RANGE[1]) & (duration_minutes > 0)
+        if not usable.any():
+            return None
+
+        speeds_kmh = distance_km[usable] / (duration_minutes[usable] / 60)
+        return {
+            'samples': int(usable.sum()),
+            'circuity_factor': round(float(np.median(circuity[usable])), 3),
+            'average_speed_kmh': round(float(np.median(speeds_kmh)), 1)
+        }
+
+    def calibrate(self, db: Session, limit: int, min_samples: int) -> Optional[Dict[str, Any]]:
+        """
+        Fit the estimator to the most recent fastest-route trips.
+
+        Args:
+            db: Database session
+            limit: Number of recent trips to read
+            min_samples: Fewest usable trips needed to replace the current values
+
+        Returns:
+            The fit (see fit) whether or not it was applied, or None if no
+            trip is usable
+        """
+        trips = db.execute(
+            select(Trip.origin, Trip.destination, Trip.distance_km, Trip.duration_minutes)
+            .where(Trip.route_type == "fastest")
+            .order_by(Trip.id.desc())
+            .limit(limit)
+        ).all()
+        result = self.fit(trips)
+        if result is not None and result['samples'] >= min_samples:
+            self.circuity_factor = result['circuity_factor']
+            self.average_speed_kmh = result['average_speed_kmh']
+            self.calibration_samples = result['samples']
+            logger.info(
+                f"Route estimates calibrated from {result['samples']} trips: "
+                f"circuity {self.circuity_factor}, {self.average_speed_kmh} km/h"
+            )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the factors in use and how many trips they were fitted to (0 = settings)."""
+        return {
+            'circuity_factor': self.circuity_factor,
+            'average_speed_kmh': self.average_speed_kmh,
+            'calibration_samples': self.calibration_samples
+        }
+
+
+def parse_coordinates(locations: Sequence[str]) -> Tuple[np.ndarray, list]:
+    """
+    Parse "lat,lng" strings into an array.
+
+    Args:
+        locations: Location strings
+
+    Returns:
+        Tuple of ((n, 2) array with NaN rows for unparseable locations,
+        indexes of the unparseable locations)
+    """
+    points = np.full((len(locations), 2), np.nan)
+    invalid = []
+    for index, location in enumerate(locations):
+        point = parse_lat_lng(location)
+        if point is None:
+            invalid.append(index)
+        else:
+            points[index] = point
+    return points, invalid
+
+
+# Global route estimator instance
+route_estimator = RouteEstimator(
+    circuity_factor=settings.estimate_circuity_factor,
+    average_speed_kmh=settings.estimate_average_speed_kmh
+)
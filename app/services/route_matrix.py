@@ -0,0 +1,105 @@
+import asyncio
+import math
+import numpy as np
+from typing import List, Dict, Any, Tuple
+from app.services.cost_estimator import round_cents
+from app.services.maps_client import maps_client
+
+# Routes API limits for computeRouteMatrix with address waypoints
+MAX_ELEMENTS_PER_REQUEST = 625
+MAX_WAYPOINTS_PER_REQUEST = 50
+
+
+class RouteMatrixService:
+    """Service for building dense origin x destination distance/duration grids."""
+
+    @staticmethod
+    def tile_shape(
+        num_origins: int,
+        num_destinations: int,
+        max_elements: int = MAX_ELEMENTS_PER_REQUEST,
+        max_waypoints: int = MAX_WAYPOINTS_PER_REQUEST
+    ) -> Tuple[int, int]:
+        """
+        Choose the tile size that covers the matrix in the fewest API requests.
+
+        Args:
+            num_origins: Number of origins in the full matrix
+            num_destinations: Number of destinations in the full matrix
+            max_elements: Maximum origins x destinations per request
+            max_waypoints: Maximum origins + destinations per request
+
+        Returns:
+            Tuple of (origins per tile, destinations per tile)
+        """
+        best = (1, 1)
+        best_tiles = math.inf
+        for tile_origins in range(1, min(num_origins, max_waypoints - 1) + 1):
+            tile_destinations = min(num_destinations, max_waypoints - tile_origins, max_elements // tile_origins)
+            if tile_destinations < 1:
+                break
+            tiles = math.ceil(num_origins / tile_origins) * math.ceil(num_destinations / tile_destinations)
+            if tiles < best_tiles:
+                best, best_tiles = (tile_origins, tile_destinations), tiles
+        return best
+
+    async def compute_matrix(
+        self,
+        origins: List[str],
+        destinations: List[str],
+        max_concurrency: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Fetch distances and durations for every origin/destination pair.
+
+        The matrix is split into tiles within the API limits and the tiles
+        are fetched concurrently.
+
+        Args:
+            origins: Starting locations
+            destinations: Ending locations
+            max_concurrency: Maximum number of tile requests in flight at once
+
+        Returns:
+            Dictionary with distance_km and duration_minutes arrays of shape
+            (len(origins), len(destinations)), NaN where no route exists, and
+            the number of tiles requested
+        """
+        distance_km = np.full((len(origins), len(destinations)), np.nan)
+        duration_minutes = np.full((len(origins), len(destinations)), np.nan)
+        if not origins or not destinations:
+            return {'distance_km': distance_km, 'duration_minutes': duration_minutes, 'tiles': 0}
+
+        tile_origins, tile_destinations = self.tile_shape(len(origins), len(destinations))
+        tiles = [
+            (row, col)
+            for row in range(0, len(origins), tile_origins)
+            for col in range(0, len(destinations), tile_destinations)
+        ]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_tile(row: int, col: int) -> None:
+            async with semaphore:
+                elements = await maps_client.compute_route_matrix(
+                    origins=origins[row:row + tile_origins],
+                    destinations=destinations[col:col + tile_destinations]
+                )
+            for element in elements:
+                if not element['route_exists']:
+                    continue
+                i = row + element['origin_index']
+                j = col + element['destination_index']
+                distance_km[i, j] = element['distance_meters'] / 1000
+                duration_minutes[i, j] = element['duration_seconds'] / 60
+
+        await asyncio.gather(*(fetch_tile(row, col) for row, col in tiles))
+
+        return {
+            'distance_km': round_cents(distance_km),
+            'duration_minutes': round_cents(duration_minutes),
+            'tiles': len(tiles)
+        }
+
+
+# Global matrix service instance
+route_matrix_service = RouteMatrixService()
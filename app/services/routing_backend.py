@@ -0,0 +1,52 @@
+from typing import Any, Dict, List, Optional, Protocol
+from app.config import settings
+from app.services.maps_client import maps_client
+from app.services.road_graph import local_routing_engine
+
+
+class RoutingBackend(Protocol):
+    """
+    Source of raw routes for RouteCalculator.
+
+    get_directions returns routes as dictionaries with distance_meters,
+    duration_seconds, polyline, route_type, start_address and end_address.
+    """
+
+    name: str
+    # Whether results are worth caching (false for cheap local lookups)
+    use_route_cache: bool
+
+    async def get_directions(
+        self,
+        origin: str,
+        destination: str,
+        alternatives: bool = False
+    ) -> List[Dict[str, Any]]:
+        ...
+
+
+# Backends selectable with ROUTING_BACKEND or per request
+ROUTING_BACKENDS: Dict[str, RoutingBackend] = {
+    maps_client.name: maps_client,
+    local_routing_engine.name: local_routing_engine,
+}
+
+
+def get_routing_backend(name: Optional[str] = None) -> RoutingBackend:
+    """
+    Look up a routing backend.
+
+    Args:
+        name: Backend name, or None for the configured default
+
+    Returns:
+        The backend instance
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    name = name or settings.routing_backend
+    try:
+        return ROUTING_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown routing backend '{name}'; choose one of {', '.join(ROUTING_BACKENDS)}")
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one shared call."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func unless a call with the same key is already in flight, in
+        which case wait for that call and return its result instead.
+
+        All callers receive the same result object (or exception), so
+        results must be treated as read-only.
+
+        Args:
+            key: Key identifying identical calls
+            func: Coroutine function making the call
+
+        Returns:
+            The result of the shared call
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        # Shield so one caller being cancelled does not cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        """Drop a finished call so later callers start a fresh one."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counts of upstream calls made and calls coalesced."""
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight)
+        }
+
+
+# Global single-flight group for route lookups
+route_single_flight = SingleFlight()
@@ -0,0 +1,222 @@
+import math
+import random
+import time
+import numpy as np
+from typing import Any, Dict, List
+
+# Longest segment Or-opt moves as a block
+OR_OPT_MAX_SEGMENT = 3
+
+# Iterated local search moves on from tours at most this much worse than
+# the current one
+ACCEPT_WORSE_RATIO = 0.02
+
+# Iterated local search stops early after this many restarts without a
+# better tour (small runs converge long before the time budget is spent)
+MAX_STALLED_ITERATIONS = 1000
+
+
+class StopOptimizer:
+    """
+    Orders the stops of a multi-stop run to minimize a pairwise leg cost.
+
+    The first stop is the fixed start. Optionally the last stop stays last,
+    or the run returns to the start. Costs may be asymmetric (one-way
+    streets), so every move is priced in the direction it is driven.
+
+    A nearest-neighbour tour is improved with 2-opt (reverse a segment) and
+    Or-opt (move a run of up to three stops elsewhere) until neither finds
+    an improving move. The rest of the time budget is spent on iterated
+    local search: perturb the best tour with a random double-bridge move,
+    improve it again, and keep it if it is cheaper.
+    """
+
+    def __init__(self, seed: int = 0):
+        """
+        Initialize the optimizer.
+
+        Args:
+            seed: Seed for the perturbations, so results are reproducible
+        """
+        self.seed = seed
+
+    def optimize(
+        self,
+        cost: np.ndarray,
+        return_to_start: bool = False,
+        fixed_end: bool = False,
+        time_budget_seconds: float = 0.5
+    ) -> Dict[str, Any]:
+        """
+        Find a cheap visiting order.
+
+        Args:
+            cost: Leg cost from stop i to stop j, shape (n, n); NaN or inf
+                where there is no route
+            return_to_start: End the run back at stop 0
+            fixed_end: Keep stop n - 1 as the final stop
+            time_budget_seconds: Time allowed for iterated local search
+
+        Returns:
+            Dictionary with order (stop indexes in driving order, ending with
+            0 again for a round trip), cost (inf if some leg has no route),
+            initial_cost (of the nearest-neighbour tour) and iterations
+            (local search restarts)
+        """
+        started = time.perf_counter()
+        n = len(cost)
+        matrix = np.where(np.isfinite(cost), cost, math.inf).tolist()
+        if n <= 2:
+            order = list(range(n)) + ([0] if return_to_start and n > 1 else [])
+            total = self._tour_cost(matrix, order)
+            return {'order': order, 'cost': total, 'initial_cost': total, 'iterations': 0}
+
+        tour = self._nearest_neighbour(matrix, return_to_start, fixed_end)
+        initial_cost = self._tour_cost(matrix, tour)
+        # Positions 1 .. last_movable may be reordered
+        last_movable = len(tour) - 2 if return_to_start or fixed_end else len(tour) - 1
+        best = self._local_search(matrix, tour, last_movable)
+        best_cost = self._tour_cost(matrix, best)
+
+        rng = random.Random(self.seed)
+        iterations = stalled = 0
+        current, current_cost = best, best_cost
+        deadline = started + time_budget_seconds
+        # A double bridge needs two movable segments to swap
+        while last_movable >= 2 and stalled < MAX_STALLED_ITERATIONS and time.perf_counter() < deadline:
+            iterations += 1
+            stalled += 1
+            candidate = self._local_search(matrix, self._double_bridge(current, last_movable, rng), last_movable)
+            candidate_cost = self._tour_cost(matrix, candidate)
+            # Also walk to slightly worse tours, so the search can leave a
+            # local optimum that no single double bridge escapes
+            if candidate_cost <= current_cost * (1 + ACCEPT_WORSE_RATIO):
+                current, current_cost = candidate, candidate_cost
+            if candidate_cost < best_cost - 1e-9:
+                best, best_cost = candidate, candidate_cost
+                stalled = 0
+
+        return {'order': best, 'cost': best_cost, 'initial_cost': initial_cost, 'iterations': iterations}
+
+    @staticmethod
+    def _tour_cost(matrix: List[List[float]], tour: List[int]) -> float:
+        return sum(matrix[a][b] for a, b in zip(tour, tour[1:]))
+
+    @staticmethod
+    def _nearest_neighbour(matrix: List[List[float]], return_to_start: bool, fixed_end: bool) -> List[int]:
+        """Greedy tour from stop 0, always driving to the cheapest unvisited stop."""
+        n = len(matrix)
+        unvisited = set(range(1, n - 1 if fixed_end else n))
+        tour = [0]
+        while unvisited:
+            here = matrix[tour[-1]]
+            following = min(unvisited, key=lambda stop: (here[stop], stop))
+            unvisited.remove(following)
+            tour.append(following)
+        if fixed_end:
+            tour.append(n - 1)
+        elif return_to_start:
+            tour.append(0)
+        return tour
+
+    def _local_search(self, matrix: List[List[float]], tour: List[int], last_movable: int) -> List[int]:
+        """Apply improving 2-opt and Or-opt moves until there are none."""
+        tour = list(tour)
+        improved = True
+        while improved:
+            improved = self._two_opt(matrix, tour, last_movable) | self._or_opt(matrix, tour, last_movable)
+        return tour
+
+    @staticmethod
+    def _two_opt(matrix: List[List[float]], tour: List[int], last_movable: int) -> bool:
+        """
+        Reverse segments tour[i..j] while that makes the tour cheaper (in place).
+
+        Prefix sums of the forward and backward leg costs price the reversed
+        segment's interior in O(1), which matters when costs are asymmetric.
+        """
+        improved_any = False
+        improved = True
+        while improved:
+            improved = False
+            forward = [0.0]
+            backward = [0.0]
+            for a, b in zip(tour, tour[1:]):
+                forward.append(forward[-1] + matrix[a][b])
+                backward.append(backward[-1] + matrix[b][a])
+            for i in range(1, last_movable):
+                before = tour[i - 1]
+                for j in range(i + 1, last_movable + 1):
+                    first, last = tour[i], tour[j]
+                    delta = (
+                        matrix[before][last] - matrix[before][first]
+                        + (backward[j] - backward[i]) - (forward[j] - forward[i])
+                    )
+                    if j + 1 < len(tour):
+                        after = tour[j + 1]
+                        delta += matrix[first][after] - matrix[last][after]
+                    if delta < -1e-9:
+                        tour[i:j + 1] = tour[i:j + 1][::-1]
+                        improved = improved_any = True
+                        break
+                if improved:
+                    break
+        return improved_any
+
+    @staticmethod
+    def _or_opt(matrix: List[List[float]], tour: List[int], last_movable: int) -> bool:
+        """Move runs of up to OR_OPT_MAX_SEGMENT stops to a cheaper position (in place)."""
+        improved_any = False
+        improved = True
+        while improved:
+            improved = False
+            for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+                for i in range(1, last_movable - length + 2):
+                    end = i + length - 1
+                    first, last = tour[i], tour[end]
+                    before = tour[i - 1]
+                    after = tour[end + 1] if end + 1 < len(tour) else None
+                    removed = matrix[before][first]
+                    if after is not None:
+                        removed += matrix[last][after] - matrix[before][after]
+                    # Insert between tour[p] and tour[p + 1], outside the segment
+                    for p in range(0, last_movable + 1):
+                        if i - 1 <= p <= end:
+                            continue
+                        left = tour[p]
+                        right = tour[p + 1] if p + 1 < len(tour) else None
+                        added = matrix[left][first]
+                        if right is not None:
+                            added += matrix[last][right] - matrix[left][right]
+                        if added - removed < -1e-9:
+                            segment = tour[i:end + 1]
+                            del tour[i:end + 1]
+                            position = p + 1 if p < i else p + 1 - length
+                            tour[position:position] = segment
+                            improved = improved_any = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+        return improved_any
+
+    @staticmethod
+    def _double_bridge(tour: List[int], last_movable: int, rng: random.Random) -> List[int]:
+        """
+        Reconnect the movable part A B C D as A C B D, a move 2-opt and Or-opt cannot undo in one step.
+
+        B and C are each reversed at random as well; with few stops the
+        plain double bridge has only a handful of outcomes to explore.
+        """
+        i, j, k = sorted(rng.sample(range(1, last_movable + 2), 3))
+        first, second = tour[i:j], tour[j:k]
+        if rng.random() < 0.5:
+            first.reverse()
+        if rng.random() < 0.5:
+            second.reverse()
+        return tour[:i] + second + first + tour[k:]
+
+
+# Global stop optimizer instance
+stop_optimizer = StopOptimizer()
@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import select, tuple_
+from app.config import settings
+from app.database import SessionLocal
+from app.models.trip import Trip
+
+EXPORT_COLUMNS = (
+    "id",
+    "vehicle_id",
+    "origin",
+    "destination",
+    "distance_km",
+    "duration_minutes",
+    "fuel_used_liters",
+    "fuel_cost",
+    "route_type",
+    "created_at",
+)
+
+
+class TripExporter:
+    """Service for streaming a user's trips as NDJSON or CSV in constant memory."""
+
+    def __init__(self, batch_size: int, window_rows: int):
+        """
+        Initialize the exporter.
+
+        Args:
+            batch_size: Rows fetched per server-side cursor round trip
+            window_rows: Rows read per database session; the connection goes
+                back to the pool between windows so slow clients do not pin it
+        """
+        self.batch_size = batch_size
+        self.window_rows = window_rows
+
+    def _iter_batches(
+        self,
+        user_id: int,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        vehicle_id: Optional[int]
+    ) -> Iterator[list]:
+        """Yield lists of rows, oldest first, reading each window through a server-side cursor."""
+        filters = [Trip.user_id == user_id]
+        if start is not None:
+            filters.append(Trip.created_at >= start)
+        if end is not None:
+            filters.append(Trip.created_at < end)
+        if vehicle_id is not None:
+            filters.append(Trip.vehicle_id == vehicle_id)
+
+        columns = [getattr(Trip, column) for column in EXPORT_COLUMNS]
+        last_key = None
+        while True:
+            statement = select(*columns).where(*filters)
+            if last_key is not None:
+                statement = statement.where(tuple_(Trip.created_at, Trip.id) > last_key)
+            statement = (
+                statement
+                .order_by(Trip.created_at, Trip.id)
+                .limit(self.window_rows)
+                .execution_options(stream_results=True, yield_per=self.batch_size)
+            )
+
+            window_count = 0
+            with SessionLocal() as db:
+                for partition in db.execute(statement).partitions():
+                    window_count += len(partition)
+                    last_row = partition[-1]
+                    last_key = (last_row.created_at, last_row.id)
+                    yield partition
+            if window_count < self.window_rows:
+                return
+
+    def stream_ndjson(
+        self,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        vehicle_id: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream trips as newline-delimited JSON.
+
+        Args:
+            user_id: Owner of the trips
+            start: Only trips created at or after this time
+            end: Only trips created before this time
+            vehicle_id: Only trips for this vehicle
+
+        Returns:
+            Iterator of text chunks, one per fetched batch
+        """
+        for batch in self._iter_batches(user_id, start, end, vehicle_id):
+            yield "".join(
+                json.dumps(dict(row._mapping), default=datetime.isoformat) + "\n"
+                for row in batch
+            )
+
+    def stream_csv(
+        self,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        vehicle_id: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream trips as CSV with a header row.
+
+        Args:
+            user_id: Owner of the trips
+            start: Only trips created at or after this time
+            end: Only trips created before this time
+            vehicle_id: Only trips for this vehicle
+
+        Returns:
+            Iterator of text chunks, one per fetched batch
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+        for batch in self._iter_batches(user_id, start, end, vehicle_id):
+            buffer.seek(0)
+            buffer.truncate()
+            # created_at is the last export column
+            writer.writerows(
+                [*row[:-1], row.created_at.isoformat() if row.created_at else ""]
+                for row in batch
+            )
+            yield buffer.getvalue()
+
+
+# Global exporter instance
+trip_exporter = TripExporter(
+    batch_size=settings.export_batch_size,
+    window_rows=settings.export_window_rows
+)
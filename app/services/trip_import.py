@@ -0,0 +1,252 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.models.vehicle import Vehicle
+from app.schemas.trip import TripImportRow
+from app.services.trip_rollups import trip_rollup_service
+
+# Column order used for COPY on PostgreSQL
+COPY_COLUMNS = (
+    "vehicle_id",
+    "origin",
+    "destination",
+    "distance_km",
+    "duration_minutes",
+    "fuel_used_liters",
+    "fuel_cost",
+    "route_type",
+    "user_id",
+    "created_at",
+)
+
+# Text columns whose empty CSV values are '' rather than NULL in COPY
+COPY_NOT_NULL_COLUMNS = ("origin", "destination", "route_type")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Condense a pydantic error into one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class TripImporter:
+    """Service for high-throughput bulk trip imports from NDJSON or CSV."""
+
+    def __init__(self, max_errors: int):
+        """
+        Initialize the importer.
+
+        Args:
+            max_errors: Maximum number of row errors included in the report
+        """
+        self.max_errors = max_errors
+
+    def _insert_rows(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert rows with COPY on PostgreSQL, otherwise one executemany INSERT.
+
+        Raises:
+            SQLAlchemyError: If the database rejects the rows
+        """
+        dialect = db.get_bind().dialect
+        if dialect.name == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([row[column] for column in COPY_COLUMNS])
+            buffer.seek(0)
+            # An unquoted empty CSV value is NULL to COPY, which csv.writer
+            # also produces for '', so keep empty text as ''
+            statement = (
+                f"COPY trips ({', '.join(COPY_COLUMNS)}) FROM STDIN "
+                f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(COPY_NOT_NULL_COLUMNS)}))"
+            )
+            cursor = db.connection().connection.cursor()
+            try:
+                cursor.copy_expert(statement, buffer)
+            except dialect.dbapi.Error as e:
+                # The raw cursor bypasses SQLAlchemy's exception wrapping
+                raise DBAPIError.instance(statement, None, e, dialect.dbapi.Error)
+            finally:
+                cursor.close()
+        else:
+            db.execute(insert(Trip), rows)
+
+    def import_chunk(self, user_id: int, records: List[Tuple[int, Any]]) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """
+        Validate and insert one chunk in its own transaction.
+
+        If the database rejects the insert, the chunk is rolled back and
+        reported as one error at its first row's line.
+
+        Args:
+            user_id: Owner of the imported trips
+            records: (line number, parsed record or error message) pairs
+
+        Returns:
+            Tuple of (rows inserted, rows failed, errors)
+        """
+        errors = []
+        valid = []
+        for line, record in records:
+            if isinstance(record, str):
+                errors.append({'line': line, 'error': record})
+                continue
+            try:
+                valid.append((line, TripImportRow.model_validate(record)))
+            except ValidationError as e:
+                errors.append({'line': line, 'error': _validation_message(e)})
+
+        if not valid:
+            return 0, len(errors), errors
+
+        imported_at = datetime.utcnow()
+        with SessionLocal() as db:
+            vehicle_ids = {trip.vehicle_id for _, trip in valid}
+            owned_ids = {
+                vehicle_id for (vehicle_id,) in db.query(Vehicle.id).filter(
+                    Vehicle.id.in_(vehicle_ids),
+                    Vehicle.user_id == user_id
+                )
+            }
+
+            rows = []
+            first_line = None
+            for line, trip in valid:
+                if trip.vehicle_id not in owned_ids:
+                    errors.append({'line': line, 'error': f"Vehicle with id {trip.vehicle_id} not found"})
+                    continue
+                row = trip.model_dump()
+                row['user_id'] = user_id
+                row['created_at'] = row['created_at'] or imported_at
+                rows.append(row)
+                if first_line is None:
+                    first_line = line
+
+            if rows:
+                try:
+                    self._insert_rows(db, rows)
+                    trip_rollup_service.record_trips(db, rows)
+                    db.commit()
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    failed = len(errors) + len(rows)
+                    reason = str(e.orig) if isinstance(e, DBAPIError) else str(e)
+                    errors.append({
+                        'line': first_line,
+                        'error': f"Chunk of {len(rows)} rows starting here was not imported: {reason}"
+                    })
+                    return 0, failed, errors
+
+        return len(rows), len(errors), errors
+
+    async def import_stream(
+        self,
+        lines: AsyncIterator[str],
+        user_id: int,
+        file_format: str,
+        chunk_size: int
+    ) -> Dict[str, Any]:
+        """
+        Import trips from a stream of NDJSON or CSV lines.
+
+        Each chunk of rows is validated with TripImportRow and inserted in its
+        own transaction, so a bad row never rolls back other rows and memory
+        is bounded by the chunk size. A chunk the database rejects is counted
+        as failed and reported as one error; later chunks are still imported.
+        CSV rows may not contain embedded newlines.
+
+        Args:
+            lines: Async iterator of body lines
+            user_id: Owner of the imported trips
+            file_format: "ndjson" or "csv" (with a header row)
+            chunk_size: Rows per validation/insert chunk
+
+        Returns:
+            Dictionary with inserted, failed, chunks and errors
+        """
+        inserted = 0
+        failed = 0
+        chunks = 0
+        errors: List[Dict[str, Any]] = []
+        header = None
+        pending: List[Tuple[int, Any]] = []
+
+        async def flush() -> None:
+            nonlocal inserted, failed, chunks
+            chunk_inserted, chunk_failed, chunk_errors = await run_in_threadpool(self.import_chunk, user_id, pending[:])
+            pending.clear()
+            inserted += chunk_inserted
+            failed += chunk_failed
+            chunks += 1
+            errors.extend(chunk_errors[:max(0, self.max_errors - len(errors))])
+
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+
+            if file_format == "csv":
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [name.strip() for name in values]
+                    continue
+                if len(values) != len(header):
+                    record = f"Expected {len(header)} columns, got {len(values)}"
+                else:
+                    # Empty cells fall back to the schema defaults
+                    record = {name: value for name, value in zip(header, values) if value != ""}
+            else:
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = f"Invalid JSON: {str(e)}"
+                else:
+                    if not isinstance(record, dict):
+                        record = "Expected a JSON object"
+
+            pending.append((line_number, record))
+            if len(pending) >= chunk_size:
+                await flush()
+
+        if pending:
+            await flush()
+
+        return {
+            'inserted': inserted,
+            'failed': failed,
+            'chunks': chunks,
+            'errors': errors
+        }
+
+
+# Global importer instance
+trip_importer = TripImporter(max_errors=settings.import_max_errors)
@@ -0,0 +1,205 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Mapping, Tuple
+from sqlalchemy import Date, cast, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.trip import Trip
+from app.models.trip_rollup import TripRollup
+
+# Rollup rows use 0 for trips saved without a user so the unique key never contains NULL
+NO_USER_ID = 0
+
+_TOTAL_COLUMNS = ("trip_count", "distance_km", "fuel_used_liters", "fuel_cost")
+
+
+def month_start(moment: datetime) -> date:
+    """Return the first day of the month containing moment."""
+    return date(moment.year, moment.month, 1)
+
+
+def _month_expression(dialect_name: str):
+    """SQL expression truncating trips.created_at to the first day of its month."""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc("month", Trip.created_at), Date)
+    return func.strftime("%Y-%m-01", Trip.created_at)
+
+
+class TripRollupService:
+    """Service for maintaining and querying per user/vehicle/month trip totals."""
+
+    def record_trips(self, db: Session, trips: Iterable[Mapping[str, Any]], sign: int = 1) -> None:
+        """
+        Add (or with sign=-1, subtract) trips to their rollup buckets.
+
+        Runs in the caller's transaction, so the rollups commit or roll back
+        together with the trip rows. Trips are aggregated per bucket first,
+        so a bulk insert costs one upsert statement.
+
+        Args:
+            db: Database session
+            trips: Mappings with user_id, vehicle_id, created_at, distance_km,
+                fuel_used_liters and fuel_cost
+            sign: 1 when trips are inserted, -1 when they are deleted
+        """
+        buckets: Dict[Tuple[int, int, date], Dict[str, float]] = defaultdict(
+            lambda: {column: 0 for column in _TOTAL_COLUMNS}
+        )
+        for trip in trips:
+            user_id = trip.get("user_id")
+            key = (
+                NO_USER_ID if user_id is None else user_id,
+                trip["vehicle_id"],
+                month_start(trip.get("created_at") or datetime.utcnow())
+            )
+            totals = buckets[key]
+            totals["trip_count"] += sign
+            totals["distance_km"] += sign * trip["distance_km"]
+            totals["fuel_used_liters"] += sign * trip["fuel_used_liters"]
+            totals["fuel_cost"] += sign * trip["fuel_cost"]
+
+        if not buckets:
+            return
+
+        rows = [
+            {"user_id": user_id, "vehicle_id": vehicle_id, "month": month, **totals}
+            for (user_id, vehicle_id, month), totals in buckets.items()
+        ]
+        self._upsert_totals(db, rows)
+
+    def record_trip(self, db: Session, trip: Trip, sign: int = 1) -> None:
+        """
+        Add (or with sign=-1, subtract) a single trip to its rollup bucket.
+
+        Args:
+            db: Database session
+            trip: Trip model (flushed, so created_at is set)
+            sign: 1 when the trip is inserted, -1 when it is deleted
+        """
+        self.record_trips(db, [{
+            "user_id": trip.user_id,
+            "vehicle_id": trip.vehicle_id,
+            "created_at": trip.created_at,
+            "distance_km": trip.distance_km,
+            "fuel_used_liters": trip.fuel_used_liters,
+            "fuel_cost": trip.fuel_cost
+        }], sign=sign)
+
+    def record_cost_changes(self, db: Session, new_cost, *criteria) -> None:
+        """
+        Add the change of matching trips' fuel cost to new_cost to their rollup buckets.
+
+        One INSERT ... SELECT ... GROUP BY upserts the summed differences,
+        so it must run before the UPDATE that writes new_cost, in the same
+        transaction. Trip counts, distances and fuel volumes are left as
+        they are.
+
+        Args:
+            db: Database session
+            new_cost: SQL expression for each trip's new fuel cost
+            criteria: WHERE criteria selecting the trips whose cost changes
+        """
+        dialect_name = db.get_bind().dialect.name
+        month = _month_expression(dialect_name).label("month")
+        user_id = func.coalesce(Trip.user_id, NO_USER_ID).label("user_id")
+        deltas = (
+            select(
+                user_id,
+                Trip.vehicle_id,
+                month,
+                literal(0).label("trip_count"),
+                literal(0.0).label("distance_km"),
+                literal(0.0).label("fuel_used_liters"),
+                func.sum(new_cost - Trip.fuel_cost).label("fuel_cost")
+            )
+            .where(*criteria)
+            .group_by(user_id, Trip.vehicle_id, month)
+        )
+        if dialect_name in ("postgresql", "sqlite"):
+            dialect_insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+            statement = dialect_insert(TripRollup).from_select(
+                ["user_id", "vehicle_id", "month", *_TOTAL_COLUMNS],
+                deltas
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "vehicle_id", "month"],
+                set_={"fuel_cost": TripRollup.fuel_cost + statement.excluded.fuel_cost}
+            )
+            db.execute(statement)
+            return
+
+        # Portable fallback for other databases
+        self._upsert_totals(db, [dict(row._mapping) for row in db.execute(deltas)])
+
+    def _upsert_totals(self, db: Session, rows: list) -> None:
+        """Add totals to existing buckets, creating missing ones, in one statement."""
+        dialect_name = db.get_bind().dialect.name
+        if dialect_name in ("postgresql", "sqlite"):
+            dialect_insert = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+            statement = dialect_insert(TripRollup).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "vehicle_id", "month"],
+                set_={
+                    column: getattr(TripRollup, column) + getattr(statement.excluded, column)
+                    for column in _TOTAL_COLUMNS
+                }
+            )
+            db.execute(statement)
+            return
+
+        # Portable fallback for other databases
+        for row in rows:
+            rollup = db.query(TripRollup).filter(
+                TripRollup.user_id == row["user_id"],
+                TripRollup.vehicle_id == row["vehicle_id"],
+                TripRollup.month == row["month"]
+            ).with_for_update().first()
+            if rollup is None:
+                db.add(TripRollup(**row))
+            else:
+                for column in _TOTAL_COLUMNS:
+                    setattr(rollup, column, getattr(rollup, column) + row[column])
+        db.flush()
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Recompute all rollups from the trips table with one INSERT ... SELECT ... GROUP BY.
+
+        Use to backfill or repair the rollups; the caller commits.
+
+        Args:
+            db: Database session
+        """
+        month = _month_expression(db.get_bind().dialect.name).label("month")
+        user_id = func.coalesce(Trip.user_id, NO_USER_ID).label("user_id")
+        totals = (
+            select(
+                user_id,
+                Trip.vehicle_id,
+                month,
+                func.count(Trip.id),
+                func.sum(Trip.distance_km),
+                func.sum(Trip.fuel_used_liters),
+                func.sum(Trip.fuel_cost)
+            )
+            .where(Trip.created_at.is_not(None))
+            .group_by(user_id, Trip.vehicle_id, month)
+        )
+        db.execute(delete(TripRollup))
+        db.execute(
+            insert(TripRollup).from_select(
+                ["user_id", "vehicle_id", "month", *_TOTAL_COLUMNS],
+                totals
+            )
+        )
+
+    def trip_count(self, db: Session, user_id: int) -> int:
+        """Return the user's total number of trips from the rollups (O(buckets))."""
+        return db.scalar(
+            select(func.coalesce(func.sum(TripRollup.trip_count), 0)).where(TripRollup.user_id == user_id)
+        )
+
+
+# Global rollup service instance
+trip_rollup_service = TripRollupService()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: scalar CostEstimator loop vs. the vectorized cost matrix.
+
+Usage:
+    python scripts/benchmark_cost_estimator.py [--distances 20000] [--vehicles 25] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+import numpy as np
+from app.services.cost_estimator import cost_estimator
+
+
+def best_of(repeat, func):
+    """Return the fastest wall time of `repeat` runs and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--distances", type=int, default=20000)
+    parser.add_argument("--vehicles", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    distances = [round(rng.uniform(1, 1500), 2) for _ in range(args.distances)]
+    vehicles = [
+        SimpleNamespace(fuel_consumption=round(rng.uniform(3, 25), 1), fuel_price=round(rng.uniform(1, 2.5), 3))
+        for _ in range(args.vehicles)
+    ]
+
+    def scalar():
+        return [
+            [cost_estimator.estimate_trip_cost(distance_km=d, vehicle=v) for d in distances]
+            for v in vehicles
+        ]
+
+    def vectorized():
+        consumptions, prices = cost_estimator.vehicle_profiles(vehicles)
+        return cost_estimator.estimate_cost_matrix(distances, consumptions, prices)
+
+    scalar_time, scalar_result = best_of(args.repeat, scalar)
+    vector_time, vector_result = best_of(args.repeat, vectorized)
+
+    expected_fuel = np.array([[row['fuel_used_liters'] for row in per_vehicle] for per_vehicle in scalar_result])
+    expected_cost = np.array([[row['fuel_cost'] for row in per_vehicle] for per_vehicle in scalar_result])
+    identical = (
+        np.array_equal(expected_fuel, vector_result['fuel_used_liters'])
+        and np.array_equal(expected_cost, vector_result['fuel_cost'])
+    )
+
+    cells = args.distances * args.vehicles
+    print(f"Cells: {cells:,} ({args.vehicles} vehicles x {args.distances:,} distances)")
+    print(f"Scalar loop: {scalar_time * 1000:9.2f} ms  ({cells / scalar_time:,.0f} cells/s)")
+    print(f"Vectorized:  {vector_time * 1000:9.2f} ms  ({cells / vector_time:,.0f} cells/s)")
+    print(f"Speedup:     {scalar_time / vector_time:9.1f}x")
+    print(f"Results identical: {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
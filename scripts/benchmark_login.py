@@ -0,0 +1,161 @@
+"""
+Benchmark: login throughput and event-loop stall with bcrypt on vs. off the loop.
+
+In-process mode (default) verifies passwords concurrently two ways:
+  inline    - bcrypt called directly from coroutines (the old /token handler)
+  executor  - PasswordHasher.verify_and_update on the bounded hashing pool
+A probe task sleeps 5 ms in a loop and records how late it wakes up. That
+lateness is the time the event loop could not serve any other request.
+
+HTTP mode (--url) logs in against a running server and probes /health
+latency instead, which shows the same stall from the outside.
+
+Usage:
+    python scripts/benchmark_login.py [--logins 64] [--concurrency 16] [--rounds 12] [--workers 4]
+    python scripts/benchmark_login.py --url http://127.0.0.1:8000 --email a@b.c --password secret
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.services.password_hasher import PasswordHasher
+
+PROBE_INTERVAL = 0.005
+
+
+class StallProbe:
+    """Measures how late a periodic sleep wakes up, i.e. event-loop blocking."""
+
+    def __init__(self):
+        self.lags = []
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            self.lags.append(max(0.0, time.perf_counter() - start - PROBE_INTERVAL))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+async def run_concurrently(logins: int, concurrency: int, login) -> float:
+    """Run `logins` calls of login() with at most `concurrency` in flight; return elapsed seconds."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await login()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+async def measure(name: str, logins: int, concurrency: int, login) -> None:
+    probe = StallProbe()
+    probe.start()
+    await asyncio.sleep(0)
+    elapsed = await run_concurrently(logins, concurrency, login)
+    await probe.stop()
+    print(
+        f"{name:<10} {logins / elapsed:>10.1f} {sum(probe.lags) * 1000:>12.0f} "
+        f"{max(probe.lags, default=0) * 1000:>10.1f} {percentile(probe.lags, 99) * 1000:>10.1f}"
+    )
+
+
+async def in_process(args: argparse.Namespace) -> None:
+    hasher = PasswordHasher(rounds=args.rounds, max_workers=args.workers)
+    password = "correct horse battery staple"
+    hashed = hasher.hash_sync(password)
+
+    async def inline_login():
+        # What an async handler calling bcrypt directly does (after awaiting its user lookup)
+        await asyncio.sleep(0)
+        assert hasher.verify_sync(password, hashed)
+
+    async def executor_login():
+        valid, _ = await hasher.verify_and_update(password, hashed)
+        assert valid
+
+    print(f"bcrypt rounds={args.rounds}, hashing workers={args.workers}, "
+          f"{args.logins} logins, concurrency={args.concurrency}")
+    print(f"{'mode':<10} {'logins/s':>10} {'stalled ms':>12} {'max ms':>10} {'p99 ms':>10}")
+    await measure("inline", args.logins, args.concurrency, inline_login)
+    await measure("executor", args.logins, args.concurrency, executor_login)
+    hasher.shutdown()
+
+
+async def over_http(args: argparse.Namespace) -> None:
+    import httpx
+
+    health_latencies = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        async def login():
+            response = await client.post("/api/token", data={"username": args.email, "password": args.password})
+            response.raise_for_status()
+
+        stop = asyncio.Event()
+
+        async def probe_health():
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        probe = asyncio.create_task(probe_health())
+        elapsed = await run_concurrently(args.logins, args.concurrency, login)
+        stop.set()
+        await probe
+
+    print(f"{args.logins} logins, concurrency={args.concurrency} against {args.url}")
+    print(f"logins/s: {args.logins / elapsed:.1f}")
+    print(f"/health latency during logins: p50 {percentile(health_latencies, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(health_latencies, 99) * 1000:.1f} ms, max {max(health_latencies) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (in-process mode)")
+    parser.add_argument("--workers", type=int, default=4, help="Hashing pool size (in-process mode)")
+    parser.add_argument("--url", help="Benchmark a running server instead")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.email or not args.password:
+            parser.error("--url requires --email and --password")
+        asyncio.run(over_http(args))
+    else:
+        asyncio.run(in_process(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Build the road graph used by the local routing engine (ROUTING_BACKEND=local).
+
+Reads an OpenStreetMap XML extract (.osm, .osm.gz or .osm.bz2, e.g. from
+Geofabrik or the Overpass API) and writes memory-mappable arrays to the
+output directory. Edge travel times come from maxspeed tags, or typical
+speeds per road class where a way has none.
+
+A contraction hierarchy is built for fastest-path queries. It is computed
+in pure Python, so allow a few minutes for a city; --no-contract skips it
+and fastest paths fall back to A*.
+
+--grid instead generates a synthetic city grid (random speeds per street),
+which is handy for benchmarking without map data. --benchmark then times
+random queries against the written graph.
+
+Usage:
+    python scripts/build_road_graph.py --osm berlin.osm.bz2 [--output data/road_graph]
+    python scripts/build_road_graph.py --grid 300 [--spacing-m 150] [--center 52.52,13.405] --benchmark 200
+"""
+import argparse
+import bz2
+import gzip
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.services.geo import haversine_m_array, parse_lat_lng
+from app.services.road_graph import DEFAULT_CELL_DEGREES, DEFAULT_WITNESS_SETTLE_LIMIT, RoadGraph, write_road_graph
+
+# Typical speeds (km/h) for routable OSM highway classes without a maxspeed tag
+HIGHWAY_SPEEDS_KMH = {
+    "motorway": 110, "motorway_link": 60,
+    "trunk": 90, "trunk_link": 50,
+    "primary": 65, "primary_link": 40,
+    "secondary": 55, "secondary_link": 40,
+    "tertiary": 45, "tertiary_link": 30,
+    "unclassified": 40, "residential": 30,
+    "living_street": 10, "service": 15, "road": 30,
+}
+
+
+def open_osm(path: str):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def parse_maxspeed(value: str):
+    """Return a maxspeed tag in km/h, or None if it is not a number (e.g. 'none', 'signals')."""
+    parts = value.split()
+    try:
+        speed = float(parts[0])
+    except (ValueError, IndexError):
+        return None
+    return speed * 1.609344 if len(parts) > 1 and parts[1] == "mph" else speed
+
+
+def read_osm(path: str):
+    """Return (lat, lng, sources, targets, length_m, travel_s) for the routable ways of an OSM file."""
+    node_coordinates = {}
+    ways = []
+    for _, element in ElementTree.iterparse(open_osm(path), events=("end",)):
+        if element.tag == "node":
+            node_coordinates[int(element.get("id"))] = (float(element.get("lat")), float(element.get("lon")))
+            element.clear()
+        elif element.tag == "way":
+            tags = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+            highway = tags.get("highway")
+            if highway in HIGHWAY_SPEEDS_KMH and tags.get("access") not in ("no", "private"):
+                refs = [int(nd.get("ref")) for nd in element.iter("nd")]
+                speed = parse_maxspeed(tags.get("maxspeed", "")) or HIGHWAY_SPEEDS_KMH[highway]
+                oneway = tags.get("oneway", "yes" if tags.get("junction") == "roundabout" or highway == "motorway" else "no")
+                ways.append((refs, speed, oneway))
+            element.clear()
+
+    index = {}
+    sources, targets, speeds = [], [], []
+    for refs, speed, oneway in ways:
+        refs = [ref for ref in refs if ref in node_coordinates]
+        if oneway == "-1":
+            refs.reverse()
+        for start, end in zip(refs, refs[1:]):
+            u = index.setdefault(start, len(index))
+            v = index.setdefault(end, len(index))
+            sources.append(u)
+            targets.append(v)
+            speeds.append(speed)
+            if oneway not in ("yes", "true", "1", "-1"):
+                sources.append(v)
+                targets.append(u)
+                speeds.append(speed)
+
+    coordinates = np.empty((len(index), 2))
+    for node_id, i in index.items():
+        coordinates[i] = node_coordinates[node_id]
+    return with_lengths(coordinates[:, 0], coordinates[:, 1], sources, targets, speeds)
+
+
+def synthetic_grid(size: int, spacing_m: float, center: tuple, seed: int = 1):
+    """A size x size street grid around center; every street gets a random speed."""
+    rng = random.Random(seed)
+    dlat = spacing_m / 111320.0
+    dlng = spacing_m / (111320.0 * math.cos(math.radians(center[0])))
+    rows, cols = np.divmod(np.arange(size * size), size)
+    lat = center[0] + (rows - size / 2) * dlat
+    lng = center[1] + (cols - size / 2) * dlng
+
+    row_speeds = [rng.choice((30, 30, 30, 50, 50, 70)) for _ in range(size)]
+    col_speeds = [rng.choice((30, 30, 30, 50, 50, 70)) for _ in range(size)]
+    sources, targets, speeds = [], [], []
+    for r in range(size):
+        for c in range(size):
+            node = r * size + c
+            if c + 1 < size:
+                sources += [node, node + 1]
+                targets += [node + 1, node]
+                speeds += [row_speeds[r]] * 2
+            if r + 1 < size:
+                sources += [node, node + size]
+                targets += [node + size, node]
+                speeds += [col_speeds[c]] * 2
+    return with_lengths(lat, lng, sources, targets, speeds)
+
+
+def with_lengths(lat, lng, sources, targets, speeds_kmh):
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    length_m = haversine_m_array(lat[sources], lng[sources], lat[targets], lng[targets])
+    travel_s = length_m / (np.asarray(speeds_kmh, dtype=float) / 3.6)
+    return lat, lng, sources, targets, length_m, travel_s
+
+
+def benchmark(path: str, queries: int) -> None:
+    graph = RoadGraph(path)
+    rng = random.Random(7)
+    timings, lengths = [], []
+    for _ in range(queries):
+        source, target = rng.randrange(graph.node_count), rng.randrange(graph.node_count)
+        start = time.perf_counter()
+        try:
+            _, meters, _ = graph.shortest_path(source, target)
+        except ValueError:
+            # Disconnected pair (e.g. a one-way island in an OSM extract)
+            continue
+        timings.append(time.perf_counter() - start)
+        lengths.append(meters / 1000)
+    timings.sort()
+    quantiles = statistics.quantiles(timings, n=100)
+    print(f"{len(timings)} random fastest-path queries ({'contraction hierarchy' if graph.contracted else 'A*'}), mean route {statistics.mean(lengths):.1f} km: "
+          f"p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--osm", help="OpenStreetMap XML extract")
+    source.add_argument("--grid", type=int, help="Generate a synthetic N x N street grid instead")
+    parser.add_argument("--spacing-m", type=float, default=150.0, help="Grid street spacing")
+    parser.add_argument("--center", default="52.52,13.405", help="Grid center as lat,lng")
+    parser.add_argument("--output", default=os.environ.get("LOCAL_GRAPH_PATH", "data/road_graph"))
+    parser.add_argument("--cell-degrees", type=float, default=DEFAULT_CELL_DEGREES, help="Spatial index cell size")
+    parser.add_argument("--no-contract", action="store_true", help="Skip the contraction hierarchy (fastest paths then use A*)")
+    parser.add_argument("--witness-limit", type=int, default=DEFAULT_WITNESS_SETTLE_LIMIT,
+                        help="Nodes a witness search may settle while contracting")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="QUERIES", help="Time random queries afterwards")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.osm:
+        arrays = read_osm(args.osm)
+    else:
+        center = parse_lat_lng(args.center)
+        if center is None:
+            parser.error("--center must be lat,lng")
+        arrays = synthetic_grid(args.grid, args.spacing_m, center)
+    meta = write_road_graph(
+        args.output, *arrays,
+        cell_degrees=args.cell_degrees,
+        contract=not args.no_contract,
+        witness_settle_limit=args.witness_limit
+    )
+    print(f"Wrote {meta['nodes']} nodes and {meta['edges']} edges to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    if args.benchmark:
+        benchmark(args.output, args.benchmark)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Fit the /api/routes/estimate circuity factor and average speed to trip history.
+
+Compares the routed distance and duration of recent fastest-route trips
+whose origin and destination are coordinates with their great-circle
+distance, and prints the fitted values. The app refits on startup when
+ESTIMATE_CALIBRATE_ON_STARTUP is true; set the printed values in .env to
+pin them instead.
+
+Usage:
+    python scripts/calibrate_estimates.py [--limit 5000]
+"""
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.route_estimator import route_estimator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=settings.estimate_calibration_trips, help="Recent trips to read")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        result = route_estimator.calibrate(db, limit=args.limit, min_samples=0)
+    if result is None:
+        print("No usable trips: calibration needs fastest-route trips between 'lat,lng' coordinates")
+        sys.exit(1)
+
+    print(f"Fitted to {result['samples']} trips "
+          f"(startup calibration needs {settings.estimate_calibration_min_samples})")
+    print(f"ESTIMATE_CIRCUITY_FACTOR={result['circuity_factor']}")
+    print(f"ESTIMATE_AVERAGE_SPEED_KMH={result['average_speed_kmh']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Local stand-in for the Google Routes API (computeRoutes and computeRouteMatrix).
+
+Answers with the same JSON shape as Google, using deterministic distances
+derived from the waypoints, so the app can be exercised without network
+access or billing. Point the app at it with:
+
+    MAPS_ROUTES_BASE_URL=http://127.0.0.1:9000
+
+Usage:
+    python scripts/fake_routes_api.py [--port 9000] [--latency-ms 0] [--latency-jitter-ms 0]
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import os
+import random
+import sys
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import uvicorn
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.polyline import encode as encode_polyline
+
+# Routes API limits for computeRouteMatrix with address waypoints
+MAX_MATRIX_ELEMENTS = 625
+MAX_MATRIX_WAYPOINTS = 50
+
+ROAD_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 60.0
+
+app = FastAPI(title="Fake Routes API")
+app.state.latency_ms = 0.0
+app.state.latency_jitter_ms = 0.0
+
+
+def waypoint_location(waypoint: dict) -> tuple:
+    """Resolve a waypoint to (lat, lng): coordinates if given, else a stable pseudo-location."""
+    lat_lng = waypoint.get("location", {}).get("latLng")
+    if lat_lng:
+        return lat_lng.get("latitude", 0.0), lat_lng.get("longitude", 0.0)
+    address = waypoint.get("address", "")
+    parts = address.split(",")
+    if len(parts) == 2:
+        try:
+            return float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+    digest = hashlib.sha256(" ".join(address.split()).lower().encode()).digest()
+    # Spread addresses over roughly 200 x 200 km around Berlin
+    return 52.52 + (digest[0] / 255 - 0.5) * 1.8, 13.40 + (digest[1] / 255 - 0.5) * 3.0
+
+
+def road_distance_meters(start: tuple, end: tuple) -> int:
+    """Great-circle distance scaled by a fixed road factor."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (*start, *end))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return int(2 * 6371000 * math.asin(math.sqrt(a)) * ROAD_FACTOR)
+
+
+async def simulate_latency() -> None:
+    latency_ms = app.state.latency_ms + random.uniform(0, app.state.latency_jitter_ms)
+    if latency_ms > 0:
+        await asyncio.sleep(latency_ms / 1000)
+
+
+def duration_for(distance_meters: int) -> str:
+    return f"{int(distance_meters / 1000 / AVERAGE_SPEED_KMH * 3600)}s"
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy"}
+
+
+@app.post("/directions/v2:computeRoutes")
+async def compute_routes(request: Request):
+    body = await request.json()
+    await simulate_latency()
+    start = waypoint_location(body.get("origin", {}))
+    end = waypoint_location(body.get("destination", {}))
+    distance = road_distance_meters(start, end)
+    midpoint = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+
+    legs = [{
+        "startLocation": {"latLng": {"latitude": start[0], "longitude": start[1]}},
+        "endLocation": {"latLng": {"latitude": end[0], "longitude": end[1]}}
+    }]
+    routes = [{
+        "distanceMeters": distance,
+        "duration": duration_for(distance),
+        "polyline": {"encodedPolyline": encode_polyline([start, midpoint, end])},
+        "legs": legs
+    }]
+    if body.get("computeAlternativeRoutes"):
+        detour = (midpoint[0] + 0.05, midpoint[1] + 0.05)
+        detour_distance = road_distance_meters(start, detour) + road_distance_meters(detour, end)
+        routes.append({
+            "distanceMeters": detour_distance,
+            "duration": duration_for(detour_distance),
+            "polyline": {"encodedPolyline": encode_polyline([start, detour, end])},
+            "legs": legs
+        })
+    return {"routes": routes}
+
+
+@app.post("/distanceMatrix/v2:computeRouteMatrix")
+async def compute_route_matrix(request: Request):
+    body = await request.json()
+    origins = [waypoint_location(item.get("waypoint", {})) for item in body.get("origins", [])]
+    destinations = [waypoint_location(item.get("waypoint", {})) for item in body.get("destinations", [])]
+    if len(origins) * len(destinations) > MAX_MATRIX_ELEMENTS or len(origins) + len(destinations) > MAX_MATRIX_WAYPOINTS:
+        return JSONResponse(status_code=400, content={"error": {"code": 400, "message": "Too many elements"}})
+    await simulate_latency()
+
+    elements = []
+    for i, start in enumerate(origins):
+        for j, end in enumerate(destinations):
+            distance = road_distance_meters(start, end)
+            element = {
+                "status": {},
+                "condition": "ROUTE_EXISTS",
+                "distanceMeters": distance,
+                "duration": duration_for(distance)
+            }
+            # Mimic proto3 JSON, which omits zero-valued fields
+            if i:
+                element["originIndex"] = i
+            if j:
+                element["destinationIndex"] = j
+            elements.append(element)
+    return elements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Extra random delay, uniform in [0, jitter]")
+    args = parser.parse_args()
+
+    app.state.latency_ms = args.latency_ms
+    app.state.latency_jitter_ms = args.latency_jitter_ms
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
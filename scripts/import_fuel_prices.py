@@ -0,0 +1,58 @@
+"""
+Load fuel prices into the fuel_prices table from a CSV file.
+
+The CSV needs a header row with fuel_type, region, effective_from and
+price_per_liter columns. effective_from is an ISO date or datetime (UTC);
+an empty region means the default region, whose prices also apply to
+regions without their own. Running app workers pick up new current prices
+within FUEL_PRICE_REFRESH_SECONDS. Stored trips keep their cost until
+re-costed with scripts/recost_trips.py.
+
+Usage:
+    python scripts/import_fuel_prices.py prices.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.database import SessionLocal
+from app.services.fuel_prices import fuel_price_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV file of prices")
+    args = parser.parse_args()
+
+    with open(args.path, newline="") as f:
+        prices = [
+            {
+                "fuel_type": row["fuel_type"].strip(),
+                "region": (row.get("region") or "").strip(),
+                "effective_from": datetime.fromisoformat(row["effective_from"].strip()),
+                "price_per_liter": float(row["price_per_liter"])
+            }
+            for row in csv.DictReader(f)
+        ]
+    if not prices:
+        print("No prices in file")
+        sys.exit(1)
+
+    with SessionLocal() as db:
+        inserted = fuel_price_index.add_prices(db, prices)
+        db.commit()
+    earliest = min(price["effective_from"] for price in prices)
+    print(f"Inserted {inserted} prices")
+    print(f"Re-cost affected trips with: python scripts/recost_trips.py --since {earliest.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Load test comparing database drivers for the API's DB-bound endpoints.
+
+For every --database-url, starts the app with uvicorn on that URL, seeds a
+user, a vehicle and some trips, then runs concurrent clients against
+vehicle/trip listing and trip creation for a fixed duration and reports
+requests per second and latency percentiles. Sync URLs run on the
+threadpool session wrapper, async URLs (postgresql+asyncpg,
+sqlite+aiosqlite) on the native AsyncEngine.
+
+Usage:
+    python scripts/load_test_db.py \\
+        --database-url sqlite:////tmp/load.db \\
+        --database-url sqlite+aiosqlite:////tmp/load.db \\
+        [--concurrency 50] [--duration 10] [--workers 1]
+
+SQLite files are deleted before each run; PostgreSQL databases should be empty.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+from sqlalchemy.engine import make_url
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(database_url: str, port: int, workers: int, extra_env: dict = None) -> subprocess.Popen:
+    """Start the app with uvicorn against the given database (extra_env overrides settings)."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database and os.path.exists(url.database):
+        os.remove(url.database)
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        GOOGLE_MAPS_API_KEY=os.environ.get("GOOGLE_MAPS_API_KEY", "load-test"),
+        SECRET_KEY=os.environ.get("SECRET_KEY", "load-test"),
+        **(extra_env or {})
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("Server did not start")
+        await asyncio.sleep(0.2)
+
+
+async def seed(client: httpx.AsyncClient, trips: int) -> tuple:
+    """Create a user, a vehicle and some trips; return (auth headers, vehicle id)."""
+    email, password = "load@example.com", "load-test-password"
+    await client.post("/api/register", json={"email": email, "password": password})
+    token = (await client.post("/api/token", data={"username": email, "password": password})).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    vehicle = (await client.post("/api/vehicles/", headers=headers, json={
+        "name": "Load test car", "fuel_type": "petrol", "fuel_consumption": 6.5, "fuel_price": 1.8
+    })).json()
+    for i in range(trips):
+        await client.post("/api/trips/", headers=headers, json=trip_body(vehicle["id"], i))
+    return headers, vehicle["id"]
+
+
+def trip_body(vehicle_id: int, i: int) -> dict:
+    return {
+        "vehicle_id": vehicle_id, "origin": f"Origin {i}", "destination": f"Destination {i}",
+        "distance_km": 10.0 + i % 50, "duration_minutes": 12.0, "fuel_used_liters": 0.8, "fuel_cost": 1.44
+    }
+
+
+async def run_load(client: httpx.AsyncClient, headers: dict, vehicle_id: int, concurrency: int, duration: float) -> dict:
+    """Run concurrent clients cycling through the request mix until the duration ends."""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        i = 0
+        while time.monotonic() < deadline:
+            kind = i % 4
+            start = time.perf_counter()
+            if kind == 0:
+                response = await client.get("/api/vehicles/", headers=headers)
+            elif kind == 1:
+                response = await client.get("/api/trips/", params={"limit": 20}, headers=headers)
+            elif kind == 2:
+                response = await client.get(f"/api/trips/vehicle/{vehicle_id}", params={"limit": 20}, headers=headers)
+            else:
+                response = await client.post("/api/trips/", headers=headers, json=trip_body(vehicle_id, worker_id * 100000 + i))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            i += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def benchmark(database_url: str, args: argparse.Namespace) -> dict:
+    server = start_server(database_url, args.port, args.workers)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            headers, vehicle_id = await seed(client, args.seed_trips)
+            return await run_load(client, headers, vehicle_id, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", action="append", required=True, help="Database URL to test (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per URL")
+    parser.add_argument("--seed-trips", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'database url':<45} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for database_url in args.database_url:
+        result = await benchmark(database_url, args)
+        print(
+            f"{database_url:<45} {result['rps']:>8.1f} {result['p50_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
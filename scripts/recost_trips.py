@@ -0,0 +1,54 @@
+"""
+Re-price stored trips with the fuel price in effect when each was made.
+
+Updates trips.fuel_cost in batches of trip ids, each committed on its own
+together with the matching cost changes to the trip rollups used by
+/api/analytics/trips. Trips made before any matching price in the
+fuel_prices table keep their cost.
+
+Usage:
+    python scripts/recost_trips.py [--since 2026-01-01] [--until 2026-07-01] \\
+        [--fuel-type diesel] [--region default] [--batch-size 50000]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from app.config import settings
+from app.services.fuel_prices import fuel_price_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only trips created at or after this moment")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only trips created before this moment")
+    parser.add_argument("--fuel-type", help="Only trips of vehicles with this fuel type")
+    parser.add_argument("--region", help="Only trips of vehicles in this region")
+    parser.add_argument("--batch-size", type=int, default=settings.fuel_price_recost_batch_size,
+                        help="Trip ids per UPDATE statement")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    fuel_price_index.recost_batch_size = args.batch_size
+    started = time.perf_counter()
+    result = fuel_price_index.recost_trips(
+        since=args.since,
+        until=args.until,
+        fuel_type=args.fuel_type,
+        region=args.region
+    )
+    elapsed = time.perf_counter() - started
+    print(f"Re-costed {result['updated']} trips in {result['batches']} batches in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
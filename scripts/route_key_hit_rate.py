@@ -0,0 +1,88 @@
+"""
+Measure how much address normalization raises route cache hit rates.
+
+Replays the origin/destination pairs of stored trips, oldest first,
+through an unbounded cache keyed four ways and reports the hit rate of
+each (a hit is a pair whose key was already seen):
+
+  verbatim    the strings exactly as stored
+  whitespace  case and whitespace folded (route keys before normalization)
+  normalized  normalize_location: punctuation, abbreviations, coordinates
+  geocoded    normalized, with addresses in the geocode_cache table
+              replaced by their coordinates (what route lookups key on
+              with GEOCODE_CACHE_ENABLED=true)
+
+Live per-process hit rates are at /health/caches and /metrics.
+
+Usage:
+    python scripts/route_key_hit_rate.py [--limit 100000]
+"""
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.geocode_cache import GeocodeCacheEntry
+from app.models.trip import Trip
+from app.services.route_cache import format_lat_lng, normalize_location
+
+
+def hit_rate(keys) -> tuple:
+    """Return (lookups, distinct keys, hit rate) of an unbounded cache seeing keys in order."""
+    seen = set()
+    lookups = hits = 0
+    for key in keys:
+        lookups += 1
+        if key in seen:
+            hits += 1
+        else:
+            seen.add(key)
+    return lookups, len(seen), hits / lookups if lookups else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100000, help="Most recent trips to replay")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        pairs = db.execute(
+            select(Trip.origin, Trip.destination).order_by(Trip.id.desc()).limit(args.limit)
+        ).all()
+        geocodes = {
+            address: format_lat_lng(lat, lng)
+            for address, lat, lng in db.execute(
+                select(GeocodeCacheEntry.address, GeocodeCacheEntry.lat, GeocodeCacheEntry.lng)
+            )
+        }
+    pairs.reverse()
+
+    normalized_names = {}
+
+    def normalized(location: str) -> str:
+        if location not in normalized_names:
+            normalized_names[location] = normalize_location(location)
+        return normalized_names[location]
+
+    strategies = {
+        "verbatim": lambda location: location,
+        "whitespace": lambda location: " ".join(location.split()).lower(),
+        "normalized": normalized,
+        "geocoded": lambda location: geocodes.get(normalized(location), normalized(location)),
+    }
+    print(f"{len(pairs)} trips, {len(geocodes)} geocoded addresses")
+    print(f"{'keying':<12} {'distinct':>9} {'hit rate':>9}")
+    for name, key_of in strategies.items():
+        _, distinct, rate = hit_rate((key_of(origin), key_of(destination)) for origin, destination in pairs)
+        print(f"{name:<12} {distinct:>9} {rate * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -22,10 +23,10 @@ from app.services.maps_client import maps_client
 
 print("\nAttempting to fetch directions...")
 try:
-    routes = maps_client.get_directions(
+    routes = asyncio.run(maps_client.get_directions(
         origin="New York, NY",
         destination="Boston, MA"
-    )
+    ))
     print(f"Success! Found {len(routes)} routes.")
     print(f"Route 1 distance: {routes[0]['distance_meters']} meters")
 except Exception as e:
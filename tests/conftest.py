@@ -0,0 +1,106 @@
+"""Shared fixtures: an isolated SQLite database and the app wired to the fake Routes API."""
+import importlib.util
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read once at import time, so configure them before the app is imported
+_DB_DIR = tempfile.mkdtemp(prefix="route-planner-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["GOOGLE_MAPS_API_KEY"] = "test-key"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["ESTIMATE_CALIBRATE_ON_STARTUP"] = "false"
+os.environ["METRICS_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, engine
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.services.auth_cache import auth_cache
+from app.services.route_cache import route_cache
+
+
+def _load_fake_routes_api():
+    """Import scripts/fake_routes_api.py, which is a script rather than a package module."""
+    spec = importlib.util.spec_from_file_location("fake_routes_api", ROOT / "scripts" / "fake_routes_api.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def db_tables():
+    """Start every test from empty tables and empty in-process caches."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    route_cache.clear()
+    auth_cache.clear()
+    yield
+    route_cache.clear()
+    auth_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def fake_routes_api():
+    """The fake Routes API application, with no simulated latency."""
+    module = _load_fake_routes_api()
+    module.app.state.latency_ms = 0.0
+    module.app.state.latency_jitter_ms = 0.0
+    return module.app
+
+
+@pytest.fixture
+def client(db_tables, fake_routes_api):
+    """Test client for the app, with Routes API calls served in-process by the fake."""
+    from app.main import app
+    from app.services.maps_client import maps_client
+
+    # maps_client.open() keeps an existing client, so the app uses this one
+    maps_client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_routes_api))
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register a user and return a bearer header for them."""
+    def login(email: str = "driver@example.com", password: str = "secret-password"):
+        client.post("/api/register", json={"email": email, "password": password})
+        response = client.post("/api/token", data={"username": email, "password": password})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def vehicle(client, auth_headers):
+    """A vehicle owned by the default test user, with that user's headers."""
+    headers = auth_headers()
+    response = client.post(
+        "/api/vehicles/",
+        json={"name": "Van", "fuel_type": "diesel", "fuel_consumption": 8.0, "fuel_price": 1.6},
+        headers=headers
+    )
+    return response.json(), headers
+
+
+@pytest.fixture
+def fake_maps(db_tables, fake_routes_api, monkeypatch):
+    """Route calculations against the fake Routes API with the in-process cache enabled.
+
+    maps_client.requests counts the upstream calls a test makes.
+    """
+    from app.config import settings
+    from app.services.maps_client import maps_client
+
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    monkeypatch.setattr(maps_client, "_client", httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_routes_api)))
+    monkeypatch.setattr(maps_client, "requests", 0)
+    return maps_client
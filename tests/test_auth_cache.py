@@ -0,0 +1,86 @@
+"""Tests for the verified-token cache behind get_current_user."""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+from app.services import auth_cache as auth_cache_module
+from app.services.auth_cache import AuthCache, auth_cache
+
+
+@pytest.fixture
+def signed_in(client, auth_headers):
+    """Headers of a user whose token is already in the cache."""
+    headers = auth_headers()
+    assert client.get("/api/vehicles/", headers=headers).status_code == 200
+    assert client.get("/api/vehicles/", headers=headers).status_code == 200
+    assert auth_cache.stats()['size'] == 1 and auth_cache.stats()['hits'] >= 1
+    return headers
+
+
+def test_orm_update_evicts_the_users_tokens(client, signed_in):
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.email == "driver@example.com").one()
+        user.email = "renamed@example.com"
+        db.commit()
+    assert auth_cache.stats()['size'] == 0
+    # The token's subject no longer exists
+    assert client.get("/api/vehicles/", headers=signed_in).status_code == 401
+
+
+def test_orm_delete_evicts_the_users_tokens(client, signed_in):
+    with SessionLocal() as db:
+        db.delete(db.query(User).filter(User.email == "driver@example.com").one())
+        db.commit()
+    assert client.get("/api/vehicles/", headers=signed_in).status_code == 401
+
+
+def test_bulk_update_evicts_every_token(client, signed_in):
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.email == "driver@example.com").values(email="renamed@example.com"))
+        db.commit()
+    assert auth_cache.stats()['size'] == 0
+    assert client.get("/api/vehicles/", headers=signed_in).status_code == 401
+
+
+def test_bulk_delete_of_other_tables_keeps_tokens(client, signed_in):
+    from app.models.vehicle import Vehicle
+
+    with SessionLocal() as db:
+        db.execute(delete(Vehicle))
+        db.commit()
+    assert auth_cache.stats()['size'] == 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Wall and monotonic clocks of the auth cache, advanced together by the test."""
+    now = SimpleNamespace(value=1_700_000_000.0)
+    monkeypatch.setattr(auth_cache_module, "time", SimpleNamespace(time=lambda: now.value, monotonic=lambda: now.value))
+    return now
+
+
+def test_entry_never_outlives_the_token_exp(clock):
+    cache = AuthCache(max_entries=10, ttl_seconds=30)
+    user = UserSchema(id=1, email="driver@example.com")
+    cache.set("short", user, token_exp=clock.value + 5, generation=cache.generation)
+    cache.set("long", user, token_exp=clock.value + 3600, generation=cache.generation)
+    cache.set("expired", user, token_exp=clock.value - 1, generation=cache.generation)
+    assert cache.stats()['size'] == 2
+
+    clock.value += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == user
+    clock.value += 25
+    assert cache.get("long") is None
+
+
+def test_lookup_racing_an_invalidation_is_not_stored(clock):
+    cache = AuthCache(max_entries=10, ttl_seconds=30)
+    generation = cache.generation
+    cache.invalidate_user(1)
+    cache.set("token", UserSchema(id=1, email="driver@example.com"), None, generation)
+    assert cache.get("token") is None
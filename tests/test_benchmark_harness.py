@@ -0,0 +1,60 @@
+"""Tests for the benchmark harness: the fake Routes API and the result summaries."""
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# The benchmark scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from benchmark_suite import summarize  # noqa: E402
+
+
+def post(app, path, body):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake") as client:
+            return await client.post(path, json=body)
+    return asyncio.run(send())
+
+
+def waypoint(address):
+    return {"waypoint": {"address": address}}
+
+
+def test_fake_routes_are_deterministic_and_google_shaped(fake_routes_api):
+    body = {"origin": {"address": "Depot 1"}, "destination": {"address": "Port"}, "computeAlternativeRoutes": True}
+    first = post(fake_routes_api, "/directions/v2:computeRoutes", body).json()
+    second = post(fake_routes_api, "/directions/v2:computeRoutes", body).json()
+    assert first == second
+    fastest, detour = first["routes"]
+    assert fastest["distanceMeters"] < detour["distanceMeters"]
+    assert fastest["duration"].endswith("s")
+    assert fastest["polyline"]["encodedPolyline"]
+    assert set(fastest["legs"][0]) == {"startLocation", "endLocation"}
+
+
+def test_fake_matrix_omits_zero_indexes_and_enforces_limits(fake_routes_api):
+    body = {"origins": [waypoint("A"), waypoint("B")], "destinations": [waypoint("C"), waypoint("D"), waypoint("E")]}
+    elements = post(fake_routes_api, "/distanceMatrix/v2:computeRouteMatrix", body).json()
+    assert len(elements) == 6
+    assert "originIndex" not in elements[0] and "destinationIndex" not in elements[0]
+    assert (elements[-1]["originIndex"], elements[-1]["destinationIndex"]) == (1, 2)
+
+    oversized = {"origins": [waypoint(f"O{i}") for i in range(26)], "destinations": [waypoint(f"D{i}") for i in range(25)]}
+    assert post(fake_routes_api, "/distanceMatrix/v2:computeRouteMatrix", oversized).status_code == 400
+
+
+def test_summarize_reports_percentiles_and_throughput():
+    latencies = [i / 1000 for i in range(1, 101)]
+    summary = summarize(latencies, errors=3, elapsed=2.0)
+    assert summary["requests"] == 100 and summary["errors"] == 3
+    assert summary["rps"] == 50.0
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p50_ms"] < summary["p95_ms"] < summary["p99_ms"] <= 100.0
+
+
+def test_summarize_single_sample():
+    summary = summarize([0.02], errors=0, elapsed=1.0)
+    assert summary["p50_ms"] == summary["p99_ms"] == pytest.approx(20.0)
@@ -0,0 +1,36 @@
+"""Tests for the vectorized cost matrix."""
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.cost_estimator import cost_estimator, round_cents
+
+
+def test_cost_matrix_matches_per_trip_costs():
+    rng = random.Random(7)
+    distances = [round(rng.uniform(0, 900), 3) for _ in range(300)] + [0.0, 12.5, 100.0]
+    vehicles = [
+        SimpleNamespace(fuel_consumption=rng.choice([4.5, 5.5, 6.3, 8.0, 11.7]), fuel_price=rng.choice([1.459, 1.6, 1.789]))
+        for _ in range(12)
+    ]
+    matrix = cost_estimator.estimate_cost_matrix(
+        distances, [vehicle.fuel_consumption for vehicle in vehicles], [vehicle.fuel_price for vehicle in vehicles]
+    )
+    assert matrix['fuel_cost'].shape == (12, len(distances))
+    for row, vehicle in enumerate(vehicles):
+        for column, distance in enumerate(distances):
+            expected = cost_estimator.estimate_trip_cost(distance, vehicle)
+            assert matrix['fuel_used_liters'][row, column] == expected['fuel_used_liters']
+            assert matrix['fuel_cost'][row, column] == expected['fuel_cost']
+
+
+def test_round_cents_agrees_with_round_on_ties():
+    values = np.array([0.125, 0.135, 1.005, 2.675, 10.0049, 3.3350000000000004])
+    assert round_cents(values).tolist() == [round(value, 2) for value in values.tolist()]
+
+
+def test_mismatched_profiles_are_rejected():
+    with pytest.raises(ValueError):
+        cost_estimator.estimate_cost_matrix([1.0], [5.0, 6.0], [1.6])
@@ -0,0 +1,38 @@
+"""Tests for comparing a route's cost across the user's vehicles."""
+from app.services.maps_client import maps_client
+
+
+def add_vehicle(client, headers, name, consumption, price):
+    return client.post("/api/vehicles/", headers=headers, json={
+        "name": name, "fuel_type": "petrol", "fuel_consumption": consumption, "fuel_price": price
+    }).json()
+
+
+def test_compare_makes_one_lookup_for_every_vehicle(client, vehicle, monkeypatch):
+    van, headers = vehicle
+    car = add_vehicle(client, headers, "Car", 5.0, 1.8)
+    truck = add_vehicle(client, headers, "Truck", 20.0, 1.6)
+    monkeypatch.setattr(maps_client, "requests", 0)
+
+    response = client.post("/api/routes/compare", headers=headers, json={
+        "origin": "52.52,13.40", "destination": "53.55,9.99", "alternatives": True
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert maps_client.requests == 1
+    assert len(body["costs"]) == 3 * len(body["routes"]) == 6
+    assert body["cheapest"]["vehicle_id"] == car["id"]
+    costs = [cost["fuel_cost"] for cost in body["costs"]]
+    assert costs == sorted(costs)
+    assert {cost["vehicle_id"] for cost in body["costs"][-2:]} == {truck["id"]}
+
+
+def test_compare_refuses_vehicles_of_other_users(client, vehicle, auth_headers, monkeypatch):
+    van, _ = vehicle
+    other = auth_headers("other@example.com")
+    monkeypatch.setattr(maps_client, "requests", 0)
+    response = client.post("/api/routes/compare", headers=other, json={
+        "origin": "52.52,13.40", "destination": "53.55,9.99", "vehicle_ids": [van["id"]]
+    })
+    assert response.status_code == 404
+    assert maps_client.requests == 0
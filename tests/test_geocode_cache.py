@@ -0,0 +1,71 @@
+"""Tests for address normalization and the geocode cache behind route keys."""
+import asyncio
+
+import pytest
+
+from app.services import route_calculator as route_calculator_module
+from app.services.geo import parse_lat_lng
+from app.services.geocode_cache import GeocodeCache
+from app.services.route_cache import make_route_key, normalize_location
+from app.services.route_calculator import route_calculator
+
+
+@pytest.mark.parametrize("location, normalized", [
+    ("  Main St., Springfield ", "main street, springfield"),
+    ("Berliner Str. 5, 10115 Berlin", "berliner strasse 5, 10115 berlin"),
+    ("Hauptstraße 12a", "hauptstrasse 12a"),
+    ("Berlin Hbf", "berlin hauptbahnhof"),
+    # Street types only end an address part: these are names, not streets
+    ("St Louis, MO", "st louis, mo"),
+    ("Hartford, CT", "hartford, ct"),
+    ("Dr Martin Luther King Jr Dr", "dr martin luther king jr drive"),
+])
+def test_normalize_location(location, normalized):
+    assert normalize_location(location) == normalized
+    assert normalize_location(normalized) == normalized
+
+
+def test_make_route_key_normalizes_spelling():
+    assert make_route_key("Main St, Springfield", "52.520001,13.4", True) == \
+        make_route_key("  main street,springfield", "52.52000, 13.40000", 1)
+    assert make_route_key("St Louis", "A", False) != make_route_key("Street Louis", "A", False)
+
+
+@pytest.fixture
+def geocoding(fake_maps, monkeypatch):
+    """A fresh, enabled geocode cache in front of route lookups."""
+    cache = GeocodeCache(enabled=True, max_entries=100, ttl_seconds=3600)
+    monkeypatch.setattr(route_calculator_module, "geocode_cache", cache)
+    return cache
+
+
+def test_resolved_address_is_shared_by_its_spellings(fake_maps, geocoding):
+    async def scenario():
+        first = await route_calculator.calculate_routes("Berlin Hbf", "Hamburg Hbf")
+        spellings = [await geocoding.resolve(location) for location in ("Berlin Hbf", "BERLIN HAUPTBAHNHOF.")]
+        # Any spelling, or the coordinates themselves, now key on the resolved location
+        second = await route_calculator.calculate_routes("berlin hauptbahnhof", "Hamburg  Hauptbahnhof")
+        third = await route_calculator.calculate_routes(spellings[0], "hamburg hbf")
+        return first, spellings, second, third
+
+    first, spellings, second, third = asyncio.run(scenario())
+    assert spellings[0] == spellings[1]
+    assert parse_lat_lng(spellings[0]) is not None
+    assert [route['distance_km'] for route in second] == [route['distance_km'] for route in first]
+    assert second[0]['start_address'] == "berlin hauptbahnhof"
+    assert third[0]['distance_km'] == first[0]['distance_km']
+    assert fake_maps.requests == 1
+    assert geocoding.stats()['stores'] == 2
+
+
+def test_unknown_address_is_looked_up_once(geocoding, monkeypatch):
+    lookups = []
+    get = geocoding.get
+    monkeypatch.setattr(geocoding, "get", lambda address: lookups.append(address) or get(address))
+
+    async def scenario():
+        return [await geocoding.resolve("Nowhere Rd, Springfield") for _ in range(3)]
+
+    assert asyncio.run(scenario()) == ["nowhere road, springfield"] * 3
+    assert lookups == ["nowhere road, springfield"]
+    assert geocoding.stats()['misses'] == 3
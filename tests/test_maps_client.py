@@ -0,0 +1,30 @@
+"""Tests for the async Routes API client."""
+import asyncio
+
+from app.services.maps_client import maps_client
+
+
+def test_get_directions_parses_routes(fake_maps):
+    routes = asyncio.run(maps_client.get_directions("52.52,13.40", "53.55,9.99", alternatives=True))
+    assert [route['route_type'] for route in routes] == ['fastest', 'alternative_1']
+    fastest = routes[0]
+    assert 250_000 < fastest['distance_meters'] < 450_000
+    assert fastest['duration_seconds'] == int(fastest['distance_meters'] / 1000 / 60 * 3600)
+    assert fastest['start_location'] == [52.52, 13.40] and fastest['end_location'] == [53.55, 9.99]
+    assert fake_maps.requests == 1
+
+
+def test_calculate_endpoint_costs_and_saves_the_primary_route(client, vehicle):
+    vehicle, headers = vehicle
+    response = client.post("/api/routes/calculate", headers=headers, json={
+        "origin": "52.52,13.40", "destination": "53.55,9.99", "vehicle_id": vehicle["id"], "alternatives": True
+    })
+    assert response.status_code == 200
+    body = response.json()
+    fastest = body["routes"][0]
+    assert len(body["routes"]) == 2
+    assert fastest["fuel_used_liters"] == round(fastest["distance_km"] * 8.0 / 100, 2)
+
+    trip = client.get(f"/api/trips/{body['trip_id']}", headers=headers).json()
+    assert (trip["origin"], trip["destination"]) == ("52.52,13.40", "53.55,9.99")
+    assert trip["distance_km"] == fastest["distance_km"]
@@ -0,0 +1,101 @@
+"""Tests for keyset pagination of trip listings."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.models.user import User
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def stored_trips(vehicle):
+    """Seventeen trips for the test user, several sharing a created_at, plus one of another user."""
+    vehicle, headers = vehicle
+    base = datetime(2026, 5, 1, 8, 0)
+    with SessionLocal() as db:
+        user_id = db.query(User.id).filter(User.email == "driver@example.com").scalar()
+        rows = [
+            Trip(
+                vehicle_id=vehicle["id"], user_id=user_id, origin=f"O{i}", destination="D",
+                distance_km=10.0 + i, duration_minutes=15.0, fuel_used_liters=1.0, fuel_cost=1.6,
+                # Groups of three trips share a timestamp, so ids must break ties
+                created_at=base + timedelta(minutes=i // 3)
+            )
+            for i in range(17)
+        ]
+        rows.append(Trip(
+            vehicle_id=vehicle["id"], user_id=user_id + 1000, origin="X", destination="Y",
+            distance_km=1.0, duration_minutes=1.0, fuel_used_liters=0.1, fuel_cost=0.2, created_at=base
+        ))
+        db.add_all(rows)
+        db.commit()
+        expected = [
+            trip.id for trip in sorted(rows[:-1], key=lambda trip: (trip.created_at, trip.id), reverse=True)
+        ]
+    return vehicle, headers, expected
+
+
+def test_cursor_pages_cover_every_trip_once_newest_first(client, stored_trips):
+    _, headers, expected = stored_trips
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 4, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/trips/", params=params, headers=headers).json()
+        seen.extend(trip["id"] for trip in page["trips"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 5
+
+
+def test_exact_final_page_has_no_next_cursor(client, stored_trips):
+    _, headers, expected = stored_trips
+    first = client.get("/api/trips/", params={"limit": 9}, headers=headers).json()
+    second = client.get("/api/trips/", params={"limit": 8, "cursor": first["next_cursor"]}, headers=headers).json()
+    assert [trip["id"] for trip in first["trips"] + second["trips"]] == expected
+    assert second["next_cursor"] is None
+
+
+def test_offset_pages_match_cursor_order(client, stored_trips):
+    _, headers, expected = stored_trips
+    page = client.get("/api/trips/", params={"skip": 4, "limit": 4}, headers=headers).json()
+    assert [trip["id"] for trip in page["trips"]] == expected[4:8]
+    assert page["page"] == 2
+
+
+def test_vehicle_listing_returns_cursor_in_header(client, stored_trips):
+    vehicle, headers, expected = stored_trips
+    response = client.get(f"/api/trips/vehicle/{vehicle['id']}", params={"limit": 10}, headers=headers)
+    cursor = response.headers["X-Next-Cursor"]
+    rest = client.get(
+        f"/api/trips/vehicle/{vehicle['id']}", params={"limit": 10, "cursor": cursor}, headers=headers
+    )
+    assert [trip["id"] for trip in response.json() + rest.json()] == expected
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_invalid_cursor_is_a_bad_request(client, stored_trips):
+    _, headers, _ = stored_trips
+    response = client.get("/api/trips/", params={"cursor": "garbage"}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,69 @@
+"""Tests for bcrypt hashing on the dedicated thread pool."""
+import asyncio
+import threading
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.password_hasher import PasswordHasher, password_hasher
+
+
+@pytest.fixture
+def hashers():
+    current, stronger = PasswordHasher(rounds=4, max_workers=2), PasswordHasher(rounds=5, max_workers=2)
+    yield current, stronger
+    current.shutdown()
+    stronger.shutdown()
+
+
+def test_hashing_runs_on_the_pool(hashers, monkeypatch):
+    hasher, _ = hashers
+    threads = []
+    hash_password = hasher.context.hash
+    monkeypatch.setattr(hasher.context, "hash", lambda secret: threads.append(threading.current_thread().name) or hash_password(secret))
+
+    async def scenario():
+        return await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(4)))
+
+    hashes = asyncio.run(scenario())
+    assert len(set(hashes)) == 4
+    assert threads and all(name.startswith("bcrypt") for name in threads)
+    assert threading.current_thread().name not in threads
+
+
+def test_verify_and_update_keeps_hashes_of_the_current_cost(hashers):
+    hasher, _ = hashers
+    stored = hasher.hash_sync("secret-password")
+    assert asyncio.run(hasher.verify_and_update("secret-password", stored)) == (True, None)
+    assert asyncio.run(hasher.verify_and_update("wrong", stored)) == (False, None)
+
+
+def test_verify_and_update_rehashes_on_a_cost_change(hashers):
+    old, new = hashers
+    stored = old.hash_sync("secret-password")
+    assert stored.startswith("$2b$04$")
+    valid, replacement = asyncio.run(new.verify_and_update("secret-password", stored))
+    assert valid and replacement.startswith("$2b$05$")
+    assert new.verify_sync("secret-password", replacement)
+    # A wrong password never yields a replacement
+    assert asyncio.run(new.verify_and_update("wrong", stored)) == (False, None)
+
+
+def test_login_upgrades_the_stored_hash(client, auth_headers, monkeypatch, hashers):
+    auth_headers()
+    _, stronger = hashers
+    monkeypatch.setattr(password_hasher, "context", stronger.context)
+
+    def stored_hash():
+        with SessionLocal() as db:
+            return db.query(User.hashed_password).filter(User.email == "driver@example.com").scalar()
+
+    assert stored_hash().startswith("$2b$04$")
+    form = {"username": "driver@example.com", "password": "secret-password"}
+    assert client.post("/api/token", data=form).status_code == 200
+    upgraded = stored_hash()
+    assert upgraded.startswith("$2b$05$")
+    assert client.post("/api/token", data=form).status_code == 200
+    assert stored_hash() == upgraded
+    assert client.post("/api/token", data={**form, "password": "wrong"}).status_code == 401
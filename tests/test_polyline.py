@@ -0,0 +1,91 @@
+"""Tests for the encoded polyline codec and Douglas-Peucker simplification."""
+import math
+
+import numpy as np
+import pytest
+
+from app.services import polyline
+
+# Example from Google's encoded polyline algorithm documentation
+GOOGLE_EXAMPLE = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+GOOGLE_POINTS = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+
+def reference_simplify(points, tolerance_m):
+    """Textbook recursive Douglas-Peucker on the same local projection as polyline.simplify."""
+    points = np.asarray(points, dtype=float)
+    mean_lat = math.radians(points[:, 0].mean())
+    xy = np.column_stack((
+        points[:, 1] * polyline.METERS_PER_DEGREE_LNG * math.cos(mean_lat),
+        points[:, 0] * polyline.METERS_PER_DEGREE_LAT
+    ))
+    keep = {0, len(points) - 1}
+
+    def split(first, last):
+        if last - first < 2:
+            return
+        segment = xy[last] - xy[first]
+        length_sq = segment @ segment
+        best_index, best_distance = None, -1.0
+        for index in range(first + 1, last):
+            offset = xy[index] - xy[first]
+            t = 0.0 if length_sq == 0 else min(max((offset @ segment) / length_sq, 0.0), 1.0)
+            distance = math.hypot(*(offset - t * segment))
+            if distance > best_distance:
+                best_index, best_distance = index, distance
+        if best_distance > tolerance_m:
+            keep.add(best_index)
+            split(first, best_index)
+            split(best_index, last)
+
+    split(0, len(points) - 1)
+    return points[sorted(keep)]
+
+
+def test_decode_matches_google_example():
+    np.testing.assert_allclose(polyline.decode(GOOGLE_EXAMPLE), GOOGLE_POINTS)
+
+
+def test_encode_matches_google_example():
+    assert polyline.encode(GOOGLE_POINTS) == GOOGLE_EXAMPLE
+
+
+def test_round_trip_keeps_five_decimals():
+    rng = np.random.default_rng(7)
+    points = np.column_stack((rng.uniform(-89, 89, 500), rng.uniform(-179, 179, 500)))
+    decoded = polyline.decode(polyline.encode(points))
+    np.testing.assert_allclose(decoded, np.round(points, 5), atol=1e-9)
+
+
+def test_empty_polyline():
+    assert polyline.encode([]) == ""
+    assert polyline.decode("").shape == (0, 2)
+
+
+@pytest.mark.parametrize("encoded", ["_p~iF~ps|U_ulL", "_p~iF~ps|U_", "abc\x7f", "é"])
+def test_decode_rejects_invalid_input(encoded):
+    with pytest.raises(ValueError):
+        polyline.decode(encoded)
+
+
+def test_simplify_keeps_endpoints_and_drops_collinear_points():
+    points = [(52.0, 13.0 + i * 0.001) for i in range(20)]
+    simplified = polyline.simplify(points, tolerance_m=1.0)
+    np.testing.assert_allclose(simplified, [points[0], points[-1]])
+
+
+def test_simplify_with_zero_tolerance_returns_input():
+    points = np.array([(52.0, 13.0), (52.1, 13.05), (52.0, 13.1)])
+    np.testing.assert_array_equal(polyline.simplify(points, 0), points)
+
+
+@pytest.mark.parametrize("tolerance_m", [5.0, 50.0, 500.0])
+def test_simplify_matches_recursive_douglas_peucker(tolerance_m):
+    rng = np.random.default_rng(int(tolerance_m))
+    # A wandering track of roughly 20 m steps
+    steps = rng.normal(0, 0.0002, size=(400, 2))
+    points = np.array([52.52, 13.40]) + np.cumsum(steps, axis=0)
+    np.testing.assert_allclose(
+        polyline.simplify(points, tolerance_m),
+        reference_simplify(points, tolerance_m)
+    )
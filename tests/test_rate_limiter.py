@@ -0,0 +1,169 @@
+"""Tests for the GCRA token bucket, the outbound governor and the inbound limiter."""
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import (
+    DatabaseRateLimitBackend,
+    InboundRateLimiter,
+    MemoryRateLimitBackend,
+    RateLimitExceeded,
+    RequestGovernor,
+    _schedule,
+    calculate_rate_limiter
+)
+
+
+def test_schedule_admits_a_burst_then_spaces_requests():
+    tat = 0.0
+    for _ in range(3):
+        granted, wait, tat = _schedule(tat, 100.0, rate=1.0, burst=3, max_wait=0.0)
+        assert granted and wait == 0.0
+    granted, wait, _ = _schedule(tat, 100.0, rate=1.0, burst=3, max_wait=0.0)
+    assert not granted
+    assert wait == pytest.approx(1.0)
+    # One emission interval later a token is back
+    granted, wait, _ = _schedule(tat, 101.0, rate=1.0, burst=3, max_wait=0.0)
+    assert granted and wait == 0.0
+
+
+def test_schedule_queues_within_max_wait():
+    _, _, tat = _schedule(0.0, 10.0, rate=2.0, burst=1, max_wait=0.0)
+    granted, wait, new_tat = _schedule(tat, 10.0, rate=2.0, burst=1, max_wait=1.0)
+    assert granted
+    assert wait == pytest.approx(0.5)
+    assert new_tat == pytest.approx(11.0)
+
+
+def test_schedule_refusal_leaves_the_bucket_unchanged():
+    _, _, tat = _schedule(0.0, 10.0, rate=1.0, burst=1, max_wait=0.0)
+    granted, _, unchanged = _schedule(tat, 10.0, rate=1.0, burst=1, max_wait=0.0)
+    assert not granted
+    assert unchanged == tat
+
+
+def test_weighted_cost_takes_several_tokens():
+    granted, _, tat = _schedule(0.0, 50.0, rate=1.0, burst=10, max_wait=0.0, cost=8)
+    assert granted
+    granted, wait, _ = _schedule(tat, 50.0, rate=1.0, burst=10, max_wait=0.0, cost=3)
+    assert not granted
+    assert wait == pytest.approx(1.0)
+    granted, _, _ = _schedule(tat, 50.0, rate=1.0, burst=10, max_wait=0.0, cost=2)
+    assert granted
+
+
+def test_cost_above_burst_needs_a_full_bucket_and_leaves_debt():
+    granted, _, tat = _schedule(0.0, 50.0, rate=1.0, burst=5, max_wait=0.0, cost=20)
+    assert granted
+    assert tat == pytest.approx(70.0)
+    granted, wait, _ = _schedule(tat, 50.0, rate=1.0, burst=5, max_wait=0.0)
+    assert not granted
+    assert wait == pytest.approx(16.0)
+
+
+@pytest.mark.parametrize("backend_class", [MemoryRateLimitBackend, DatabaseRateLimitBackend])
+def test_backends_share_a_bucket_per_key(backend_class, db_tables):
+    backend = backend_class()
+
+    async def scenario():
+        results = [await backend.reserve("k", 0.001, 2, 0.0) for _ in range(3)]
+        other = await backend.reserve("other", 0.001, 2, 0.0)
+        return results, other
+
+    results, other = asyncio.run(scenario())
+    assert [granted for granted, _ in results] == [True, True, False]
+    assert results[2][1] > 0
+    assert other[0]
+
+
+def test_inbound_limiter_charges_cost():
+    limiter = InboundRateLimiter(MemoryRateLimitBackend(), "test", per_minute=1, burst=5, enabled=True)
+
+    async def scenario():
+        await limiter.check("user:1", cost=4)
+        with pytest.raises(RateLimitExceeded) as refused:
+            await limiter.check("user:1", cost=2)
+        await limiter.check("user:1")
+        await limiter.check("user:2", cost=5)
+        return refused.value
+
+    refused = asyncio.run(scenario())
+    assert refused.retry_after > 0
+    assert limiter.admitted == 3 and limiter.rejected == 1
+
+
+def test_governor_timeout_on_concurrency_does_not_spend_a_token():
+    governor = RequestGovernor(
+        MemoryRateLimitBackend(), "maps", qps=0.001, burst=2,
+        max_concurrency=1, max_wait=0.05, enabled=True
+    )
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with governor.limit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        for _ in range(3):
+            with pytest.raises(RateLimitExceeded, match="concurrent"):
+                async with governor.limit():
+                    pass
+        release.set()
+        await holder
+        # The holder took one token; the rejected callers must not have taken the other
+        async with governor.limit():
+            pass
+
+    asyncio.run(scenario())
+    assert governor.admitted == 2
+    assert governor.rejected == 3
+    assert governor.stats()['in_flight'] == 0
+
+
+def test_governor_releases_the_slot_when_the_bucket_refuses():
+    governor = RequestGovernor(
+        MemoryRateLimitBackend(), "maps", qps=0.001, burst=1,
+        max_concurrency=1, max_wait=0.0, enabled=True
+    )
+
+    async def scenario():
+        async with governor.limit():
+            pass
+        with pytest.raises(RateLimitExceeded, match="rate limit"):
+            async with governor.limit():
+                pass
+
+    asyncio.run(scenario())
+    assert governor.stats()['in_flight'] == 0
+
+
+@pytest.fixture
+def strict_route_limit(monkeypatch):
+    """Enable the per-client route calculation limit with a small bucket."""
+    monkeypatch.setattr(calculate_rate_limiter, "backend", MemoryRateLimitBackend())
+    monkeypatch.setattr(calculate_rate_limiter, "enabled", True)
+    monkeypatch.setattr(calculate_rate_limiter, "per_minute", 1)
+    monkeypatch.setattr(calculate_rate_limiter, "burst", 6)
+
+
+def test_matrix_is_charged_per_element(client, auth_headers, strict_route_limit):
+    headers = auth_headers()
+    body = {"origins": ["52.5,13.4", "52.4,13.3"], "destinations": ["52.6,13.5", "52.3,13.2"]}
+    assert client.post("/api/routes/matrix", json=body, headers=headers).status_code == 200
+    response = client.post("/api/routes/matrix", json=body, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    # Another client has its own bucket
+    other = auth_headers("other@example.com")
+    assert client.post("/api/routes/matrix", json=body, headers=other).status_code == 200
+
+
+def test_batch_is_charged_per_distinct_pair(client, vehicle, strict_route_limit):
+    vehicle, headers = vehicle
+    items = [{"origin": f"52.{i},13.4", "destination": "52.5,13.0"} for i in range(4)]
+    body = {"vehicle_id": vehicle["id"], "items": items + items}
+    assert client.post("/api/routes/calculate/batch", json=body, headers=headers).status_code == 200
+    assert client.post("/api/routes/calculate/batch", json=body, headers=headers).status_code == 429
@@ -0,0 +1,184 @@
+"""Tests for the circuit breaker, Routes API retries and stale-while-revalidate."""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import circuit_breaker as circuit_breaker_module
+from app.services import maps_client as maps_client_module
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.services.maps_client import MapsApiError, maps_client
+from app.services.route_cache import RouteCache
+from app.services.route_calculator import route_calculator
+from tests.test_route_cache import clock  # noqa: F401  (shared fixture)
+
+
+@pytest.fixture
+def breaker_clock(monkeypatch):
+    now = SimpleNamespace(value=500.0)
+    monkeypatch.setattr(circuit_breaker_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_breaker_opens_goes_half_open_and_closes(breaker_clock):
+    breaker = CircuitBreaker("API", failure_threshold=3, recovery_seconds=30)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as refused:
+        breaker.before_call()
+    assert refused.value.retry_after == pytest.approx(30)
+
+    breaker_clock.value += 30
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Only one trial call at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_circuit(breaker_clock):
+    breaker = CircuitBreaker("API", failure_threshold=1, recovery_seconds=10)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker_clock.value += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.times_opened == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_the_failure_count(breaker_clock):
+    breaker = CircuitBreaker("API", failure_threshold=2, recovery_seconds=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+ROUTE = {"routes": [{"distanceMeters": 1000, "duration": "60s", "polyline": {"encodedPolyline": ""}, "legs": []}]}
+
+
+@pytest.fixture
+def routes_api(monkeypatch):
+    """Serve Routes API calls from a list of canned responses and record retry sleeps."""
+    responses = []
+    sleeps = []
+
+    def handler(request):
+        return responses.pop(0)
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(maps_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(maps_client, "breaker", CircuitBreaker("Routes API", failure_threshold=2, recovery_seconds=30))
+    monkeypatch.setattr(maps_client, "requests", 0)
+    monkeypatch.setattr(maps_client_module, "asyncio", SimpleNamespace(sleep=sleep))
+    monkeypatch.setattr(settings, "maps_max_retries", 2)
+    return SimpleNamespace(responses=responses, sleeps=sleeps)
+
+
+def directions():
+    return asyncio.run(maps_client.get_directions("52.52,13.40", "53.55,9.99"))
+
+
+def test_retry_honours_retry_after(routes_api):
+    routes_api.responses += [
+        httpx.Response(429, headers={"Retry-After": "1.5"}, json={"error": {"message": "quota"}}),
+        httpx.Response(503, headers={"Retry-After": "60"}),
+        httpx.Response(200, json=ROUTE)
+    ]
+    assert directions()[0]['distance_meters'] == 1000
+    assert maps_client.requests == 3
+    # Retry-After is followed, but never beyond the backoff cap
+    assert routes_api.sleeps == [1.5, settings.maps_retry_backoff_max_seconds]
+
+
+def test_client_errors_are_not_retried(routes_api):
+    routes_api.responses.append(httpx.Response(400, json={"error": {"message": "Invalid origin"}}))
+    with pytest.raises(MapsApiError) as failed:
+        directions()
+    assert failed.value.status_code == 400 and not failed.value.retryable
+    assert "Invalid origin" in str(failed.value)
+    assert maps_client.requests == 1 and routes_api.sleeps == []
+    # A bad request says nothing about the API's health
+    assert maps_client.breaker.consecutive_failures == 0
+
+
+def test_exhausted_retries_open_the_circuit(routes_api):
+    routes_api.responses += [httpx.Response(503) for _ in range(6)]
+    for _ in range(2):
+        with pytest.raises(MapsApiError):
+            directions()
+    assert maps_client.requests == 6
+    assert maps_client.breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        directions()
+    assert maps_client.requests == 6
+
+
+def test_empty_response_is_a_non_retryable_not_found(routes_api):
+    routes_api.responses.append(httpx.Response(200, json={}))
+    with pytest.raises(MapsApiError) as failed:
+        directions()
+    assert failed.value.status_code == 404 and not failed.value.retryable
+    assert maps_client.breaker.state == CLOSED
+
+
+def test_unroutable_pair_is_unprocessable(client, vehicle, monkeypatch):
+    vehicle, headers = vehicle
+    monkeypatch.setattr(maps_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={}))))
+    response = client.post("/api/routes/calculate", headers=headers, json={
+        "origin": "52.52,13.40", "destination": "40.71,-74.00", "vehicle_id": vehicle["id"]
+    })
+    assert response.status_code == 422
+    assert "No route found" in response.json()["detail"]
+
+
+def test_expired_entry_is_served_stale_within_the_window(clock):
+    cache = RouteCache(max_entries=10, ttl_seconds=60, stale_seconds=30)
+    cache.set("k", ["route"])
+    clock.value += 75
+    assert cache.get("k") is None
+    assert cache.get_stale("k") == ["route"]
+    clock.value += 15
+    assert cache.get_stale("k") is None
+    assert cache.stats()['size'] == 0
+    assert cache.stale_hits == 1
+
+
+def test_fresh_entry_is_also_returned_by_get_stale(clock):
+    cache = RouteCache(max_entries=10, ttl_seconds=60, stale_seconds=30)
+    cache.set("k", ["route"])
+    assert cache.get_stale("k") == ["route"]
+
+
+def test_expired_route_is_served_stale_and_refreshed(fake_maps, clock):
+    async def lookup():
+        return await route_calculator.calculate_routes("52.52,13.40", "48.14,11.58")
+
+    async def scenario():
+        first = await lookup()
+        cached = await lookup()
+        clock.value += settings.route_cache_ttl_seconds + 1
+        stale = await lookup()
+        # Let the background refresh finish
+        await asyncio.gather(*route_calculator._refresh_tasks)
+        refreshed = await lookup()
+        return first, cached, stale, refreshed
+
+    first, cached, stale, refreshed = asyncio.run(scenario())
+    assert not first[0]['stale'] and not cached[0]['stale']
+    assert stale[0]['stale']
+    assert stale[0]['distance_km'] == first[0]['distance_km']
+    assert not refreshed[0]['stale']
+    # The first lookup and the background refresh
+    assert fake_maps.requests == 2
@@ -0,0 +1,105 @@
+"""Tests for the offline road graph and local routing engine."""
+import random
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.geo import haversine_m
+from app.services.road_graph import LocalRoutingError, LocalRoutingEngine, RoadGraph, local_routing_engine, write_road_graph
+
+SIZE = 7
+
+
+@pytest.fixture(scope="module")
+def grid_graph(tmp_path_factory):
+    """A 7 x 7 street grid about 1 km apart with random speeds and a few one-way streets."""
+    rng = random.Random(3)
+    lat = np.array([52.50 + row * 0.009 for row in range(SIZE) for _ in range(SIZE)])
+    lng = np.array([13.40 + col * 0.015 for _ in range(SIZE) for col in range(SIZE)])
+    sources, targets = [], []
+    for row in range(SIZE):
+        for col in range(SIZE):
+            node = row * SIZE + col
+            for neighbor in ([node + 1] if col + 1 < SIZE else []) + ([node + SIZE] if row + 1 < SIZE else []):
+                one_way = rng.random() < 0.15
+                sources.append(node)
+                targets.append(neighbor)
+                if not one_way:
+                    sources.append(neighbor)
+                    targets.append(node)
+    length_m = np.array([haversine_m(lat[u], lng[u], lat[v], lng[v]) for u, v in zip(sources, targets)])
+    travel_s = length_m / np.array([rng.choice([8.0, 14.0, 22.0, 30.0]) for _ in sources])
+    path = tmp_path_factory.mktemp("road_graph")
+    write_road_graph(str(path), lat, lng, np.array(sources), np.array(targets), length_m, travel_s)
+    return RoadGraph(str(path))
+
+
+def path_seconds(graph, nodes):
+    """Travel time along consecutive nodes, taking the fastest parallel edge."""
+    total = 0.0
+    for u, v in zip(nodes, nodes[1:]):
+        total += min(
+            graph._travel_s[edge] for edge in range(graph._offsets[u], graph._offsets[u + 1]) if graph._targets[edge] == v
+        )
+    return total
+
+
+def test_contraction_hierarchy_matches_astar(grid_graph):
+    assert grid_graph.contracted
+    for source in range(grid_graph.node_count):
+        for target in range(grid_graph.node_count):
+            try:
+                expected = grid_graph._astar_path(source, target, "travel_s")
+            except LocalRoutingError:
+                with pytest.raises(LocalRoutingError):
+                    grid_graph.shortest_path(source, target)
+                continue
+            nodes, meters, seconds = grid_graph.shortest_path(source, target)
+            assert seconds == pytest.approx(expected[2], rel=1e-5)
+            assert nodes[0] == source and nodes[-1] == target
+            # The unpacked path is a real path on the original graph with that cost
+            assert path_seconds(grid_graph, nodes) == pytest.approx(seconds, rel=1e-5)
+
+
+def test_shortest_path_is_never_longer_than_fastest(grid_graph):
+    fastest = grid_graph.shortest_path(0, grid_graph.node_count - 1, "travel_s")
+    shortest = grid_graph.shortest_path(0, grid_graph.node_count - 1, "length_m")
+    assert shortest[1] <= fastest[1] + 1e-6
+    assert fastest[2] <= shortest[2] + 1e-6
+
+
+def test_engine_snaps_coordinates_and_routes(grid_graph):
+    engine = LocalRoutingEngine(grid_graph.path, max_snap_m=500)
+    routes = engine.route_sync("52.5001,13.4001", "52.554,13.49", alternatives=True)
+    assert routes[0]['route_type'] == 'fastest'
+    assert routes[0]['distance_meters'] > 0
+    with pytest.raises(LocalRoutingError):
+        engine.route_sync("Berlin", "52.554,13.49")
+    with pytest.raises(LocalRoutingError):
+        engine.route_sync("48.0,11.0", "52.554,13.49")
+
+
+def test_missing_graph_is_service_unavailable(client, vehicle, monkeypatch, tmp_path):
+    vehicle, headers = vehicle
+    monkeypatch.setattr(local_routing_engine, "graph_path", str(tmp_path / "missing"))
+    monkeypatch.setattr(local_routing_engine, "_graph", None)
+    response = client.post("/api/routes/calculate", headers=headers, json={
+        "origin": "52.50,13.40", "destination": "52.55,13.49", "vehicle_id": vehicle["id"], "backend": "local"
+    })
+    assert response.status_code == 503
+    assert "scripts/build_road_graph.py" in response.json()["detail"]
+
+    monkeypatch.setattr(settings, "routing_backend", "local")
+    health = client.get("/health/routing").json()
+    assert health["status"] == "unavailable"
+    assert health["local"]["available"] is False
+    assert "scripts/build_road_graph.py" in health["local"]["error"]
+
+
+def test_health_reports_an_available_graph(client, grid_graph, monkeypatch):
+    monkeypatch.setattr(local_routing_engine, "graph_path", grid_graph.path)
+    monkeypatch.setattr(local_routing_engine, "_graph", None)
+    health = client.get("/health/routing").json()
+    assert health["status"] == "ok"
+    assert health["local"]["available"] is True and health["local"]["error"] is None
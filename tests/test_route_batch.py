@@ -0,0 +1,55 @@
+"""Tests for batch route quotes."""
+import pytest
+
+from app.services.maps_client import maps_client
+
+
+@pytest.fixture
+def batch(client, vehicle, monkeypatch):
+    monkeypatch.setattr(maps_client, "requests", 0)
+    return vehicle
+
+
+def test_identical_pairs_are_looked_up_once(client, batch):
+    vehicle, headers = batch
+    items = [
+        {"origin": "Main Street 1, Springfield", "destination": "Harbour Road"},
+        {"origin": "main St. 1,springfield", "destination": "HARBOUR RD"},
+        {"origin": "52.52,13.40", "destination": "53.55,9.99"},
+        {"origin": "52.520001,13.4", "destination": "53.55000,9.99"},
+        {"origin": "Main Street 1, Springfield", "destination": "Harbour Road"}
+    ]
+    response = client.post("/api/routes/calculate/batch", headers=headers, json={"vehicle_id": vehicle["id"], "items": items})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["unique_routes"] == 2 and body["succeeded"] == 5
+    assert maps_client.requests == 2
+    distances = [result["routes"][0]["distance_km"] for result in body["results"]]
+    assert distances[0] == distances[1] == distances[4] and distances[2] == distances[3]
+
+    trips = client.get("/api/trips/", headers=headers).json()["trips"]
+    assert len(trips) == 5
+    assert {trip["id"] for trip in trips} == {result["trip_id"] for result in body["results"]}
+
+
+def test_trips_store_the_route_addresses(client, batch):
+    vehicle, headers = batch
+    # Both spellings share one lookup, whose addresses are saved for both trips
+    items = [{"origin": "52.52,13.40", "destination": "53.55,9.99"}, {"origin": "52.520001,13.4", "destination": "53.55,9.99"}]
+    body = client.post(
+        "/api/routes/calculate/batch", headers=headers, json={"vehicle_id": vehicle["id"], "items": items}
+    ).json()
+    for result in body["results"]:
+        trip = client.get(f"/api/trips/{result['trip_id']}", headers=headers).json()
+        assert (trip["origin"], trip["destination"]) == ("52.52,13.40", "53.55,9.99")
+
+
+def test_batch_needs_one_of_the_users_vehicles(client, batch, auth_headers):
+    vehicle, _ = batch
+    other = auth_headers("other@example.com")
+    response = client.post(
+        "/api/routes/calculate/batch", headers=other,
+        json={"vehicle_id": vehicle["id"], "items": [{"origin": "A", "destination": "B"}]}
+    )
+    assert response.status_code == 404
+    assert maps_client.requests == 0
@@ -0,0 +1,99 @@
+"""Tests for the in-process and persistent route caches."""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.route_cache import RouteCacheEntry
+from app.services import route_cache as route_cache_module
+from app.services.route_cache import PersistentRouteCache, RouteCache, make_route_key, route_cache
+from app.services.route_calculator import route_calculator
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the route cache's monotonic clock with one the test advances."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(route_cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = RouteCache(max_entries=10, ttl_seconds=60)
+    cache.set("k", [{"distance_km": 1.0}])
+    clock.value += 59
+    assert cache.get("k") == [{"distance_km": 1.0}]
+    clock.value += 1
+    assert cache.get("k") is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = RouteCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cached_values_are_copies(clock):
+    cache = RouteCache(max_entries=10, ttl_seconds=60)
+    routes = [{"distance_km": 1.0}]
+    cache.set("k", routes)
+    routes[0]["distance_km"] = 2.0
+    cache.get("k")[0]["distance_km"] = 3.0
+    assert cache.get("k") == [{"distance_km": 1.0}]
+
+
+def test_repeated_lookup_is_served_from_cache(fake_maps):
+    async def scenario():
+        first = await route_calculator.calculate_routes("52.52,13.40", "53.55,9.99")
+        second = await route_calculator.calculate_routes("52.52,13.40", "53.55,9.99")
+        uncached = await route_calculator.calculate_routes("52.52,13.40", "53.55,9.99", use_cache=False)
+        return first, second, uncached
+
+    first, second, uncached = asyncio.run(scenario())
+    assert first == second == uncached
+    assert fake_maps.requests == 2
+
+
+def test_persistent_cache_classifies_fresh_and_stale_rows(db_tables):
+    cache = PersistentRouteCache(ttl_seconds=60, purge_batch_size=10, stale_seconds=60)
+    key = make_route_key("Berlin", "Hamburg", False)
+    assert cache.lookup(key) == (None, False)
+
+    cache.set(key, [{"distanceMeters": 1000}])
+    assert cache.lookup(key) == ([{"distanceMeters": 1000}], True)
+
+    with SessionLocal() as db:
+        entry = db.query(RouteCacheEntry).one()
+        entry.fetched_at = datetime.utcnow() - timedelta(seconds=90)
+        db.commit()
+    assert cache.lookup(key) == ([{"distanceMeters": 1000}], False)
+
+    with SessionLocal() as db:
+        db.query(RouteCacheEntry).update({RouteCacheEntry.fetched_at: datetime.utcnow() - timedelta(seconds=150)})
+        db.commit()
+    assert cache.lookup(key) == (None, False)
+    assert cache.purge_expired() == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['stale_hits'] == 1
+
+
+def test_persistent_cache_is_shared_across_workers(fake_maps, monkeypatch):
+    monkeypatch.setattr(settings, "route_cache_db_enabled", True)
+
+    async def lookup():
+        return await route_calculator.calculate_routes("52.52,13.40", "53.55,9.99")
+
+    first = asyncio.run(lookup())
+    # Another worker starts with an empty in-process cache
+    route_cache.clear()
+    second = asyncio.run(lookup())
+    assert first == second
+    assert fake_maps.requests == 1
@@ -0,0 +1,84 @@
+"""Tests for coordinate-based route estimates and their calibration."""
+import random
+
+import numpy as np
+import pytest
+
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.services.geo import haversine_m
+from app.services.route_estimator import RouteEstimator, route_estimator
+
+BERLIN, HAMBURG = (52.5200, 13.4050), (53.5511, 9.9937)
+
+
+def routed_trips(count, circuity, speed_kmh, seed=11):
+    """(origin, destination, distance_km, duration_minutes) rows with known factors and some noise."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        start = (52.3 + rng.random() * 0.4, 13.1 + rng.random() * 0.6)
+        end = (52.3 + rng.random() * 0.4, 13.1 + rng.random() * 0.6)
+        straight_km = haversine_m(*start, *end) / 1000
+        distance_km = straight_km * circuity * rng.uniform(0.97, 1.03)
+        rows.append((f"{start[0]:.6f},{start[1]:.6f}", f"{end[0]:.6f},{end[1]:.6f}", distance_km, distance_km / speed_kmh * 60))
+    return rows
+
+
+def test_fit_recovers_known_factors_and_ignores_unusable_trips():
+    good = [row for row in routed_trips(200, circuity=1.42, speed_kmh=38.0) if row[2] > 1.0]
+    trips = good + [
+        ("Alexanderplatz", "52.5,13.4", 5.0, 10.0),       # address, no straight line
+        ("52.5,13.4", "52.5001,13.4001", 2.0, 4.0),       # too short to compare
+        ("52.5,13.4", "52.6,13.4", 120.0, 90.0),          # circuity far outside the range
+    ]
+    fit = RouteEstimator.fit(trips)
+    assert fit['samples'] == len(good)
+    assert fit['circuity_factor'] == pytest.approx(1.42, abs=0.01)
+    assert fit['average_speed_kmh'] == pytest.approx(38.0, abs=0.1)
+    assert RouteEstimator.fit([("Berlin", "Hamburg", 290.0, 180.0)]) is None
+
+
+def test_estimate_of_a_known_pair():
+    estimator = RouteEstimator(circuity_factor=1.25, average_speed_kmh=75.0)
+    result = estimator.estimate(np.array([BERLIN]), np.array([HAMBURG]))
+    # Berlin to Hamburg is about 255 km as the crow flies
+    assert result['straight_line_km'][0] == pytest.approx(255.5, abs=1.0)
+    assert result['distance_km'][0] == pytest.approx(result['straight_line_km'][0] * 1.25, abs=0.01)
+    assert result['duration_minutes'][0] == pytest.approx(result['distance_km'][0] / 75.0 * 60, abs=0.01)
+
+
+def test_calibrate_from_trip_history(vehicle, monkeypatch):
+    vehicle, _ = vehicle
+    monkeypatch.setattr(route_estimator, "circuity_factor", 1.3)
+    monkeypatch.setattr(route_estimator, "average_speed_kmh", 45.0)
+    monkeypatch.setattr(route_estimator, "calibration_samples", 0)
+    with SessionLocal() as db:
+        db.add_all(
+            Trip(vehicle_id=vehicle["id"], origin=origin, destination=destination, distance_km=distance_km,
+                 duration_minutes=duration_minutes, fuel_used_liters=1.0, fuel_cost=1.6, route_type=route_type)
+            for route_type, (origin, destination, distance_km, duration_minutes) in
+            [("fastest", row) for row in routed_trips(80, circuity=1.35, speed_kmh=52.0)]
+            + [("shortest", row) for row in routed_trips(80, circuity=1.1, speed_kmh=30.0, seed=5)]
+        )
+        db.commit()
+
+        # Too few samples: the fit is reported but not applied
+        assert route_estimator.calibrate(db, limit=1000, min_samples=500)['samples'] < 500
+        assert route_estimator.circuity_factor == 1.3
+
+        fit = route_estimator.calibrate(db, limit=1000, min_samples=50)
+    # Only fastest-route trips are used
+    assert route_estimator.circuity_factor == fit['circuity_factor'] == pytest.approx(1.35, abs=0.01)
+    assert route_estimator.average_speed_kmh == pytest.approx(52.0, abs=0.2)
+    assert route_estimator.stats()['calibration_samples'] == fit['samples']
+
+
+def test_estimate_endpoint_needs_one_of_the_users_vehicles(client, vehicle, auth_headers):
+    vehicle, headers = vehicle
+    body = {"vehicle_id": vehicle["id"], "items": [{"origin": "52.52,13.405", "destination": "53.5511,9.9937"}]}
+    result = client.post("/api/routes/estimate", headers=headers, json=body).json()["results"][0]
+    assert result["fuel_used_liters"] == round(result["distance_km"] * 8.0 / 100, 2)
+
+    assert client.post("/api/routes/estimate", json=body).status_code == 401
+    assert client.post("/api/routes/estimate", headers=auth_headers("other@example.com"), json=body).status_code == 404
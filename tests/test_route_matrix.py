@@ -0,0 +1,53 @@
+"""Tests for the tiled origin x destination route matrix."""
+import math
+
+import pytest
+
+from app.services.maps_client import maps_client
+from app.services.route_matrix import MAX_ELEMENTS_PER_REQUEST, MAX_WAYPOINTS_PER_REQUEST, route_matrix_service
+
+
+def coordinates(count, lat):
+    return [f"{lat + i * 0.01:.2f},{13.0 + i * 0.02:.2f}" for i in range(count)]
+
+
+@pytest.mark.parametrize("origins, destinations", [(1, 1), (30, 40), (60, 60), (10, 200), (49, 1)])
+def test_tiles_stay_within_the_api_limits(origins, destinations):
+    tile_origins, tile_destinations = route_matrix_service.tile_shape(origins, destinations)
+    assert tile_origins * tile_destinations <= MAX_ELEMENTS_PER_REQUEST
+    assert tile_origins + tile_destinations <= MAX_WAYPOINTS_PER_REQUEST
+    tiles = math.ceil(origins / tile_origins) * math.ceil(destinations / tile_destinations)
+    # No request can cover more than the element limit
+    assert tiles >= math.ceil(origins * destinations / MAX_ELEMENTS_PER_REQUEST)
+
+
+def test_matrix_makes_one_request_per_tile(client, vehicle, monkeypatch):
+    _, headers = vehicle
+    monkeypatch.setattr(maps_client, "requests", 0)
+    origins, destinations = coordinates(30, 52.0), coordinates(40, 53.0)
+    response = client.post("/api/routes/matrix", headers=headers, json={"origins": origins, "destinations": destinations})
+    assert response.status_code == 200
+    body = response.json()
+    # 30 origins x 20 destinations per tile: 600 elements and 50 waypoints
+    assert body["tiles"] == maps_client.requests == 2
+    assert len(body["distance_km"]) == 30 and all(len(row) == 40 for row in body["distance_km"])
+    assert all(value is not None for row in body["distance_km"] for value in row)
+
+
+def test_matrix_cells_match_single_tile_requests(client, vehicle):
+    _, headers = vehicle
+    origins, destinations = coordinates(3, 52.0), coordinates(30, 53.0)
+    tiled = client.post("/api/routes/matrix", headers=headers, json={"origins": origins, "destinations": destinations}).json()
+    for i, origin in enumerate(origins):
+        single = client.post("/api/routes/matrix", headers=headers, json={"origins": [origin], "destinations": destinations}).json()
+        assert single["distance_km"][0] == tiled["distance_km"][i]
+
+
+def test_matrix_costs_need_one_of_the_users_vehicles(client, vehicle, auth_headers):
+    van, headers = vehicle
+    body = {"origins": coordinates(2, 52.0), "destinations": coordinates(2, 53.0), "vehicle_id": van["id"]}
+    costed = client.post("/api/routes/matrix", headers=headers, json=body).json()
+    assert costed["fuel_cost"][0][0] == round(round(costed["distance_km"][0][0] * 8.0 / 100, 2) * 1.6, 2)
+
+    assert client.post("/api/routes/matrix", json=body).status_code == 401
+    assert client.post("/api/routes/matrix", headers=auth_headers("other@example.com"), json=body).status_code == 404
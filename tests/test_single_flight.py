@@ -0,0 +1,75 @@
+"""Tests for single-flight coalescing of identical in-flight lookups."""
+import asyncio
+
+import pytest
+
+from app.services.route_calculator import route_calculator
+from app.services.single_flight import SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    group = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"routes": []}
+
+    async def scenario():
+        results = await asyncio.gather(*(group.do("k", fetch) for _ in range(10)))
+        other = await group.do("other", fetch)
+        return results, other
+
+    results, other = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {'calls': 2, 'coalesced': 9, 'in_flight': 0}
+
+
+def test_single_flight_shares_errors_and_starts_fresh_afterwards():
+    group = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(*(group.do("k", failing) for _ in range(3)), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await group.do("k", failing)
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(attempts) == 2
+
+
+def test_single_flight_survives_a_cancelled_waiter():
+    group = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        first = asyncio.create_task(group.do("k", fetch))
+        second = asyncio.create_task(group.do("k", fetch))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_concurrent_identical_lookups_make_one_upstream_call(fake_maps):
+    async def scenario():
+        return await asyncio.gather(*(
+            route_calculator.calculate_routes("52.52,13.40", "53.55,9.99") for _ in range(8)
+        ))
+
+    results = asyncio.run(scenario())
+    assert fake_maps.requests == 1
+    assert len({route[0]['distance_km'] for route in results}) == 1
@@ -0,0 +1,107 @@
+"""Tests for multi-stop ordering against exhaustive search, and the multi-stop endpoint."""
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from app.services.stop_optimizer import StopOptimizer
+
+
+def tour_cost(cost, order):
+    return sum(cost[a][b] for a, b in zip(order, order[1:]))
+
+
+def brute_force(cost, return_to_start, fixed_end):
+    """Cheapest order over every permutation of the movable stops."""
+    n = len(cost)
+    movable = list(range(1, n - 1 if fixed_end else n))
+    best = math.inf
+    for middle in itertools.permutations(movable):
+        order = [0, *middle]
+        if fixed_end:
+            order.append(n - 1)
+        if return_to_start:
+            order.append(0)
+        best = min(best, tour_cost(cost, order))
+    return best
+
+
+def random_instance(rng, n, symmetric):
+    """Leg costs between random points, optionally with asymmetric detours."""
+    points = rng.uniform(0, 100, size=(n, 2))
+    cost = np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1))
+    if not symmetric:
+        cost = cost * rng.uniform(1.0, 1.5, size=(n, n))
+    np.fill_diagonal(cost, 0)
+    return cost
+
+
+@pytest.mark.parametrize("return_to_start,fixed_end", [(False, False), (True, False), (False, True)])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_matches_brute_force(return_to_start, fixed_end, symmetric):
+    rng = np.random.default_rng(11)
+    optimizer = StopOptimizer(seed=0)
+    for n in range(3, 9):
+        for _ in range(5):
+            cost = random_instance(rng, n, symmetric)
+            result = optimizer.optimize(cost, return_to_start, fixed_end, time_budget_seconds=0.02)
+            assert result['cost'] == pytest.approx(brute_force(cost, return_to_start, fixed_end))
+            assert result['cost'] == pytest.approx(tour_cost(cost, result['order']))
+            assert result['cost'] <= result['initial_cost'] + 1e-9
+
+
+@pytest.mark.parametrize("return_to_start,fixed_end", [(False, False), (True, False), (False, True)])
+def test_order_respects_constraints(return_to_start, fixed_end):
+    cost = random_instance(np.random.default_rng(3), 7, symmetric=False)
+    order = StopOptimizer().optimize(cost, return_to_start, fixed_end, time_budget_seconds=0.01)['order']
+    assert order[0] == 0
+    assert sorted(set(order)) == list(range(7))
+    if return_to_start:
+        assert order[-1] == 0 and len(order) == 8
+    else:
+        assert len(order) == 7
+    if fixed_end:
+        assert order[-1] == 6
+
+
+def test_two_stops_are_returned_as_given():
+    cost = np.array([[0.0, 4.0], [5.0, 0.0]])
+    assert StopOptimizer().optimize(cost)['order'] == [0, 1]
+    result = StopOptimizer().optimize(cost, return_to_start=True)
+    assert result['order'] == [0, 1, 0]
+    assert result['cost'] == 9.0
+
+
+def test_unreachable_legs_are_avoided():
+    cost = random_instance(np.random.default_rng(5), 5, symmetric=True)
+    cost[0, 1] = cost[1, 0] = np.nan
+    result = StopOptimizer().optimize(cost, time_budget_seconds=0.01)
+    assert math.isfinite(result['cost'])
+    assert [0, 1] not in [result['order'][i:i + 2] for i in range(len(result['order']) - 1)]
+
+
+STOPS = ["52.52,13.40", "52.40,13.06", "52.75,13.60", "52.48,13.20", "52.60,13.95"]
+
+
+def test_multi_stop_totals_are_the_sums_of_the_legs(client, vehicle):
+    vehicle, headers = vehicle
+    response = client.post(
+        "/api/routes/multi-stop", json={"vehicle_id": vehicle["id"], "stops": STOPS, "return_to_start": True},
+        headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["order"][0] == body["order"][-1] == 0 and sorted(set(body["order"])) == list(range(len(STOPS)))
+    assert len(body["legs"]) == len(STOPS)
+    assert body["fuel_used_liters"] == pytest.approx(sum(leg["fuel_used_liters"] for leg in body["legs"]))
+    assert body["fuel_cost"] == pytest.approx(sum(leg["fuel_cost"] for leg in body["legs"]))
+    assert body["distance_km"] <= body["requested_order_distance_km"] + 1e-9
+
+
+def test_multi_stop_needs_one_of_the_users_vehicles(client, vehicle, auth_headers):
+    vehicle, _ = vehicle
+    request = {"vehicle_id": vehicle["id"], "stops": STOPS[:3]}
+    assert client.post("/api/routes/multi-stop", json=request).status_code == 401
+    other = auth_headers(email="other@example.com")
+    assert client.post("/api/routes/multi-stop", json=request, headers=other).status_code == 404
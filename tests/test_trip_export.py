@@ -0,0 +1,73 @@
+"""Tests for streaming trip export."""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.models.user import User
+from app.services.trip_export import trip_exporter
+
+
+@pytest.fixture
+def history(vehicle, monkeypatch):
+    """Twenty-three trips for the test user, exported in several small windows."""
+    monkeypatch.setattr(trip_exporter, "window_rows", 5)
+    monkeypatch.setattr(trip_exporter, "batch_size", 2)
+    vehicle, headers = vehicle
+    base = datetime(2026, 6, 1, 7, 30)
+    with SessionLocal() as db:
+        user_id = db.query(User.id).filter(User.email == "driver@example.com").scalar()
+        db.add_all([
+            Trip(
+                vehicle_id=vehicle["id"], user_id=user_id, origin=f"Depot {i}", destination="Port, Dock 4",
+                distance_km=12.5 + i, duration_minutes=20.0 + i, fuel_used_liters=1.0 + i / 10,
+                fuel_cost=1.6 + i / 10, route_type="shortest" if i % 2 else "fastest",
+                created_at=base + timedelta(hours=i // 2)
+            )
+            for i in range(23)
+        ])
+        db.commit()
+    return vehicle, headers
+
+
+def export(client, headers, file_format, **params):
+    response = client.get("/api/trips/export", params={"format": file_format, **params}, headers=headers)
+    assert response.status_code == 200
+    return response.text
+
+
+def parse_ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_ndjson_export_is_ordered_and_complete(client, history):
+    _, headers = history
+    records = parse_ndjson(export(client, headers, "ndjson"))
+    assert len(records) == 23
+    assert [(record["created_at"], record["id"]) for record in records] == \
+        sorted((record["created_at"], record["id"]) for record in records)
+    assert records[0]["origin"] == "Depot 0" and records[-1]["origin"] == "Depot 22"
+
+
+def test_csv_export_quotes_commas(client, history):
+    _, headers = history
+    text = export(client, headers, "csv")
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert len(rows) == 23
+    assert rows[0]["destination"] == "Port, Dock 4"
+    assert float(rows[0]["distance_km"]) == 12.5
+
+
+def test_export_only_includes_the_users_trips(client, history, auth_headers):
+    other = auth_headers("other@example.com")
+    assert export(client, other, "ndjson") == ""
+
+
+def test_export_filters_by_time_range(client, history):
+    _, headers = history
+    records = parse_ndjson(export(client, headers, "ndjson", start="2026-06-01T09:00:00", end="2026-06-01T11:00:00"))
+    assert [record["created_at"] for record in records] == ["2026-06-01T09:30:00"] * 2 + ["2026-06-01T10:30:00"] * 2
@@ -0,0 +1,175 @@
+"""Tests for bulk trip import."""
+import asyncio
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.models.trip_rollup import TripRollup
+from app.services.trip_import import trip_importer
+from tests.test_trip_export import export, history, parse_ndjson  # noqa: F401  (shared fixture)
+
+
+def without_ids(records):
+    return [{key: value for key, value in record.items() if key != "id"} for record in records]
+
+
+def clear_trips():
+    with SessionLocal() as db:
+        db.query(Trip).delete()
+        db.query(TripRollup).delete()
+        db.commit()
+
+
+def test_ndjson_round_trip(client, history):
+    vehicle, headers = history
+    exported = export(client, headers, "ndjson")
+    records = parse_ndjson(exported)
+    assert len(records) == 23
+    assert [record["created_at"] for record in records] == sorted(record["created_at"] for record in records)
+
+    clear_trips()
+    result = client.post("/api/trips/import", params={"chunk_size": 7}, content=exported, headers=headers).json()
+    assert result == {"inserted": 23, "failed": 0, "chunks": 4, "errors": []}
+
+    assert without_ids(parse_ndjson(export(client, headers, "ndjson"))) == without_ids(records)
+    totals = client.get("/api/analytics/trips", headers=headers).json()["totals"]
+    assert totals["trip_count"] == 23
+    assert totals["distance_km"] == pytest.approx(sum(record["distance_km"] for record in records), abs=0.01)
+
+
+def test_csv_round_trip(client, history):
+    _, headers = history
+    exported = export(client, headers, "csv")
+    rows = list(csv.DictReader(io.StringIO(exported)))
+    assert len(rows) == 23
+    assert rows[0]["destination"] == "Port, Dock 4"
+
+    clear_trips()
+    result = client.post("/api/trips/import", params={"format": "csv"}, content=exported, headers=headers).json()
+    assert result["inserted"] == 23 and result["failed"] == 0
+
+    assert without_ids(csv.DictReader(io.StringIO(export(client, headers, "csv")))) == without_ids(rows)
+
+
+def test_import_reports_bad_rows_by_line(client, history, auth_headers):
+    vehicle, headers = history
+    good = {
+        "vehicle_id": vehicle["id"], "origin": "A", "destination": "B", "distance_km": 5.0,
+        "duration_minutes": 9.0, "fuel_used_liters": 0.4, "fuel_cost": 0.64
+    }
+    body = "\n".join([
+        json.dumps(good),
+        "{not json",
+        json.dumps({**good, "distance_km": "far"}),
+        "",
+        json.dumps({**good, "vehicle_id": vehicle["id"] + 99}),
+        json.dumps(good)
+    ])
+    result = client.post("/api/trips/import", content=body, headers=headers).json()
+    assert result["inserted"] == 2
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+
+    # Trips cannot be imported against another user's vehicle
+    other = auth_headers("other@example.com")
+    result = client.post("/api/trips/import", content=json.dumps(good), headers=other).json()
+    assert result["inserted"] == 0 and result["failed"] == 1
+
+
+def test_importer_splits_chunks(db_tables, monkeypatch):
+    calls = []
+    monkeypatch.setattr(trip_importer, "import_chunk", lambda user_id, records: calls.append(len(records)) or (0, 0, []))
+
+    async def lines():
+        yield "origin,destination"
+        for i in range(10):
+            yield f"A{i},B"
+
+    result = asyncio.run(trip_importer.import_stream(lines(), 1, "csv", 4))
+    assert calls == [4, 4, 2]
+    assert result["chunks"] == 3
+
+
+def test_rejected_chunk_is_rolled_back_and_reported(client, vehicle, monkeypatch):
+    vehicle, headers = vehicle
+    insert_rows = trip_importer._insert_rows
+    calls = []
+
+    def flaky_insert(db, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise OperationalError("INSERT INTO trips", {}, Exception("database is locked"))
+        insert_rows(db, rows)
+
+    monkeypatch.setattr(trip_importer, "_insert_rows", flaky_insert)
+    row = {
+        "vehicle_id": vehicle["id"], "origin": "A", "destination": "", "distance_km": 5.0,
+        "duration_minutes": 9.0, "fuel_used_liters": 0.4, "fuel_cost": 0.64
+    }
+    body = "\n".join(json.dumps(row) for _ in range(9))
+    response = client.post("/api/trips/import", params={"chunk_size": 3}, content=body, headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["inserted"], result["failed"], result["chunks"]) == (6, 3, 3)
+    assert [error["line"] for error in result["errors"]] == [4]
+    assert "database is locked" in result["errors"][0]["error"]
+
+    totals = client.get("/api/analytics/trips", headers=headers).json()["totals"]
+    assert totals["trip_count"] == 6
+    trips = client.get("/api/trips/", headers=headers).json()["trips"]
+    assert {trip["destination"] for trip in trips} == {""}
+
+
+class FakeDbapiError(Exception):
+    pass
+
+
+class FakeCursor:
+    def __init__(self, error=None):
+        self.error = error
+        self.statement = None
+        self.data = None
+
+    def copy_expert(self, statement, buffer):
+        self.statement, self.data = statement, buffer.read()
+        if self.error:
+            raise self.error
+
+    def close(self):
+        pass
+
+
+def fake_postgres_session(cursor):
+    dialect = SimpleNamespace(name="postgresql", dbapi=SimpleNamespace(Error=FakeDbapiError))
+    return SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=dialect),
+        connection=lambda: SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+    )
+
+
+def copy_row(**overrides):
+    row = {
+        "vehicle_id": 1, "origin": "", "destination": "B", "distance_km": 5.0, "duration_minutes": 9.0,
+        "fuel_used_liters": 0.4, "fuel_cost": 0.64, "route_type": "fastest", "user_id": None, "created_at": None
+    }
+    return {**row, **overrides}
+
+
+def test_copy_keeps_empty_text_as_empty_strings():
+    cursor = FakeCursor()
+    trip_importer._insert_rows(fake_postgres_session(cursor), [copy_row()])
+    assert "FORCE_NOT_NULL (origin, destination, route_type)" in cursor.statement
+    # NULL user_id and the empty origin are both unquoted empty values
+    assert next(csv.reader(io.StringIO(cursor.data))) == ["1", "", "B", "5.0", "9.0", "0.4", "0.64", "fastest", "", ""]
+
+
+def test_copy_errors_are_raised_as_sqlalchemy_errors():
+    cursor = FakeCursor(error=FakeDbapiError("invalid input syntax"))
+    with pytest.raises(SQLAlchemyError) as raised:
+        trip_importer._insert_rows(fake_postgres_session(cursor), [copy_row()])
+    assert isinstance(raised.value.orig, FakeDbapiError)
@@ -0,0 +1,172 @@
+"""Tests for the incrementally maintained trip rollups."""
+from datetime import date, datetime
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.fuel_price import FuelPrice
+from app.models.trip import Trip
+from app.models.trip_rollup import TripRollup
+from app.models.user import User
+from app.models.vehicle import Vehicle
+from app.services.fuel_prices import fuel_price_index
+from app.services.trip_rollups import NO_USER_ID, trip_rollup_service
+
+
+def rollups(db):
+    """All rollup rows as {(user_id, vehicle_id, month): (count, distance, fuel, cost)}."""
+    return {
+        (row.user_id, row.vehicle_id, row.month): (
+            row.trip_count,
+            pytest.approx(row.distance_km),
+            pytest.approx(row.fuel_used_liters),
+            pytest.approx(row.fuel_cost)
+        )
+        for row in db.query(TripRollup)
+    }
+
+
+def rebuilt_rollups(db):
+    """Rollups recomputed from the trips table, leaving the stored ones untouched."""
+    trip_rollup_service.rebuild(db)
+    rebuilt = rollups(db)
+    db.rollback()
+    return rebuilt
+
+
+def trip(vehicle_id, user_id, created_at, distance_km=100.0, fuel_used_liters=8.0, fuel_cost=12.8):
+    return {
+        "vehicle_id": vehicle_id,
+        "user_id": user_id,
+        "created_at": created_at,
+        "origin": "A",
+        "destination": "B",
+        "distance_km": distance_km,
+        "duration_minutes": 60.0,
+        "fuel_used_liters": fuel_used_liters,
+        "fuel_cost": fuel_cost,
+        "route_type": "fastest"
+    }
+
+
+@pytest.fixture
+def owner(db_tables):
+    """A user with two vehicles: (user_id, diesel vehicle id, petrol vehicle id)."""
+    with SessionLocal() as db:
+        user = User(email="fleet@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        diesel = Vehicle(name="Van", fuel_type="diesel", fuel_consumption=8.0, fuel_price=1.6, user_id=user.id)
+        petrol = Vehicle(name="Car", fuel_type="petrol", fuel_consumption=6.0, fuel_price=1.8, user_id=user.id)
+        db.add_all([diesel, petrol])
+        db.commit()
+        return user.id, diesel.id, petrol.id
+
+
+def insert_trips(db, trips):
+    db.execute(Trip.__table__.insert(), trips)
+    trip_rollup_service.record_trips(db, trips)
+    db.commit()
+
+
+def test_record_trips_aggregates_per_bucket(owner):
+    user_id, diesel, petrol = owner
+    with SessionLocal() as db:
+        insert_trips(db, [
+            trip(diesel, user_id, datetime(2026, 4, 2)),
+            trip(diesel, user_id, datetime(2026, 4, 30, 23, 59), distance_km=50.0, fuel_used_liters=4.0, fuel_cost=6.4),
+            trip(diesel, user_id, datetime(2026, 5, 1)),
+            trip(petrol, None, datetime(2026, 4, 3), fuel_cost=14.4)
+        ])
+        assert rollups(db) == {
+            (user_id, diesel, date(2026, 4, 1)): (2, 150.0, 12.0, 19.2),
+            (user_id, diesel, date(2026, 5, 1)): (1, 100.0, 8.0, 12.8),
+            (NO_USER_ID, petrol, date(2026, 4, 1)): (1, 100.0, 8.0, 14.4)
+        }
+        assert rollups(db) == rebuilt_rollups(db)
+        assert trip_rollup_service.trip_count(db, user_id) == 3
+
+
+def test_recording_into_an_existing_bucket_adds_to_it(owner):
+    user_id, diesel, _ = owner
+    with SessionLocal() as db:
+        insert_trips(db, [trip(diesel, user_id, datetime(2026, 4, 2))])
+        insert_trips(db, [trip(diesel, user_id, datetime(2026, 4, 9)), trip(diesel, user_id, datetime(2026, 4, 10))])
+        assert rollups(db) == {(user_id, diesel, date(2026, 4, 1)): (3, 300.0, 24.0, 38.4)}
+
+
+def test_deleted_trips_are_subtracted(owner):
+    user_id, diesel, _ = owner
+    trips = [trip(diesel, user_id, datetime(2026, 4, day)) for day in (1, 2, 3)]
+    with SessionLocal() as db:
+        insert_trips(db, trips)
+        removed = db.query(Trip).order_by(Trip.id).limit(2).all()
+        for row in removed:
+            trip_rollup_service.record_trip(db, row, sign=-1)
+            db.delete(row)
+        db.commit()
+        assert rollups(db) == {(user_id, diesel, date(2026, 4, 1)): (1, 100.0, 8.0, 12.8)}
+        assert rollups(db) == rebuilt_rollups(db)
+
+
+def test_cost_changes_only_move_fuel_cost(owner):
+    user_id, diesel, petrol = owner
+    with SessionLocal() as db:
+        insert_trips(db, [
+            trip(diesel, user_id, datetime(2026, 4, 2)),
+            trip(diesel, user_id, datetime(2026, 4, 8)),
+            trip(petrol, None, datetime(2026, 5, 8))
+        ])
+        trip_rollup_service.record_cost_changes(db, Trip.fuel_cost + 1.5, Trip.created_at >= datetime(2026, 4, 5))
+        db.commit()
+        assert rollups(db) == {
+            (user_id, diesel, date(2026, 4, 1)): (2, 200.0, 16.0, 27.1),
+            (NO_USER_ID, petrol, date(2026, 5, 1)): (1, 100.0, 8.0, 14.3)
+        }
+
+
+def test_recost_keeps_rollups_consistent_with_trips(owner, monkeypatch):
+    user_id, diesel, petrol = owner
+    with SessionLocal() as db:
+        insert_trips(db, [
+            trip(vehicle_id, owner_id, datetime(2026, month, day), fuel_used_liters=liters, fuel_cost=round(liters * 1.6, 2))
+            for month in (3, 4, 5)
+            for day, liters in ((1, 7.4), (15, 12.0), (28, 3.0))
+            for vehicle_id, owner_id in ((diesel, user_id), (petrol, None))
+        ])
+        db.add_all([
+            FuelPrice(fuel_type="diesel", region="default", price_per_liter=1.75, effective_from=datetime(2026, 4, 1)),
+            FuelPrice(fuel_type="petrol", region="default", price_per_liter=1.9, effective_from=datetime(2026, 4, 10))
+        ])
+        db.commit()
+
+    monkeypatch.setattr(fuel_price_index, "recost_batch_size", 5)
+    result = fuel_price_index.recost_trips(since=datetime(2026, 3, 10))
+    # Diesel from April 1 (6 trips), petrol from April 10 (5 trips)
+    assert result['updated'] == 11
+
+    with SessionLocal() as db:
+        assert rollups(db) == rebuilt_rollups(db)
+        april = db.query(TripRollup).filter_by(vehicle_id=diesel, month=date(2026, 4, 1)).one()
+        assert april.fuel_cost == pytest.approx(12.95 + 21.0 + 5.25)
+    assert fuel_price_index.recost_trips(since=datetime(2026, 3, 10))['updated'] == 0
+
+
+def test_api_trip_create_and_delete_update_analytics(client, vehicle):
+    vehicle, headers = vehicle
+    created = [
+        client.post("/api/trips/", json={
+            "vehicle_id": vehicle["id"], "origin": "A", "destination": "B", "distance_km": km,
+            "duration_minutes": 30.0, "fuel_used_liters": km / 10, "fuel_cost": km / 10 * 1.6
+        }, headers=headers).json()
+        for km in (40.0, 60.0)
+    ]
+    totals = client.get("/api/analytics/trips", headers=headers).json()["totals"]
+    assert totals["trip_count"] == 2
+    assert totals["distance_km"] == pytest.approx(100.0)
+
+    assert client.delete(f"/api/trips/{created[0]['id']}", headers=headers).status_code == 204
+    totals = client.get("/api/analytics/trips", headers=headers).json()["totals"]
+    assert totals["trip_count"] == 1
+    assert totals["distance_km"] == pytest.approx(60.0)
+    assert totals["fuel_cost"] == pytest.approx(9.6)